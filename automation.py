@@ -0,0 +1,354 @@
+"""Local automation server: JSON-RPC 2.0 over a local socket
+
+Start the browser with ``--automation [name]`` and connect with
+automation_client.Client. Requests are newline-delimited JSON objects
+and may be pipelined; responses carry the request id and can arrive out
+of order. Commands addressed to a tab run one at a time in that tab's
+queue, so different tabs proceed in parallel. Tabs the server has opened
+or addressed are never frozen or discarded; one that was is woken, and
+reloaded if need be, before its command runs.
+
+Methods:
+    ping()
+    list_tabs() -> [{"tab", "url", "title"}]
+    open_tab(url=None, background=True, wait=False) -> {"tab"}
+    navigate(tab, url, wait=True) -> {"tab", "ok", "url"}
+    eval(tab, script) -> result of the script
+    text(tab) -> visible text of the page
+    close_tab(tab)
+
+Every method also takes ``timeout``, in seconds.
+"""
+import json
+from collections import deque
+from PyQt5.QtCore import QObject, QTimer, QUrl
+from PyQt5.QtNetwork import QLocalServer
+import lifecycle
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+
+# Longest per-command timeout a client may ask for, in seconds
+MAX_TIMEOUT = 24 * 3600
+
+class RpcError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+class Command:
+    """One request in flight"""
+    __slots__ = ("connection", "id", "method", "params", "tab_id", "timer", "cleanup", "done")
+
+    def __init__(self, connection, id, method, params, tab_id=None):
+        self.connection = connection
+        self.id = id
+        self.method = method
+        self.params = params
+        self.tab_id = tab_id
+        self.timer = None
+        self.cleanup = None  # undoes what the command connected, however it ends
+        self.done = False
+
+class Connection(QObject):
+    """Splits a socket's byte stream into JSON messages"""
+    def __init__(self, socket, server):
+        super().__init__(server)
+        self.socket = socket
+        self.server = server
+        self.buffer = b""
+        self.open = True
+        socket.readyRead.connect(self.on_ready_read)
+        socket.disconnected.connect(self.on_disconnected)
+
+    def on_ready_read(self):
+        self.buffer += bytes(self.socket.readAll())
+        *lines, self.buffer = self.buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                self.server.handle(self, line)
+
+    def send(self, message):
+        if self.open:
+            self.socket.write(json.dumps(message, default=str).encode("utf-8") + b"\n")
+
+    def on_disconnected(self):
+        self.open = False
+        self.socket.deleteLater()
+        self.deleteLater()
+
+class AutomationServer(QObject):
+    """Drives the browser's tabs, in every window, for local clients
+
+    ``browser`` is the process-wide services object: it lists the open
+    ``windows`` and knows the ``active_window()`` new tabs open in.
+    """
+    TAB_METHODS = ("navigate", "eval", "text", "close_tab")
+
+    def __init__(self, browser, name, timeout=30.0, parent=None):
+        super().__init__(parent)
+        self.browser = browser
+        self.timeout = timeout
+        self.tabs = {}
+        self.ids = {}
+        self.next_id = 1
+        self.queues = {}
+        self.busy = set()
+        self.served = 0
+
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.UserAccessOption)
+        self.server.newConnection.connect(self.on_new_connection)
+        QLocalServer.removeServer(name)
+        if not self.server.listen(name):
+            raise OSError(f"automation server could not listen on {name}: "
+                          f"{self.server.errorString()}")
+
+    def address(self):
+        return self.server.fullServerName()
+
+    def close(self):
+        self.server.close()
+
+    def on_new_connection(self):
+        while self.server.hasPendingConnections():
+            Connection(self.server.nextPendingConnection(), self)
+
+    # ----------------------------
+    # Tab registry
+    # ----------------------------
+    def tab_id(self, tab):
+        tab_id = self.ids.get(tab)
+        if tab_id is None:
+            tab_id = self.next_id
+            self.next_id += 1
+            self.tabs[tab_id] = tab
+            self.ids[tab] = tab_id
+        return tab_id
+
+    def forget(self, tab_id):
+        tab = self.tabs.pop(tab_id, None)
+        self.ids.pop(tab, None)
+
+    def tab_closed(self, tab):
+        """Drop a tab the window is closing so the registry does not keep it"""
+        tab_id = self.ids.get(tab)
+        if tab_id is not None:
+            self.forget(tab_id)
+
+    def resolve(self, tab_id):
+        tab = self.tabs.get(tab_id)
+        if tab is None or tab.window not in self.browser.windows or tab.window.tabs.indexOf(tab) < 0:
+            self.forget(tab_id)
+            raise RpcError(SERVER_ERROR, f"no such tab: {tab_id}")
+        tab.automated = True
+        return tab
+
+    # ----------------------------
+    # Dispatch
+    # ----------------------------
+    def handle(self, connection, line):
+        try:
+            message = json.loads(line)
+        except ValueError:
+            connection.send({"jsonrpc": "2.0", "id": None,
+                             "error": {"code": PARSE_ERROR, "message": "parse error"}})
+            return
+        if not isinstance(message, dict) or not isinstance(message.get("method"), str):
+            connection.send({"jsonrpc": "2.0", "id": message.get("id") if isinstance(message, dict) else None,
+                             "error": {"code": INVALID_REQUEST, "message": "invalid request"}})
+            return
+        params = message.get("params") or {}
+        command = Command(connection, message.get("id"), message["method"], params)
+        handler = getattr(self, f"do_{command.method}", None)
+        if handler is None or not isinstance(params, dict):
+            code = METHOD_NOT_FOUND if handler is None else INVALID_PARAMS
+            self.complete(command, error=RpcError(code, f"cannot call {command.method}"))
+            return
+        timeout = params.get("timeout", self.timeout)
+        if type(timeout) not in (int, float) or not 0 < timeout <= MAX_TIMEOUT:
+            self.complete(command, error=RpcError(INVALID_PARAMS, f"invalid timeout: {timeout!r}"))
+            return
+        if command.method in self.TAB_METHODS and type(params.get("tab")) is not int:
+            self.complete(command, error=RpcError(INVALID_PARAMS, f"invalid tab: {params.get('tab')!r}"))
+            return
+
+        if command.method in self.TAB_METHODS:
+            command.tab_id = params.get("tab")
+            self.queues.setdefault(command.tab_id, deque()).append(command)
+            self.run_next(command.tab_id)
+        else:
+            self.run(command)
+
+    def run_next(self, tab_id):
+        queue = self.queues.get(tab_id)
+        if tab_id in self.busy or not queue:
+            return
+        command = queue.popleft()
+        if not queue:
+            del self.queues[tab_id]
+        self.busy.add(tab_id)
+        self.run(command)
+
+    def run(self, command):
+        timeout = command.params.get("timeout", self.timeout)
+        command.timer = QTimer(self)
+        command.timer.setSingleShot(True)
+        command.timer.timeout.connect(
+            lambda: self.complete(command, error=RpcError(SERVER_ERROR, "timeout")))
+        command.timer.start(int(timeout * 1000))
+        if command.tab_id is not None:
+            try:
+                tab = self.resolve(command.tab_id)
+            except RpcError as e:
+                self.complete(command, error=e)
+                return
+            state = tab.lifecycle_state
+            if state != lifecycle.ACTIVE:
+                tab.window.lifecycle.wake(tab)
+            if state == lifecycle.DISCARDED:
+                # The page reloads from its history; run the command once it has
+                self.wait_for_load(command, tab, then=lambda: self.dispatch(command))
+                return
+        self.dispatch(command)
+
+    def dispatch(self, command):
+        try:
+            getattr(self, f"do_{command.method}")(command, **{
+                key: value for key, value in command.params.items() if key != "timeout"
+            })
+        except RpcError as e:
+            self.complete(command, error=e)
+        except TypeError as e:
+            self.complete(command, error=RpcError(INVALID_PARAMS, str(e)))
+
+    def complete(self, command, result=None, error=None):
+        """Send the response and start the tab's next command"""
+        if command.done:
+            return
+        command.done = True
+        self.served += 1
+        if command.timer is not None:
+            command.timer.stop()
+            command.timer.deleteLater()
+        self.stop_waiting(command)
+        if command.id is not None:
+            response = {"jsonrpc": "2.0", "id": command.id}
+            if error is not None:
+                response["error"] = {"code": error.code, "message": str(error)}
+            else:
+                response["result"] = result
+            command.connection.send(response)
+        if command.tab_id is not None and command.tab_id in self.busy:
+            self.busy.discard(command.tab_id)
+            self.run_next(command.tab_id)
+
+    # ----------------------------
+    # Methods
+    # ----------------------------
+    def do_ping(self, command):
+        self.complete(command, "pong")
+
+    def do_list_tabs(self, command):
+        tabs = []
+        for window_number, window in enumerate(self.browser.windows):
+            for i in range(window.tabs.count()):
+                tab = window.tabs.widget(i)
+                tabs.append({"tab": self.tab_id(tab), "window": window_number,
+                             "url": tab.url.toString(), "title": tab.title})
+        self.complete(command, tabs)
+
+    def wait_for_load(self, command, tab, started=False, then=None):
+        """Complete command when the next load started in tab finishes
+
+        With started, the load the tab is running now counts. With then,
+        then() is called instead of completing command. The handlers are
+        disconnected however the command ends.
+        """
+        view = tab.browser
+        state = {"started": started}
+
+        def on_started():
+            state["started"] = True
+
+        def on_finished(ok):
+            # Ignore the end of a load that was running before ours
+            if not state["started"]:
+                return
+            if then is None:
+                self.complete(command, {"tab": self.tab_id(tab), "ok": ok, "url": tab.url.toString()})
+            else:
+                self.stop_waiting(command)
+                then()
+
+        def disconnect():
+            try:
+                view.loadStarted.disconnect(on_started)
+                view.loadFinished.disconnect(on_finished)
+            except (TypeError, RuntimeError):
+                pass  # the view was deleted with its tab
+
+        view.loadStarted.connect(on_started)
+        view.loadFinished.connect(on_finished)
+        command.cleanup = disconnect
+
+    def wait_for_adopted(self, command, tab):
+        """Complete command when the load of the view tab adopted is done
+
+        Pooled and prerendered views start loading before a tab takes
+        them: reply now if that load has finished, else wait for its end.
+        """
+        if tab.loading:
+            self.wait_for_load(command, tab, started=True)
+        elif tab.load_ok is not None:
+            self.complete(command, {"tab": self.tab_id(tab), "ok": tab.load_ok, "url": tab.url.toString()})
+        else:
+            self.wait_for_load(command, tab)
+
+    def stop_waiting(self, command):
+        if command.cleanup is not None:
+            command.cleanup()
+            command.cleanup = None
+
+    def do_open_tab(self, command, url=None, background=True, wait=False):
+        tab = self.browser.active_window().add_new_tab(url, background=background)
+        tab.automated = True
+        if wait and tab.browser is not None:
+            self.wait_for_adopted(command, tab)
+        else:
+            self.complete(command, {"tab": self.tab_id(tab)})
+
+    def do_navigate(self, command, tab, url, wait=True):
+        target = self.resolve(tab)
+        view = target.browser
+        if wait:
+            self.wait_for_load(command, target)
+        target.window.navigate_to(url, target)
+        if target.browser is not view:
+            # A prerendered page was swapped in, loaded or still loading
+            self.stop_waiting(command)
+            if wait:
+                self.wait_for_adopted(command, target)
+            else:
+                self.complete(command, {"tab": tab, "ok": True, "url": target.url.toString()})
+        elif not wait:
+            self.complete(command, {"tab": tab, "ok": True, "url": QUrl(url).toString()})
+
+    def do_eval(self, command, tab, script):
+        page = self.resolve(tab).browser.page()
+        page.runJavaScript(script, lambda result: self.complete(command, result))
+
+    def do_text(self, command, tab):
+        page = self.resolve(tab).browser.page()
+        page.toPlainText(lambda text: self.complete(command, text))
+
+    def do_close_tab(self, command, tab):
+        target = self.resolve(tab)
+        window = target.window
+        if window.tabs.count() <= 1:
+            raise RpcError(SERVER_ERROR, "cannot close the last tab")
+        window.close_tab(window.tabs.indexOf(target))
+        self.complete(command, None)
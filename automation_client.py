@@ -0,0 +1,104 @@
+"""Client for the browser's automation server (see automation.py)
+
+    from automation_client import Client
+    with Client() as browser:
+        tab = browser.call("open_tab", url="https://example.com", wait=True)["tab"]
+        print(browser.call("text", tab=tab))
+
+``submit()`` returns a Future without waiting, so many requests can be
+pipelined over the one connection.
+"""
+import os
+import json
+import socket
+import tempfile
+import threading
+import itertools
+from concurrent.futures import Future
+
+DEFAULT_NAME = "fibrowser-automation"
+
+class RpcError(Exception):
+    def __init__(self, code, message):
+        super().__init__(f"{message} ({code})")
+        self.code = code
+
+def socket_path(name):
+    """Where Qt's QLocalServer puts a socket given only a name"""
+    if os.path.isabs(name):
+        return name
+    return os.path.join(tempfile.gettempdir(), name)
+
+class Client:
+    """Pipelining JSON-RPC client; thread-safe"""
+    def __init__(self, name=DEFAULT_NAME, timeout=60.0):
+        self.timeout = timeout
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(socket_path(name))
+        self.ids = itertools.count(1)
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.closed = False
+        self.reader = threading.Thread(target=self._read, name="automation-client", daemon=True)
+        self.reader.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def submit(self, method, **params):
+        """Send a request and return a Future for its result"""
+        future = Future()
+        with self.lock:
+            request_id = next(self.ids)
+            self.pending[request_id] = future
+            message = {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+            self.sock.sendall(json.dumps(message).encode("utf-8") + b"\n")
+        return future
+
+    def call(self, method, **params):
+        """Send a request and wait for its result"""
+        return self.submit(method, **params).result(self.timeout)
+
+    def _read(self):
+        buffer = b""
+        try:
+            while True:
+                data = self.sock.recv(65536)
+                if not data:
+                    break
+                buffer += data
+                *lines, buffer = buffer.split(b"\n")
+                for line in lines:
+                    if line.strip():
+                        self._dispatch(json.loads(line))
+        except OSError:
+            pass
+        finally:
+            with self.lock:
+                pending, self.pending = self.pending, {}
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("automation server closed the connection"))
+
+    def _dispatch(self, message):
+        with self.lock:
+            future = self.pending.pop(message.get("id"), None)
+        if future is None:
+            return
+        error = message.get("error")
+        if error:
+            future.set_exception(RpcError(error.get("code"), error.get("message")))
+        else:
+            future.set_result(message.get("result"))
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            try:
+                self.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self.sock.close()
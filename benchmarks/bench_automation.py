@@ -0,0 +1,108 @@
+"""Automation server benchmark: many tabs driven over one connection
+
+Run with: python benchmarks/bench_automation.py [--tabs 50] [--rounds 5]
+
+Each tab repeatedly navigates to a local fixture page, evaluates a
+script and fetches the page text. All requests are pipelined over one
+client connection; per-tab queues keep each tab's commands in order.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+import statistics
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PyQt5.QtWebEngineWidgets import QWebEngineView  # noqa: F401 (must precede QApplication)
+from PyQt5.QtCore import QStandardPaths, QTimer
+from PyQt5.QtWidgets import QApplication
+
+import main
+from automation_client import Client
+from fixture_server import FixtureServer
+
+PAGE = "<!doctype html><title>Fixture {0}</title><p>Fixture page number {0}</p>"
+
+def drive(address, base_url, tabs, rounds, results):
+    latencies = {"navigate": [], "eval": [], "text": []}
+    with Client(address, timeout=120) as client:
+        start = time.perf_counter()
+        opened = [client.submit("open_tab", url=f"{base_url}/p0.html", wait=True)
+                  for _ in range(tabs)]
+        tab_ids = [future.result(120)["tab"] for future in opened]
+        results["open_s"] = time.perf_counter() - start
+
+        def timed(method, **params):
+            sent = time.perf_counter()
+            future = client.submit(method, **params)
+            future.add_done_callback(
+                lambda _: latencies[method].append((time.perf_counter() - sent) * 1000))
+            return future
+
+        start = time.perf_counter()
+        futures = []
+        for r in range(rounds):
+            for i, tab in enumerate(tab_ids):
+                page = (r * tabs + i) % 20
+                futures.append(timed("navigate", tab=tab, url=f"{base_url}/p{page}.html"))
+                futures.append(timed("eval", tab=tab, script="document.title"))
+                futures.append(timed("text", tab=tab))
+        errors = 0
+        for future in futures:
+            try:
+                future.result(120)
+            except Exception:
+                errors += 1
+        results["elapsed"] = time.perf_counter() - start
+        results["commands"] = len(futures)
+        results["errors"] = errors
+        results["latencies"] = latencies
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tabs", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    QStandardPaths.setTestModeEnabled(True)
+    app = QApplication(sys.argv)
+    app.setApplicationName("Fibrowser Pro Bench")
+    main.PRERENDER = False
+
+    with tempfile.TemporaryDirectory() as root:
+        for i in range(20):
+            with open(os.path.join(root, f"p{i}.html"), "w") as f:
+                f.write(PAGE.format(i))
+        with FixtureServer(root) as server:
+            main.DEFAULT_HOME_PAGE = f"{server.base_url}/p0.html"
+            window = main.Window()
+            window.session.enabled = False
+            address = window.services.start_automation(f"fibrowser-bench-{os.getpid()}")
+
+            results = {}
+            worker = threading.Thread(target=drive, args=(address, server.base_url, args.tabs,
+                                                          args.rounds, results))
+            worker.start()
+            poll = QTimer()
+            poll.timeout.connect(lambda: None if worker.is_alive() else app.quit())
+            poll.start(50)
+            app.exec_()
+            worker.join()
+            window.close()
+
+    print(f"opened {args.tabs} tabs in {results['open_s']:.2f} s")
+    print(f"{results['commands']} commands in {results['elapsed']:.2f} s "
+          f"({results['commands'] / results['elapsed']:.0f}/s), errors {results['errors']}")
+    for method, samples in results["latencies"].items():
+        samples.sort()
+        if samples:
+            print(f"{method:<9} p50 {statistics.median(samples):8.1f} ms  "
+                  f"p99 {samples[int(len(samples) * 0.99)]:8.1f} ms")
+
+if __name__ == "__main__":
+    run()
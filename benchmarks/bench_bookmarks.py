@@ -0,0 +1,156 @@
+"""Bookmark import and bookmark bar benchmark at 50k entries
+
+Run with: python benchmarks/bench_bookmarks.py [--entries 50000] [--legacy 5000]
+
+Generates a Netscape HTML export and a Chrome Bookmarks file with
+nested folders and times streaming each into a fresh store, with the
+peak Python memory the import allocated. The bar benchmark puts every
+entry directly on the bookmark bar and times showing it, resizing it
+and opening a folder menu; "legacy" adds one QPushButton per bookmark
+to a QToolBar, as the bar used to, for the first --legacy entries.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+import statistics
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtWidgets import QApplication, QToolBar, QPushButton
+
+import bookmarks
+
+WORDS = ("dashboard metrics error report build release deploy status python qt "
+         "browser kiosk network latency cache profile session render download "
+         "invoice customer order search index query admin settings wiki docs").split()
+
+def fake_tree(count, folder_size=200, seed=1):
+    """[(folder title, [(title, url)])] with count bookmarks in total"""
+    rng = random.Random(seed)
+    folders = []
+    for start in range(0, count, folder_size):
+        entries = []
+        for i in range(start, min(start + folder_size, count)):
+            host = f"{rng.choice(WORDS)}{i % 97}.corp.example"
+            title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 6))).title()
+            entries.append((title, f"https://{host}/{rng.choice(WORDS)}/{i}"))
+        folders.append((f"Team {len(folders)}", entries))
+    return folders
+
+def write_netscape(path, tree):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("<!DOCTYPE NETSCAPE-Bookmark-file-1>\n<TITLE>Bookmarks</TITLE>\n<H1>Bookmarks</H1>\n<DL><p>\n")
+        for folder, entries in tree:
+            f.write(f'    <DT><H3 ADD_DATE="1600000000">{folder}</H3>\n    <DL><p>\n')
+            for title, url in entries:
+                f.write(f'        <DT><A HREF="{url}" ADD_DATE="1600000000">{title}</A>\n')
+            f.write("    </DL><p>\n")
+        f.write("</DL><p>\n")
+
+def write_chrome(path, tree):
+    def url_node(title, url):
+        return {"date_added": "13300000000000000", "name": title, "type": "url", "url": url}
+    other = [{"children": [url_node(*entry) for entry in entries], "name": folder, "type": "folder"}
+             for folder, entries in tree]
+    data = {"checksum": "", "version": 1, "roots": {
+        "bookmark_bar": {"children": [], "name": "Bookmarks bar", "type": "folder"},
+        "other": {"children": other, "name": "Other bookmarks", "type": "folder"},
+        "synced": {"children": [], "name": "Mobile bookmarks", "type": "folder"}
+    }}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=3)
+
+def time_import(root, label, source, runs):
+    samples = []
+    for run_number in range(runs + 1):
+        store = bookmarks.BookmarkStore(os.path.join(root, f"{label}-{run_number}.sqlite"))
+        # The last run only measures memory; tracing slows the parser down
+        if run_number == runs:
+            tracemalloc.start()
+            store.import_file(source)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        else:
+            stats = store.import_file(source)
+            samples.append(stats["ms"])
+        store.close()
+    size = os.path.getsize(source) / 2**20
+    print(f"import {label:<9} {stats['bookmarks']:>7} bookmarks {size:6.1f} MB  "
+          f"median {statistics.median(samples):8.1f} ms  peak {peak / 2**20:5.1f} MB")
+
+def elapsed(app, action):
+    start = time.perf_counter()
+    action()
+    app.processEvents()
+    return (time.perf_counter() - start) * 1000
+
+def bench_bar(app, root, tree, legacy_count):
+    store = bookmarks.BookmarkStore(os.path.join(root, "bar.sqlite"))
+    entries = [entry for _, folder_entries in tree for entry in folder_entries]
+    conn = bookmarks.connect(store.path)
+    with conn:
+        # A folder holding everything, followed by every entry on the bar itself
+        folder = conn.execute("INSERT INTO bookmarks(parent, position, folder, title) VALUES (?, 0, 1, ?)",
+                              (bookmarks.BAR, "Everything")).lastrowid
+        for parent, offset in ((folder, 0), (bookmarks.BAR, 1)):
+            conn.executemany("INSERT INTO bookmarks(parent, position, title, url) VALUES (?, ?, ?, ?)",
+                             ((parent, offset + i, title, url) for i, (title, url) in enumerate(entries)))
+    conn.close()
+
+    toolbar = QToolBar()
+    toolbar.resize(1280, 32)
+    bar = bookmarks.BookmarkBar(store)
+    toolbar.addWidget(bar)
+    show = elapsed(app, lambda: (toolbar.show(), bar.relayout()))
+    resize = statistics.median(elapsed(app, lambda w=w: (toolbar.resize(w, 32), bar.relayout()))
+                               for w in (800, 1920, 1024, 1600, 1280))
+    folder_button = bar.buttons[0]
+    menu = folder_button.menu()
+    open_menu = elapsed(app, menu.populate)
+    print(f"bar       {len(entries):>7} on the bar  "
+          f"show {show:7.1f} ms  resize {resize:6.1f} ms  open folder {open_menu:6.1f} ms  "
+          f"buttons {len(bar.buttons)}")
+    toolbar.close()
+
+    if legacy_count:
+        legacy = QToolBar()
+        legacy.resize(1280, 32)
+        urls = entries[:legacy_count]
+
+        def build():
+            for title, url in urls:
+                btn = QPushButton(title)
+                btn.setFlat(True)
+                legacy.addWidget(btn)
+            legacy.show()
+
+        print(f"legacy    {len(urls):>7} buttons on a QToolBar  build {elapsed(app, build):9.1f} ms")
+        legacy.close()
+    store.close()
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=50000)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--legacy", type=int, default=5000, help="buttons for the legacy bar, 0 to skip")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    tree = fake_tree(args.entries)
+    with tempfile.TemporaryDirectory() as root:
+        html = os.path.join(root, "bookmarks.html")
+        chrome = os.path.join(root, "Bookmarks")
+        write_netscape(html, tree)
+        write_chrome(chrome, tree)
+        time_import(root, "netscape", html, args.runs)
+        time_import(root, "chrome", chrome, args.runs)
+        bench_bar(app, root, tree, args.legacy)
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,119 @@
+"""Content blocker benchmark: compile, cache load and per-request checks
+
+Run with: python benchmarks/bench_content_blocking.py [--lists easylist.txt ...]
+                                                      [--log requests.jsonl]
+
+--log replays requests recorded by the browser (set FILTER_RECORD_FILE in
+main.py); without it a synthetic log is generated. Without --lists a
+synthetic EasyList-shaped list of --rules filters is used.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import blocklist
+
+WORDS = ("ad", "ads", "banner", "track", "pixel", "analytics", "beacon", "promo", "sponsor",
+         "metrics", "stats", "tag", "widget", "popup", "affiliate", "click", "count", "impression")
+TYPES = ("script", "image", "stylesheet", "xmlhttprequest", "subdocument", "font", "media", "other")
+
+def synthetic_list(count, rng):
+    """EasyList-like mix: mostly ||host^ rules, then paths, options and exceptions"""
+    lines = ["[Adblock Plus 2.0]", "! Synthetic benchmark list"]
+    for i in range(count):
+        word = WORDS[i % len(WORDS)]
+        kind = rng.random()
+        if kind < 0.55:
+            lines.append(f"||{word}{i}.example{i % 997}.com^")
+        elif kind < 0.65:
+            lines.append(f"||{word}-{i}.net^$third-party")
+        elif kind < 0.85:
+            lines.append(f"/{word}/{i}/*.{rng.choice(('js', 'gif', 'png'))}")
+        elif kind < 0.92:
+            lines.append(f"&{word}_{i}=")
+        elif kind < 0.96:
+            lines.append(f"||cdn{i}.com/{word}/$script,domain=site{i % 50}.com")
+        elif kind < 0.98:
+            lines.append(f"@@||{word}{i}.example{i % 997}.com/allowed/")
+        else:
+            lines.append(f"example{i}.org##.{word}-box")
+    return lines
+
+def synthetic_log(count, rng, rules):
+    """Mostly ordinary requests with a share of blockable ones"""
+    records = []
+    for _ in range(count):
+        page = f"https://www.site{rng.randrange(200)}.com/article/{rng.randrange(10**6)}"
+        roll = rng.random()
+        if roll < 0.15:
+            i = rng.randrange(rules)
+            url = f"https://{WORDS[i % len(WORDS)]}{i}.example{i % 997}.com/x.js"
+        elif roll < 0.25:
+            i = rng.randrange(rules)
+            url = f"https://static.site{rng.randrange(200)}.com/{WORDS[i % len(WORDS)]}/{i}/a.js"
+        else:
+            url = (f"https://static.site{rng.randrange(200)}.com/assets/"
+                   f"{rng.choice(('app', 'vendor', 'main', 'chunk'))}.{rng.randrange(10**8):x}.js"
+                   f"?v={rng.randrange(1000)}")
+        records.append({"url": url, "page": page, "type": rng.choice(TYPES)})
+    return records
+
+def load_log(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lists", nargs="*", default=[])
+    parser.add_argument("--log")
+    parser.add_argument("--rules", type=int, default=60000)
+    parser.add_argument("--requests", type=int, default=100000)
+    args = parser.parse_args()
+    rng = random.Random(1)
+
+    with tempfile.TemporaryDirectory() as root:
+        paths = args.lists
+        if not paths:
+            paths = [os.path.join(root, "synthetic.txt")]
+            with open(paths[0], "w", encoding="utf-8") as f:
+                f.write("\n".join(synthetic_list(args.rules, rng)))
+        cache = os.path.join(root, "filters.cache")
+
+        start = time.perf_counter()
+        engine, cached = blocklist.load_engine(paths, cache)
+        compile_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        engine, cached = blocklist.load_engine(paths, cache)
+        cache_ms = (time.perf_counter() - start) * 1000
+        print(f"{len(engine)} filters: compile {compile_ms:.0f} ms, "
+              f"cache load {cache_ms:.0f} ms (hit: {cached})")
+
+    records = load_log(args.log) if args.log else synthetic_log(args.requests, rng, args.rules)
+    requests = [(r["url"], r.get("page", ""), r.get("type", "other")) for r in records]
+
+    # First pass compiles the regexes that are hit; time the steady state
+    for request in requests:
+        engine.should_block(*request)
+    samples = []
+    blocked = 0
+    clock = time.perf_counter
+    for url, page, kind in requests:
+        start = clock()
+        hit = engine.should_block(url, page, kind)
+        samples.append(clock() - start)
+        blocked += hit
+    samples.sort()
+    us = [s * 1e6 for s in samples]
+    print(f"{len(requests)} requests, {blocked} blocked ({blocked / len(requests):.1%})")
+    print(f"per request: mean {statistics.mean(us):.1f} us  p50 {us[len(us) // 2]:.1f} us  "
+          f"p99 {us[int(len(us) * 0.99)]:.1f} us  max {us[-1]:.1f} us")
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,178 @@
+"""Page content index benchmark over a corpus of local fixture pages
+
+Run with: python benchmarks/bench_content_index.py [--pages 2000] [--heavy 20] [--budget 2000000]
+
+Writes --pages HTML pages (a tenth of them mirrors of others, plus
+--heavy pages of several MB), serves them from the fixture server and
+extracts their text, standing in for QWebEnginePage.toPlainText. The
+text is then indexed twice: without a budget for raw throughput, and
+with --budget while the main thread runs a 1 ms tick loop,
+whose worst overshoot is what the GUI would stall. Last, queries drawn
+from the corpus are timed against the finished index.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import threading
+import statistics
+import urllib.request
+from html.parser import HTMLParser
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixture_server import FixtureServer
+import contentindex
+
+WORDS = ("dashboard metrics error report build release deploy status python qt "
+         "browser kiosk network latency cache profile session render download "
+         "invoice customer order search index query admin settings wiki docs "
+         "timeout refused gateway upstream certificate expired quota exceeded").split()
+SYLLABLES = "ka lo mi ne ru ta vo zi be da fu gi ho ju ke ly".split()
+
+def vocabulary(rng, size=20000):
+    """WORDS plus made-up words, with Zipf weights so a few are common and most are rare"""
+    words = list(WORDS)
+    seen = set(words)
+    while len(words) < size:
+        word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 5)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words, [1 / (rank + 1) for rank in range(len(words))]
+
+class TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+        self.skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style"):
+            self.skip += 1
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style"):
+            self.skip -= 1
+
+    def handle_data(self, data):
+        if not self.skip:
+            self.parts.append(data)
+
+def page_text(html):
+    extractor = TextExtractor()
+    extractor.feed(html)
+    return "\n".join(extractor.parts)
+
+def write_corpus(directory, pages, heavy, seed=1):
+    """Returns (path, title) per page; every 10th page mirrors an earlier one"""
+    rng = random.Random(seed)
+    words, weights = vocabulary(rng)
+    corpus = []
+    written = []
+    for i in range(pages + heavy):
+        if i < pages and i % 10 == 9:
+            title, html = rng.choice(written)
+        else:
+            title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 6))).title()
+            paragraphs = rng.randint(1000, 2000) if i >= pages else rng.randint(5, 40)
+            body = "\n".join(
+                "<p>" + " ".join(rng.choices(words, weights, k=rng.randint(20, 120)))
+                + f" E{rng.randrange(100000):05d}</p>"
+                for _ in range(paragraphs)
+            )
+            html = (f"<html><head><title>{title}</title><style>p {{ margin: 0 }}</style></head>"
+                    f"<body><h1>{title}</h1>{body}</body></html>")
+            written.append((title, html))
+        name = f"page{i}.html"
+        with open(os.path.join(directory, name), "w", encoding="utf-8") as f:
+            f.write(html)
+        corpus.append((name, title))
+    return corpus
+
+def index_all(path, texts, budget):
+    index = contentindex.ContentIndex(path, budget=budget)
+    add = []
+    start = time.perf_counter()
+    for url, title, text in texts:
+        # Keep the writer fed without tripping the backlog limit
+        while index.queue.qsize() >= contentindex.MAX_BACKLOG - 1:
+            time.sleep(0.001)
+        t = time.perf_counter()
+        index.add(url, title, text)
+        add.append((time.perf_counter() - t) * 1e6)
+    return index, start, add
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--heavy", type=int, default=20, help="pages of several MB")
+    parser.add_argument("--budget", type=int, default=2000000, help="characters per second")
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        www = os.path.join(root, "www")
+        os.makedirs(www)
+        corpus = write_corpus(www, args.pages, args.heavy)
+        texts = []
+        with FixtureServer(www) as server:
+            for name, title in corpus:
+                url = f"{server.base_url}/{name}"
+                with urllib.request.urlopen(url) as response:
+                    texts.append((url, title, page_text(response.read().decode("utf-8"))))
+        chars = sum(len(text) for _, _, text in texts)
+        print(f"corpus   {len(texts)} pages, {chars / 2**20:.1f} M chars "
+              f"({args.heavy} heavy, largest {max(len(t) for _, _, t in texts) / 2**20:.1f} M)")
+
+        index, start, add = index_all(os.path.join(root, "raw.sqlite"), texts, budget=0)
+        index.flush()
+        elapsed = time.perf_counter() - start
+        stats = index.stats
+        print(f"index    unthrottled {elapsed:6.2f} s  {stats['chars'] / elapsed / 2**20:5.2f} M chars/s  "
+              f"{stats['pages'] / elapsed:6.0f} pages/s  deduplicated {stats['deduplicated']}  "
+              f"add() median {statistics.median(add):.1f} us")
+        index.close()
+
+        # The GUI thread's view: how late does a 1 ms timer fire while indexing?
+        late = []
+        done = threading.Event()
+        budget_index = [None]
+
+        def feed():
+            budget_index[0], _, _ = index_all(os.path.join(root, "budget.sqlite"), texts, args.budget)
+            budget_index[0].flush()
+            done.set()
+
+        start = time.perf_counter()
+        threading.Thread(target=feed, daemon=True).start()
+        while not done.is_set():
+            t = time.perf_counter()
+            time.sleep(0.001)
+            late.append((time.perf_counter() - t) * 1000 - 1)
+        elapsed = time.perf_counter() - start
+        late.sort()
+        print(f"budget   {elapsed:6.2f} s  main-thread tick overshoot  p50 {late[len(late) // 2]:5.2f} ms  "
+              f"p99 {late[int(len(late) * 0.99)]:5.2f} ms  max {late[-1]:6.2f} ms")
+        index = budget_index[0]
+
+        rng = random.Random(3)
+        queries = [" ".join(rng.sample(WORDS, rng.randint(1, 2))) for _ in range(args.queries // 2)]
+        queries += [f"E{rng.randrange(100000):05d}" for _ in range(args.queries // 4)]
+        queries += [rng.choice(WORDS)[:3] for _ in range(args.queries // 4)]  # as-you-type prefixes
+        samples = []
+        hits = 0
+        for query in queries:
+            t = time.perf_counter()
+            hits += bool(index.search(query))
+            samples.append((time.perf_counter() - t) * 1000)
+        samples.sort()
+        size = os.path.getsize(os.path.join(root, "budget.sqlite")) / 2**20
+        print(f"search   {len(queries)} queries, {hits} with results  median {statistics.median(samples):6.2f} ms  "
+              f"p99 {samples[int(len(samples) * 0.99)]:6.2f} ms  index {size:.1f} MB")
+        index.close()
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,116 @@
+"""Favicon cache benchmark: lookup latency, store throughput, dedup and eviction
+
+Run with: python benchmarks/bench_favicons.py [--hosts 5000] [--distinct 500]
+
+Stores an icon for each of --hosts hosts, drawn from --distinct
+different images (sites on a shared platform share one favicon), then
+times lookups from the memory LRU, from disk in a fresh cache (a
+restarted browser) and for unknown hosts. "decode" is what every tab
+used to pay per icon: building a QIcon from the PNG bytes. A last run
+with a small disk limit checks that eviction keeps the store under it.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtCore import QBuffer, QIODevice
+from PyQt5.QtGui import QGuiApplication, QIcon, QPixmap, QImage, QColor, QPainter
+
+import favicons
+
+def fake_icons(count, size=32, seed=1):
+    rng = random.Random(seed)
+    icons = []
+    for _ in range(count):
+        image = QImage(size, size, QImage.Format_ARGB32)
+        image.fill(QColor(rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+        painter = QPainter(image)
+        for _ in range(6):
+            painter.fillRect(rng.randrange(size), rng.randrange(size), rng.randint(2, 12), rng.randint(2, 12),
+                             QColor(rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+        painter.end()
+        icons.append(QIcon(QPixmap.fromImage(image)))
+    return icons
+
+def png_bytes(icon):
+    buffer = QBuffer()
+    buffer.open(QIODevice.WriteOnly)
+    icon.pixmap(32, 32).save(buffer, "PNG")
+    return bytes(buffer.data())
+
+def timed(action, items):
+    samples = []
+    for item in items:
+        start = time.perf_counter()
+        action(item)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples)
+
+def disk_usage(directory):
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, names in os.walk(directory) for name in names if name.endswith(".png"))
+
+def fill(app, cache, urls, icons):
+    start = time.perf_counter()
+    for i, url in enumerate(urls):
+        cache.store(url, icons[i % len(icons)])
+    gui_ms = (time.perf_counter() - start) * 1000
+    cache.executor.submit(lambda: None).result()
+    app.processEvents()
+    return gui_ms, (time.perf_counter() - start) * 1000
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hosts", type=int, default=5000)
+    parser.add_argument("--distinct", type=int, default=500)
+    parser.add_argument("--lookups", type=int, default=20000)
+    args = parser.parse_args()
+
+    app = QGuiApplication(sys.argv)
+    icons = fake_icons(args.distinct)
+    urls = [f"https://site{i}.example/page" for i in range(args.hosts)]
+    rng = random.Random(2)
+
+    with tempfile.TemporaryDirectory() as root:
+        directory = os.path.join(root, "favicons")
+        cache = favicons.FaviconCache(directory, max_icons=args.distinct)
+        gui_ms, total_ms = fill(app, cache, urls, icons)
+        full = disk_usage(directory)
+        print(f"store    {args.hosts} hosts, {args.distinct} images  GUI thread {gui_ms:7.1f} ms  "
+              f"written {total_ms:7.1f} ms  files {cache.stats['stored'] - cache.stats['deduplicated']}  "
+              f"disk {full / 1024:.0f} KB")
+
+        sample = [rng.choice(urls) for _ in range(args.lookups)]
+        print(f"memory   median {timed(cache.lookup, sample):6.2f} us")
+        cache.shutdown()
+
+        # A fresh cache over the same directory, as after a restart
+        cache = favicons.FaviconCache(directory, max_icons=args.distinct)
+        cold = rng.sample(urls, min(len(urls), 2000))
+        print(f"disk     median {timed(cache.lookup, cold):6.2f} us  (first lookup after restart)")
+        unknown = [f"https://other{i}.example/" for i in range(2000)]
+        print(f"miss     median {timed(cache.lookup, unknown):6.2f} us")
+        print(f"hit rate {cache.hit_rate():.1%}  {cache.stats}")
+        cache.shutdown()
+
+        data = [png_bytes(icon) for icon in icons]
+        print(f"decode   median {timed(lambda b: QIcon(QPixmap.fromImage(QImage.fromData(b))), data * 4):6.2f} us  "
+              f"(uncached, per tab)")
+
+        limit = full // 4
+        small = favicons.FaviconCache(os.path.join(root, "small"), max_disk_bytes=limit)
+        fill(app, small, urls, icons)
+        usage = disk_usage(small.directory)
+        print(f"evict    limit {limit / 1024:.0f} KB  disk {usage / 1024:.0f} KB  "
+              f"files evicted {small.stats['evicted_disk']}")
+        small.shutdown()
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,98 @@
+"""History store benchmark: batched writes and FTS queries over a large history
+
+Run with: python benchmarks/bench_history.py [--rows 1000000]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import history
+
+WORDS = ("dashboard metrics error report build release deploy status python qt "
+         "browser kiosk network latency cache profile session render download "
+         "invoice customer order search index query admin settings wiki docs").split()
+HOSTS = [f"{w}{i}.example.com" for i, w in enumerate(WORDS * 8)]
+
+def fake_page(rng, i):
+    host = rng.choice(HOSTS)
+    path = "/".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+    title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 7))).title()
+    return f"https://{host}/{path}?id={i}", f"{title} {i}"
+
+def populate(path, rows, seed=1):
+    """Bulk-load rows directly so generating 1M entries stays quick"""
+    rng = random.Random(seed)
+    now = time.time()
+    store = history.HistoryStore(path)
+    store.close()
+    conn = history.connect(path)
+    with conn:
+        conn.executemany(
+            "INSERT INTO urls(url, title, visit_count, last_visit) VALUES (?, ?, ?, ?)",
+            ((*fake_page(rng, i), rng.randint(1, 50), now - rng.random() * 86400 * 365)
+             for i in range(rows))
+        )
+    conn.close()
+
+def time_queries(store, queries, repeat):
+    results = {}
+    for label, text in queries:
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            store.query(text, limit=100)
+            samples.append((time.perf_counter() - start) * 1000)
+        results[label] = samples
+    return results
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--visits", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "history.sqlite")
+        start = time.perf_counter()
+        populate(path, args.rows)
+        print(f"generated {args.rows} rows in {time.perf_counter() - start:.1f} s")
+
+        store = history.HistoryStore(path)
+
+        # GUI-side cost of recording visits; disk work happens on the writer
+        rng = random.Random(2)
+        pages = [fake_page(rng, args.rows + i) for i in range(args.visits)]
+        start = time.perf_counter()
+        for url, title in pages:
+            store.record_visit(url, title)
+        enqueue = time.perf_counter() - start
+        store.flush()
+        written = time.perf_counter() - start
+        store.close()
+        print(f"record_visit x{args.visits}: {enqueue / args.visits * 1e6:.1f} us/call on caller, "
+              f"{args.visits / written:,.0f} visits/s written")
+
+        store = history.HistoryStore(path)
+        queries = [
+            ("recent page", ""),
+            ("rare term", "invoice 4242"),
+            ("long word", "dashboards"),
+            ("common term", "dashboard"),
+            ("prefix", "kio"),
+            ("two terms", "release status"),
+            ("host", "cache12.example"),
+        ]
+        for label, samples in time_queries(store, queries, args.repeat).items():
+            print(f"{label:<12} median {statistics.median(samples):7.2f} ms  "
+                  f"p95 {sorted(samples)[int(len(samples) * 0.95) - 1]:7.2f} ms")
+        store.close()
+
+if __name__ == "__main__":
+    run()
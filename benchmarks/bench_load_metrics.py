@@ -0,0 +1,92 @@
+"""Load metrics overhead: per-load recording cost and export/scrape latency
+
+Run with: python benchmarks/bench_load_metrics.py [--loads 100000] [--domains 200]
+
+"record" is what the GUI thread pays per finished load: the loadFinished
+bookkeeping plus folding one Navigation Timing result into the
+histograms (the page round trip itself is asynchronous). "export" renders
+the Prometheus text for every domain; "scrape" fetches it over HTTP
+from the localhost endpoint while recording continues.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+import threading
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtCore import QCoreApplication, QUrl
+
+import loadmetrics
+
+def fake_loads(count, domains, seed=1):
+    rng = random.Random(seed)
+    hosts = [QUrl(f"https://app{i}.corp.example/dashboard") for i in range(domains)]
+    for _ in range(count):
+        ttfb = rng.lognormvariate(5, 0.8)
+        dcl = ttfb + rng.lognormvariate(6, 0.6)
+        yield rng.choice(hosts), {
+            "ttfb": ttfb, "dom_content_loaded": dcl, "load_event": dcl + rng.lognormvariate(5, 1),
+            "first_paint": dcl * 0.8, "first_contentful_paint": dcl * 0.85
+        }
+
+def percentile(samples, p):
+    samples = sorted(samples)
+    return samples[min(int(len(samples) * p), len(samples) - 1)]
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--loads", type=int, default=100000)
+    parser.add_argument("--domains", type=int, default=200)
+    parser.add_argument("--scrapes", type=int, default=50)
+    args = parser.parse_args()
+
+    app = QCoreApplication(sys.argv)  # noqa: F841
+    metrics = loadmetrics.LoadMetrics(max_domains=args.domains)
+    loads = list(fake_loads(args.loads, args.domains))
+
+    samples = []
+    for url, timing in loads:
+        start = time.perf_counter()
+        # record() without a page: failed loads skip the JavaScript round trip
+        metrics.record(None, url, start, False)
+        metrics.on_timing(metrics.domain(url), timing)
+        samples.append((time.perf_counter() - start) * 1e6)
+    print(f"record   {args.loads} loads over {args.domains} domains  "
+          f"median {statistics.median(samples):6.2f} us  p99 {percentile(samples, 0.99):6.2f} us")
+
+    export = [0.0] * 5
+    for i in range(len(export)):
+        start = time.perf_counter()
+        text = metrics.exposition()
+        export[i] = (time.perf_counter() - start) * 1000
+    print(f"export   {len(text.splitlines())} lines, {len(text) / 1024:.0f} KB  "
+          f"median {statistics.median(export):6.2f} ms")
+
+    host, port = metrics.serve(0)
+    running = True
+
+    def keep_recording():
+        while running:
+            for url, timing in loads[:1000]:
+                metrics.on_timing(metrics.domain(url), timing)
+
+    writer = threading.Thread(target=keep_recording, daemon=True)
+    writer.start()
+    scrapes = []
+    for _ in range(args.scrapes):
+        start = time.perf_counter()
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics") as response:
+            response.read()
+        scrapes.append((time.perf_counter() - start) * 1000)
+    running = False
+    writer.join()
+    metrics.shutdown()
+    print(f"scrape   median {statistics.median(scrapes):6.2f} ms  p99 {percentile(scrapes, 0.99):6.2f} ms")
+
+if __name__ == "__main__":
+    run()
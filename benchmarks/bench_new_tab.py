@@ -0,0 +1,104 @@
+"""Latency benchmark: Ctrl+T to first paint, with and without the view pool
+
+Run with: python benchmarks/bench_new_tab.py [--tabs 10] [--pool 2]
+
+The home page is served from the local fixture server so the numbers do
+not depend on the network. "open" is how long add_new_tab() blocks the
+GUI thread; "paint" is until the new view's first paint (or load finish
+where the platform does not deliver paint events).
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PyQt5.QtWebEngineWidgets import QWebEngineView  # noqa: F401 (must precede QApplication)
+from PyQt5.QtCore import QObject, QEvent, QEventLoop, QTimer, QStandardPaths
+from PyQt5.QtWidgets import QApplication
+
+import main
+from fixture_server import FixtureServer
+
+HOME_PAGE = "<!doctype html><title>Home</title><h1>Home</h1>" + "<p>lorem ipsum</p>" * 200
+
+class PaintWatcher(QObject):
+    """Quits a loop on the first paint of a widget"""
+    def __init__(self, loop):
+        super().__init__()
+        self.loop = loop
+
+    def eventFilter(self, obj, event):
+        if event.type() in (QEvent.Paint, QEvent.UpdateRequest):
+            self.loop.quit()
+        return False
+
+def wait_for_paint(tab, timeout=10000):
+    loop = QEventLoop()
+    watcher = PaintWatcher(loop)
+    proxy = tab.browser.focusProxy()
+    if proxy is not None:
+        proxy.installEventFilter(watcher)
+    tab.browser.loadFinished.connect(loop.quit)
+    QTimer.singleShot(timeout, loop.quit)
+    loop.exec_()
+    if proxy is not None:
+        proxy.removeEventFilter(watcher)
+
+def settle(app, ms):
+    """Run the event loop for ms so the pool can refill"""
+    loop = QEventLoop()
+    QTimer.singleShot(ms, loop.quit)
+    loop.exec_()
+
+def measure(app, pool_size, count):
+    main.VIEW_POOL_SIZE = pool_size
+    main.VIEW_POOL_REFILL_DELAY = 100
+    window = main.Window()
+    window.session.enabled = False
+    window.show()
+    wait_for_paint(window.current_tab())
+
+    opens, paints = [], []
+    for _ in range(count):
+        settle(app, 1500)
+        start = time.perf_counter()
+        tab = window.add_new_tab()
+        opens.append((time.perf_counter() - start) * 1000)
+        wait_for_paint(tab)
+        paints.append((time.perf_counter() - start) * 1000)
+
+    stats = dict(window.view_pool.stats)
+    window.close()
+    window.deleteLater()
+    app.processEvents()
+    return opens, paints, stats
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tabs", type=int, default=10)
+    parser.add_argument("--pool", type=int, default=2)
+    args = parser.parse_args()
+
+    QStandardPaths.setTestModeEnabled(True)
+    app = QApplication(sys.argv)
+    app.setApplicationName("Fibrowser Pro Bench")
+
+    with tempfile.TemporaryDirectory() as root:
+        with open(os.path.join(root, "index.html"), "w") as f:
+            f.write(HOME_PAGE)
+        with FixtureServer(root) as server:
+            main.DEFAULT_HOME_PAGE = f"{server.base_url}/index.html"
+            for label, size in (("no pool", 0), (f"pool={args.pool}", args.pool)):
+                opens, paints, stats = measure(app, size, args.tabs)
+                print(f"{label:<10} open median {statistics.median(opens):7.1f} ms  "
+                      f"paint median {statistics.median(paints):7.1f} ms  "
+                      f"max {max(paints):7.1f} ms  hits {stats['hits']}")
+
+if __name__ == "__main__":
+    run()
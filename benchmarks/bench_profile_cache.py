@@ -0,0 +1,123 @@
+"""Repeat-load latency with cold, pre-warmed and warm disk caches
+
+Run with: python benchmarks/bench_profile_cache.py [--assets 30] [--asset-kb 200] [--runs 3]
+
+A page with many scripts, stylesheets and images is served by the local
+fixture server with a per-connection bandwidth cap and a long
+Cache-Control max-age, standing in for a heavy internal app. Each run
+uses fresh profiles with their own cache directories:
+
+    cold       first load into an empty cache
+    prewarmed  first visit after BrowserProfile pre-warmed the URL at idle
+    warm       second visit with the same profile
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PyQt5.QtWebEngineWidgets import QWebEnginePage
+from PyQt5.QtCore import QEventLoop, QTimer, QUrl
+from PyQt5.QtWidgets import QApplication
+
+import browserprofile
+from fixture_server import FixtureServer
+
+def write_site(root, assets, asset_kb):
+    tags = []
+    for i in range(assets):
+        kind = ("js", "css", "png")[i % 3]
+        with open(os.path.join(root, f"asset{i}.{kind}"), "wb") as f:
+            if kind == "png":
+                f.write(os.urandom(asset_kb * 1024))
+            else:
+                comment = "/* " + "x" * (asset_kb * 1024 - 6) + " */"
+                f.write(comment.encode())
+        if kind == "js":
+            tags.append(f'<script src="asset{i}.{kind}"></script>')
+        elif kind == "css":
+            tags.append(f'<link rel="stylesheet" href="asset{i}.{kind}">')
+        else:
+            tags.append(f'<img src="asset{i}.{kind}" width="1" height="1">')
+    with open(os.path.join(root, "app.html"), "w") as f:
+        f.write("<!doctype html><title>Internal app</title>" + "".join(tags) + "<h1>App</h1>")
+
+def wait(signal, timeout=60000):
+    loop = QEventLoop()
+    result = []
+    signal.connect(lambda *args: (result.append(args), loop.quit()))
+    QTimer.singleShot(timeout, loop.quit)
+    loop.exec_()
+    return result[0] if result else None
+
+def timed_load(browser_profile, url):
+    """Load url in a new page; return (ms, cache probe result)"""
+    page = QWebEnginePage(browser_profile.profile)
+    start = time.perf_counter()
+    page.load(QUrl(url))
+    wait(page.loadFinished)
+    elapsed = (time.perf_counter() - start) * 1000
+    probe = []
+    page.runJavaScript(browserprofile.CACHE_PROBE_JS, probe.append)
+    loop = QEventLoop()
+    QTimer.singleShot(200, loop.quit)
+    loop.exec_()
+    page.deleteLater()
+    return elapsed, probe[0] if probe else {}
+
+def new_profile(root, name, **settings):
+    return browserprofile.BrowserProfile(
+        name,
+        storage_path=os.path.join(root, name, "storage"),
+        cache_path=os.path.join(root, name, "cache"),
+        cache_size=256 * 1024 * 1024,
+        **settings
+    )
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--assets", type=int, default=30)
+    parser.add_argument("--asset-kb", type=int, default=200)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--rate-limit", type=int, default=2 * 1024 * 1024, help="bytes/s per connection")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)  # noqa: F841
+    results = {"cold": [], "prewarmed": [], "warm": []}
+    hits = {"cold": [], "prewarmed": [], "warm": []}
+
+    with tempfile.TemporaryDirectory() as root:
+        www = os.path.join(root, "www")
+        os.makedirs(www)
+        write_site(www, args.assets, args.asset_kb)
+        with FixtureServer(www, rate_limit=args.rate_limit, cache_control="max-age=3600") as server:
+            url = f"{server.base_url}/app.html"
+            for run_number in range(args.runs):
+                profile = new_profile(root, f"bench-{run_number}")
+                for scenario in ("cold", "warm"):
+                    ms, probe = timed_load(profile, url)
+                    results[scenario].append(ms)
+                    hits[scenario].append(f"{probe.get('cached', 0)}/{probe.get('resources', 0)}")
+
+                warmed = new_profile(root, f"bench-prewarm-{run_number}",
+                                     prewarm_urls=[url], prewarm_delay=0, min_free_memory=0)
+                warmed.start_prewarm()
+                wait(warmed.statsChanged)
+                ms, probe = timed_load(warmed, url)
+                results["prewarmed"].append(ms)
+                hits["prewarmed"].append(f"{probe.get('cached', 0)}/{probe.get('resources', 0)}")
+
+    payload = args.assets * args.asset_kb / 1024
+    print(f"{args.assets} assets, {payload:.1f} MB, {args.rate_limit / 2**20:.1f} MB/s per connection")
+    for scenario, samples in results.items():
+        print(f"{scenario:<10} median {statistics.median(samples):8.1f} ms  "
+              f"from cache {', '.join(hits[scenario])}")
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,80 @@
+"""Throughput benchmark: headless batch rendering at different pool sizes
+
+Run with: python benchmarks/bench_render.py [--pages 40] [--pools 1 2 4 8] [--format pdf]
+
+Pages are served by the local fixture server and carry a little script
+work so render time is not just I/O.
+"""
+import os
+import sys
+import queue
+import argparse
+import tempfile
+import statistics
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PyQt5.QtWebEngineWidgets import QWebEngineView  # noqa: F401 (must precede QApplication)
+from PyQt5.QtCore import QEventLoop
+from PyQt5.QtWidgets import QApplication
+
+import render
+from fixture_server import FixtureServer
+
+PAGE = """<!doctype html><title>Dashboard {0}</title>
+<h1>Dashboard {0}</h1><table id="t"></table>
+<script>
+var t = document.getElementById("t");
+for (var i = 0; i < 400; i++) {{
+  var row = t.insertRow();
+  for (var j = 0; j < 6; j++) row.insertCell().textContent = (i * j) % 97;
+}}
+</script>"""
+
+def render_batch(urls, out_dir, fmt, pool):
+    url_queue = queue.Queue()
+    for url in urls:
+        url_queue.put(url)
+    url_queue.put(render.NO_MORE)
+
+    renderer = render.BatchRenderer(url_queue, out_dir, format=fmt, pool=pool, page_timeout=60)
+    records = []
+    summary = {}
+    loop = QEventLoop()
+    renderer.pageDone.connect(records.append)
+    renderer.finished.connect(lambda s: (summary.update(s), loop.quit()))
+    renderer.start()
+    loop.exec_()
+    renderer.deleteLater()
+    return summary, records
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--pools", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--format", choices=render.FORMATS, default="pdf")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)  # noqa: F841
+
+    with tempfile.TemporaryDirectory() as root:
+        www = os.path.join(root, "www")
+        os.makedirs(www)
+        for i in range(args.pages):
+            with open(os.path.join(www, f"d{i}.html"), "w") as f:
+                f.write(PAGE.format(i))
+        with FixtureServer(www) as server:
+            urls = [f"{server.base_url}/d{i}.html" for i in range(args.pages)]
+            render_batch(urls[:2], os.path.join(root, "warmup"), args.format, 1)
+            for pool in args.pools:
+                summary, records = render_batch(urls, os.path.join(root, f"out{pool}"),
+                                                args.format, pool)
+                totals = [r["total_ms"] for r in records if r["ok"]]
+                print(f"pool={pool:<3} {summary['pages_per_min']:8.1f} pages/min  "
+                      f"median page {statistics.median(totals) if totals else 0:7.1f} ms  "
+                      f"failed {summary['failed']}")
+
+if __name__ == "__main__":
+    run()
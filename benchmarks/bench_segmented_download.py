@@ -0,0 +1,115 @@
+"""Throughput benchmark: segmented downloader vs. a single stream
+
+Run with: python benchmarks/bench_segmented_download.py [--size-mb 64] [--rate-limit-mb 8]
+
+The fixture server caps bandwidth per connection, which is how most CDNs
+and artifact servers behave, so a single stream is bound by that cap.
+--stock additionally times the same file through QtWebEngine's own
+download path (needs a working QtWebEngine).
+"""
+import os
+import sys
+import time
+import hashlib
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import segmented
+from fixture_server import FixtureServer
+
+def sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def time_segmented(url, dest, segments):
+    if os.path.exists(dest):
+        os.remove(dest)
+    start = time.perf_counter()
+    segmented.SegmentedDownload(url, dest, segments=segments).run()
+    return time.perf_counter() - start
+
+def check_resume(url, dest, segments, expected):
+    """Cancel part way through, then finish from the journal"""
+    if os.path.exists(dest):
+        os.remove(dest)
+
+    def progress(received, total):
+        if received >= total * 0.4:
+            job.cancel()
+
+    job = segmented.SegmentedDownload(url, dest, segments=segments, progress=progress)
+    try:
+        job.run()
+        return "finished before cancel"
+    except segmented.DownloadCancelled:
+        pass
+    done = job.received()
+    resumed = segmented.SegmentedDownload(url, dest, segments=segments)
+    resumed.run()
+    status = "ok" if sha256(dest) == expected else "CORRUPT"
+    return f"{status} (resumed at {done / job.size:.0%})"
+
+def time_stock(url, dest):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWebEngineWidgets import QWebEnginePage, QWebEngineProfile
+    from PyQt5.QtCore import QUrl
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    page = QWebEnginePage()
+
+    def on_requested(download):
+        download.setDownloadDirectory(os.path.dirname(dest))
+        download.setDownloadFileName(os.path.basename(dest))
+        download.finished.connect(app.quit)
+        download.accept()
+
+    QWebEngineProfile.defaultProfile().downloadRequested.connect(on_requested)
+    start = time.perf_counter()
+    page.download(QUrl(url))
+    app.exec_()
+    return time.perf_counter() - start
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=64)
+    parser.add_argument("--rate-limit-mb", type=float, default=8.0,
+                        help="per-connection cap in MB/s (0 = unlimited)")
+    parser.add_argument("--segments", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--stock", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        serve_dir = os.path.join(root, "www")
+        os.makedirs(serve_dir)
+        source = os.path.join(serve_dir, "artifact.bin")
+        with open(source, "wb") as f:
+            for _ in range(args.size_mb):
+                f.write(os.urandom(1024 * 1024))
+        expected = sha256(source)
+        size = os.path.getsize(source)
+        dest = os.path.join(root, "out", "artifact.bin")
+
+        rate = int(args.rate_limit_mb * 1024 * 1024)
+        with FixtureServer(serve_dir, rate_limit=rate) as server:
+            url = f"{server.base_url}/artifact.bin"
+            print(f"{args.size_mb} MB file, per-connection cap "
+                  f"{args.rate_limit_mb or 'none'} MB/s")
+            for n in args.segments:
+                elapsed = time_segmented(url, dest, n)
+                ok = "ok" if sha256(dest) == expected else "CORRUPT"
+                print(f"segments={n:<3} {elapsed:7.2f} s  {size / elapsed / 2**20:8.1f} MB/s  {ok}")
+            print(f"resume:       {check_resume(url, dest, max(args.segments), expected)}")
+            if args.stock:
+                stock_dest = os.path.join(root, "out", "stock.bin")
+                elapsed = time_stock(url, stock_dest)
+                print(f"stock         {elapsed:7.2f} s  {size / elapsed / 2**20:8.1f} MB/s")
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,70 @@
+"""Startup benchmark: restoring N saved tabs vs. opening one
+
+Run with: python benchmarks/bench_session_restore.py [--tabs 100] [--runs 5]
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtWebEngineWidgets import QWebEngineView  # noqa: F401 (must precede QApplication)
+from PyQt5.QtCore import QStandardPaths
+from PyQt5.QtWidgets import QApplication
+
+import main
+import session
+
+def write_session(count):
+    """Write a session file with count tabs"""
+    path = main.app_data_path(main.SESSION_FILE)
+    if count == 0:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    tabs = [{"url": f"about:blank#tab{i}", "title": f"Tab {i}", "history": None}
+            for i in range(count)]
+    store = session.SessionStore(path, lambda: {"current": 0, "tabs": tabs})
+    store.save()
+
+def time_startup(app, count, runs):
+    """Return startup times (ms) for a session with count tabs"""
+    samples = []
+    for _ in range(runs):
+        write_session(count)
+        start = time.perf_counter()
+        window = main.Window()
+        window.show()
+        app.processEvents()
+        samples.append((time.perf_counter() - start) * 1000)
+        window.session.enabled = False
+        window.close()
+        window.deleteLater()
+        app.processEvents()
+    return samples
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tabs", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    QStandardPaths.setTestModeEnabled(True)
+    app = QApplication(sys.argv)
+    app.setApplicationName("Fibrowser Pro Bench")
+
+    # Warm-up so renderer startup is not billed to the first case
+    time_startup(app, 0, 1)
+
+    for label, count in (("fresh (1 tab)", 0), ("restore 1 tab", 1), (f"restore {args.tabs} tabs", args.tabs)):
+        samples = time_startup(app, count, args.runs)
+        print(f"{label:<20} median {statistics.median(samples):8.1f} ms  "
+              f"min {min(samples):8.1f} ms")
+
+    write_session(0)
+
+if __name__ == "__main__":
+    run()
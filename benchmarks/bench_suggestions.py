@@ -0,0 +1,77 @@
+"""Omnibox micro-benchmark: per-keystroke suggestion latency at 500k entries
+
+Run with: python benchmarks/bench_suggestions.py [--entries 500000]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import suggestions
+
+WORDS = ("dashboard metrics error report build release deploy status python qt "
+         "browser kiosk network latency cache profile session render download "
+         "invoice customer order search index query admin settings wiki docs "
+         "github gitlab jenkins grafana kibana jira confluence").split()
+TYPED = ["github.com/qt", "grafana dash", "release notes", "jira invoice 12",
+         "kio", "https://wiki", "zzz-no-match"]
+
+def fake_rows(count, seed=1):
+    rng = random.Random(seed)
+    now = time.time()
+    hosts = [f"{w}{i}.example.com" for i, w in enumerate(WORDS * 20)] + ["github.com", "wiki.corp"]
+    for i in range(count):
+        host = rng.choice(hosts)
+        path = "/".join(rng.choice(WORDS) for _ in range(rng.randint(1, 3)))
+        title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 6))).title()
+        yield (f"https://{host}/{path}/{i}", title, rng.randint(1, 60),
+               now - rng.random() * 86400 * 200)
+
+def percentile(samples, p):
+    samples = sorted(samples)
+    return samples[min(int(len(samples) * p), len(samples) - 1)]
+
+def type_out(index, texts, repeat):
+    samples = []
+    for _ in range(repeat):
+        for text in texts:
+            for i in range(1, len(text) + 1):
+                start = time.perf_counter()
+                index.query(text[:i])
+                samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+def report(label, samples):
+    print(f"{label:<28} p50 {statistics.median(samples):6.3f} ms  "
+          f"p99 {percentile(samples, 0.99):6.3f} ms  max {max(samples):6.3f} ms")
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=500000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    index = suggestions.SuggestionIndex()
+    start = time.perf_counter()
+    index.load(fake_rows(args.entries))
+    print(f"built {len(index)} entries in {time.perf_counter() - start:.1f} s "
+          f"({len(index.token_index)} tokens)")
+
+    report("keystroke (static index)", type_out(index, TYPED, args.repeat))
+
+    # Incremental visits land in the overlay until the next rebuild
+    rng = random.Random(3)
+    urls = [e.url for e in rng.sample(index.entries, suggestions.REBUILD_THRESHOLD - 1)]
+    start = time.perf_counter()
+    for url in urls:
+        index.record_visit(url, "Visited Again Dashboard")
+    per_visit = (time.perf_counter() - start) / len(urls) * 1e6
+    print(f"record_visit                 {per_visit:6.1f} us/call ({len(index.pending)} pending)")
+    report("keystroke (full overlay)", type_out(index, TYPED, args.repeat))
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,106 @@
+"""Stress benchmark: many auto-reloading background tabs
+
+Run with: python benchmarks/bench_tab_updates.py [--tabs 200] [--seconds 20]
+
+Each tab loads a local page that retitles itself and reloads every
+--reload-ms, so every tab keeps firing urlChanged/titleChanged/
+loadProgress. The benchmark reports GUI event-loop lag (how late a 10 ms
+timer fires) and how many tab bar flushes absorbed the signals.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PyQt5.QtWebEngineWidgets import QWebEngineView  # noqa: F401 (must precede QApplication)
+from PyQt5.QtCore import QEventLoop, QTimer, QStandardPaths
+from PyQt5.QtWidgets import QApplication
+
+import main
+from fixture_server import FixtureServer
+
+PAGE = """<!doctype html><title>Page</title><body>
+<script>
+var n = Number(location.hash.slice(1) || 0);
+document.title = "Page " + n + " " + Math.random();
+setTimeout(function () { location.hash = String(n + 1); location.reload(); }, %d);
+</script></body>"""
+
+class LagProbe:
+    """Measures how late a short repeating timer fires"""
+    def __init__(self, interval=10):
+        self.interval = interval
+        self.samples = []
+        self.last = None
+        self.timer = QTimer()
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.tick)
+
+    def start(self):
+        self.last = time.perf_counter()
+        self.timer.start()
+
+    def tick(self):
+        now = time.perf_counter()
+        self.samples.append(max(0.0, (now - self.last) * 1000 - self.interval))
+        self.last = now
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tabs", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--reload-ms", type=int, default=1000)
+    args = parser.parse_args()
+
+    QStandardPaths.setTestModeEnabled(True)
+    app = QApplication(sys.argv)
+    app.setApplicationName("Fibrowser Pro Bench")
+    main.VIEW_POOL_SIZE = 0
+    main.MAX_LIVE_TABS = args.tabs + 1
+    main.TAB_FREEZE_AFTER = main.TAB_DISCARD_AFTER = 24 * 3600
+
+    with tempfile.TemporaryDirectory() as root:
+        with open(os.path.join(root, "reload.html"), "w") as f:
+            f.write(PAGE % args.reload_ms)
+        with FixtureServer(root) as server:
+            main.DEFAULT_HOME_PAGE = "about:blank"
+            window = main.Window()
+            window.session.enabled = False
+            window.show()
+            for i in range(args.tabs):
+                window.add_new_tab(f"{server.base_url}/reload.html?tab={i}")
+            window.tabs.setCurrentIndex(0)
+
+            signals = {"count": 0}
+            def count(*_):
+                signals["count"] += 1
+            for i in range(window.tabs.count()):
+                browser = window.tabs.widget(i).browser
+                browser.titleChanged.connect(count)
+                browser.urlChanged.connect(count)
+                browser.loadProgress.connect(count)
+
+            probe = LagProbe()
+            flushes = window.tab_bar_updater.flushes
+            probe.start()
+            loop = QEventLoop()
+            QTimer.singleShot(int(args.seconds * 1000), loop.quit)
+            loop.exec_()
+            probe.timer.stop()
+
+            lag = sorted(probe.samples) or [0.0]
+            flushes = window.tab_bar_updater.flushes - flushes
+            print(f"{args.tabs} tabs reloading every {args.reload_ms} ms for {args.seconds:.0f} s")
+            print(f"tab signals {signals['count']} ({signals['count'] / args.seconds:.0f}/s), "
+                  f"tab bar flushes {flushes}")
+            print(f"event loop lag: p50 {lag[len(lag) // 2]:.1f} ms  "
+                  f"p99 {lag[int(len(lag) * 0.99)]:.1f} ms  max {lag[-1]:.1f} ms")
+            window.close()
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,75 @@
+"""Theme switch benchmark: precompiled palette/part stylesheets vs one window stylesheet
+
+Run with: python benchmarks/bench_theme.py [--tabs 1 10 50 100] [--switches 10]
+
+"legacy" sets one combined stylesheet on the main window, as
+apply_theme used to, which restyles every descendant including each
+tab's web view. "apply_theme" is the current path and should stay flat
+as the tab count grows.
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtWebEngineWidgets import QWebEngineView  # noqa: F401 (must precede QApplication)
+from PyQt5.QtCore import QStandardPaths
+from PyQt5.QtWidgets import QApplication
+
+import main
+import themes
+
+def legacy_stylesheet(theme):
+    """The old single window stylesheet: every widget gets bg/fg rules"""
+    base = "QMainWindow, QWidget {{ background-color: {bg}; color: {fg}; }}".format_map(theme.colors)
+    return " ".join([base, themes.TAB_PANE_STYLESHEET] + list(theme.stylesheets.values()))
+
+def time_switches(app, switch, names, count):
+    samples = []
+    for i in range(count):
+        start = time.perf_counter()
+        switch(names[i % len(names)])
+        app.processEvents()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tabs", type=int, nargs="+", default=[1, 10, 50, 100])
+    parser.add_argument("--switches", type=int, default=10)
+    args = parser.parse_args()
+
+    QStandardPaths.setTestModeEnabled(True)
+    app = QApplication(sys.argv)
+    app.setApplicationName("Fibrowser Pro Bench")
+    main.VIEW_POOL_SIZE = 0
+    main.PRERENDER = False
+    main.MAX_LIVE_TABS = max(args.tabs) + 1
+    main.DEFAULT_HOME_PAGE = "about:blank"
+
+    window = main.Window()
+    window.session.enabled = False
+    window.show()
+    names = list(window.themes)
+    compiled = {name: legacy_stylesheet(theme) for name, theme in window.themes.items()}
+
+    print(f"{'tabs':>6} {'apply_theme':>14} {'legacy':>14}")
+    for count in args.tabs:
+        while window.tabs.count() < count:
+            window.add_new_tab("about:blank", background=True)
+        app.processEvents()
+
+        current = time_switches(app, window.apply_theme, names, args.switches)
+        legacy = time_switches(app, lambda name: window.setStyleSheet(compiled[name]),
+                               names, args.switches)
+        window.setStyleSheet("")
+        window.theme = None
+        print(f"{count:>6} {current:>11.2f} ms {legacy:>11.2f} ms")
+    window.close()
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,117 @@
+"""Local HTTP fixture server for benchmarks
+
+Serves files from a directory with Range support, an optional
+per-connection bandwidth cap (to mimic servers that throttle each stream)
+and an optional Cache-Control header.
+"""
+import os
+import re
+import time
+import threading
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+RANGE_RE = re.compile(r"bytes=(\d*)-(\d*)$")
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    """Static file handler with single byte-range support"""
+    protocol_version = "HTTP/1.1"
+    rate_limit = 0  # bytes/s per connection, 0 = unlimited
+    cache_control = None  # e.g. "max-age=3600"
+
+    def log_message(self, format, *args):
+        pass
+
+    def end_headers(self):
+        self.send_header("Accept-Ranges", "bytes")
+        if self.cache_control:
+            self.send_header("Cache-Control", self.cache_control)
+        super().end_headers()
+
+    def do_GET(self):
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            return super().do_GET()
+
+        size = os.path.getsize(path)
+        start, end = 0, size - 1
+        match = RANGE_RE.match(self.headers.get("Range", ""))
+        if match and (match.group(1) or match.group(2)):
+            if match.group(1):
+                start = int(match.group(1))
+                end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+            else:
+                start = max(size - int(match.group(2)), 0)
+            if start > end:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            self.send_response(200)
+
+        self.send_header("Content-Type", self.guess_type(path))
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("ETag", f'"{int(os.path.getmtime(path))}-{size}"')
+        self.end_headers()
+
+        with open(path, "rb") as f:
+            f.seek(start)
+            self.copy_range(f, end - start + 1)
+
+    def copy_range(self, f, remaining):
+        chunk = 64 * 1024
+        began = time.monotonic()
+        sent = 0
+        while remaining > 0:
+            data = f.read(min(chunk, remaining))
+            if not data:
+                break
+            try:
+                self.wfile.write(data)
+            except (BrokenPipeError, ConnectionResetError):
+                return
+            remaining -= len(data)
+            sent += len(data)
+            if self.rate_limit:
+                ahead = sent / self.rate_limit - (time.monotonic() - began)
+                if ahead > 0:
+                    time.sleep(ahead)
+
+class FixtureServer:
+    """Run a FixtureHandler server on a background thread"""
+    def __init__(self, directory, port=0, rate_limit=0, cache_control=None):
+        handler = type("Handler", (FixtureHandler,), {"rate_limit": rate_limit,
+                                                      "cache_control": cache_control})
+        self.httpd = ThreadingHTTPServer(
+            ("127.0.0.1", port),
+            lambda *args: handler(*args, directory=directory)
+        )
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Serve a directory for benchmarks")
+    parser.add_argument("directory", nargs="?", default=".")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--rate-limit", type=int, default=0, help="bytes/s per connection")
+    args = parser.parse_args()
+    with FixtureServer(args.directory, args.port, args.rate_limit) as server:
+        print(f"Serving {args.directory} at {server.base_url}")
+        server.thread.join()
@@ -0,0 +1,92 @@
+"""Soak test: open and close many tabs and check that memory stays flat
+
+Run with: python benchmarks/soak_tabs.py [--tabs 1000] [--max-growth-mb 64]
+
+Each tab loads a local fixture page before it is closed. Live tab, view
+and page counts and the RSS of the browser and its child processes are
+sampled every --every tabs; the run fails (exit status 1) if the objects
+are not all released or RSS grew by more than --max-growth-mb after the
+warm-up.
+"""
+import os
+import sys
+import argparse
+import tempfile
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PyQt5.QtWebEngineWidgets import QWebEngineView  # noqa: F401 (must precede QApplication)
+from PyQt5.QtCore import QEventLoop, QTimer, QStandardPaths
+from PyQt5.QtWidgets import QApplication
+
+import main
+from fixture_server import FixtureServer
+from bench_new_tab import settle
+
+PAGE = ("<!doctype html><title>Soak {0}</title><h1>Soak {0}</h1>"
+        "<script>var junk = new Array(20000).fill('{0}');</script>" + "<p>lorem ipsum</p>" * 200)
+
+def open_and_close(window, url):
+    loop = QEventLoop()
+    tab = window.add_new_tab(url)
+    tab.browser.loadFinished.connect(loop.quit)
+    QTimer.singleShot(10000, loop.quit)
+    loop.exec_()
+    window.close_tab(window.tabs.indexOf(tab))
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tabs", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--every", type=int, default=100)
+    parser.add_argument("--max-growth-mb", type=float, default=64)
+    args = parser.parse_args()
+
+    QStandardPaths.setTestModeEnabled(True)
+    app = QApplication(sys.argv)
+    app.setApplicationName("Fibrowser Pro Bench")
+    main.LEAK_TRACKING = True
+    main.PRERENDER = False
+
+    with tempfile.TemporaryDirectory() as root:
+        for i in range(20):
+            with open(os.path.join(root, f"s{i}.html"), "w") as f:
+                f.write(PAGE.format(i))
+        with FixtureServer(root) as server:
+            main.DEFAULT_HOME_PAGE = f"{server.base_url}/s0.html"
+            window = main.Window()
+            window.session.enabled = False
+            window.show()
+            tracker = window.leak_tracker
+
+            for i in range(args.warmup):
+                open_and_close(window, f"{server.base_url}/s{1 + i % 19}.html")
+            settle(app, 2000)
+            baseline = tracker.snapshot()
+            print(f"after warm-up: {baseline}")
+
+            for i in range(1, args.tabs + 1):
+                open_and_close(window, f"{server.base_url}/s{1 + i % 19}.html")
+                if i % args.every == 0:
+                    settle(app, 500)
+                    print(f"{i:>6} tabs: {tracker.snapshot()}")
+            settle(app, 2000)
+            final = tracker.snapshot()
+            window.close()
+
+    failures = []
+    for kind in ("tab", "view", "page"):
+        if final[kind] > baseline[kind]:
+            failures.append(f"{final[kind] - baseline[kind]} {kind} objects not released")
+    growth = final["rss_mb"] - baseline["rss_mb"]
+    if growth > args.max_growth_mb:
+        failures.append(f"RSS grew {growth:.1f} MB (limit {args.max_growth_mb} MB)")
+    print(f"final: {final}; RSS growth {growth:+.1f} MB")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    run()
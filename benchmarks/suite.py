@@ -0,0 +1,390 @@
+"""Headless benchmark suite for the browser shell
+
+Run with: python benchmarks/suite.py [--out results.json] [--baseline baseline.json]
+                                     [--save-baseline baseline.json] [--only startup tabs ...]
+                                     [--settings settings.json]
+
+Everything runs on the offscreen platform against the local fixture
+server. Results are written as JSON ({"meta": ..., "metrics": {name:
+{"value", "unit", "better"}}}); with --baseline each metric is compared
+and the exit status is 1 if any got worse by more than --tolerance, or
+if a scenario's built-in check failed.
+--settings runs with a settings file's profile (process model, Chromium
+flags, cache size, animations); the applied profile is recorded in meta.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import subprocess
+import statistics
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from PyQt5.QtWebEngineWidgets import QWebEngineView  # noqa: F401 (must precede QApplication)
+from PyQt5.QtCore import QEventLoop, QTimer, QStandardPaths
+from PyQt5.QtWidgets import QApplication
+
+from fixture_server import FixtureServer
+from bench_new_tab import wait_for_paint, settle
+
+SCENARIOS = ("startup", "tabs", "memory", "switch", "lifecycle", "navigation", "theme", "download")
+PAGE = "<!doctype html><title>Page {0}</title><h1>Page {0}</h1>" + "<p>lorem ipsum dolor</p>" * 100
+
+def median_ms(samples):
+    return round(statistics.median(samples) * 1000, 2)
+
+def metric(value, unit, better="lower"):
+    return {"value": value, "unit": unit, "better": better}
+
+def wait_loaded(tab, timeout=10000):
+    loop = QEventLoop()
+    tab.browser.loadFinished.connect(loop.quit)
+    QTimer.singleShot(timeout, loop.quit)
+    loop.exec_()
+
+def new_window(main):
+    window = main.Window()
+    window.session.enabled = False
+    window.show()
+    return window
+
+def close_window(app, window):
+    window.close()
+    window.deleteLater()
+    app.processEvents()
+
+# ----------------------------
+# Scenarios
+# ----------------------------
+def bench_startup(ctx):
+    """Process start to first paint, in a fresh interpreter"""
+    samples = []
+    phases = {}
+    for _ in range(ctx.runs):
+        start = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--probe-startup", ctx.page(0)]
+            + (["--settings", ctx.settings_path] if ctx.settings_path else []),
+            capture_output=True, text=True, timeout=120
+        ).stdout
+        lines = output.splitlines()
+        if "painted" in lines:
+            samples.append(time.perf_counter() - start)
+            for phase in json.loads(lines[-1])["phases"]:
+                phases.setdefault(phase["phase"], []).append(phase["ms"] / 1000)
+    if not samples:
+        return {}
+    results = {"startup_to_first_paint_ms": metric(median_ms(samples), "ms")}
+    for name, values in phases.items():
+        results[f"startup_{name.replace(' ', '_')}_ms"] = metric(median_ms(values), "ms")
+    return results
+
+def bench_tabs(ctx):
+    window = new_window(ctx.main)
+    wait_for_paint(window.current_tab())
+    opens, closes = [], []
+    for i in range(ctx.tabs):
+        start = time.perf_counter()
+        window.add_new_tab(ctx.page(i))
+        opens.append(time.perf_counter() - start)
+    settle(ctx.app, 500)
+    while window.tabs.count() > 1:
+        start = time.perf_counter()
+        window.close_tab(window.tabs.count() - 1)
+        closes.append(time.perf_counter() - start)
+    close_window(ctx.app, window)
+    return {
+        "add_new_tab_ms": metric(median_ms(opens), "ms"),
+        "close_tab_ms": metric(median_ms(closes), "ms")
+    }
+
+def process_rss(window):
+    import telemetry
+    pids = {os.getpid()}
+    for i in range(window.tabs.count()):
+        pids.add(window.tabs.widget(i).renderer_pid())
+    total = 0
+    for pid in pids:
+        stats = telemetry.read_proc_stats(pid) if pid > 0 else None
+        if stats:
+            total += stats[0]
+    return total
+
+def bench_memory(ctx):
+    if not os.path.isdir("/proc/self"):
+        return {}
+    window = new_window(ctx.main)
+    wait_loaded(window.current_tab())
+    settle(ctx.app, 500)
+    before = process_rss(window)
+    for i in range(ctx.tabs):
+        wait_loaded(window.add_new_tab(ctx.page(i)))
+    settle(ctx.app, 1000)
+    after = process_rss(window)
+    close_window(ctx.app, window)
+    return {"memory_per_tab_mb": metric(round((after - before) / ctx.tabs / 2**20, 2), "MB")}
+
+def bench_switch(ctx):
+    window = new_window(ctx.main)
+    for i in range(ctx.tabs):
+        wait_loaded(window.add_new_tab(ctx.page(i)))
+    samples = []
+    for i in range(window.tabs.count() * 2):
+        start = time.perf_counter()
+        window.tabs.setCurrentIndex(i % window.tabs.count())
+        ctx.app.processEvents()
+        samples.append(time.perf_counter() - start)
+    close_window(ctx.app, window)
+    return {"tab_switch_ms": metric(median_ms(samples), "ms")}
+
+class SimulatedClock:
+    """Stands in for the lifecycle module's time so idle periods pass instantly"""
+    def __init__(self):
+        self.now = time.monotonic()
+
+    def monotonic(self):
+        return self.now
+
+def bench_lifecycle(ctx):
+    """Sweep cost over ctx.tabs tabs, checking freeze/discard ordering on a simulated clock
+
+    A tab used for longer than the discard delay must stay Active when
+    the user switches away, and only be frozen, then discarded, after
+    that long in the background.
+    """
+    import lifecycle
+    window = new_window(ctx.main)
+    for i in range(ctx.tabs):
+        wait_loaded(window.add_new_tab(ctx.page(i), background=True))
+    manager = window.lifecycle
+    manager.timer.stop()
+    clock = SimulatedClock()
+    real_time, lifecycle.time = lifecycle.time, clock
+    samples = []
+
+    def sweep(seconds):
+        clock.now += seconds
+        start = time.perf_counter()
+        manager.sweep()
+        samples.append(time.perf_counter() - start)
+
+    def expect(tab, state, when):
+        if tab.lifecycle_state != state:
+            ctx.failures.append(f"lifecycle: {when}: tab is {tab.lifecycle_state}, expected {state}")
+
+    try:
+        used, other = window.tabs.widget(0), window.tabs.widget(1)
+        window.tabs.setCurrentIndex(0)
+        start = clock.now
+        while clock.now - start < manager.discard_after * 2:
+            sweep(manager.freeze_after / 10)
+        window.tabs.setCurrentIndex(1)
+        ctx.app.processEvents()
+        sweep(10)
+        expect(used, lifecycle.ACTIVE, "just after leaving a long-used tab")
+        sweep(manager.freeze_after)
+        expect(used, lifecycle.FROZEN, "after freeze_after in the background")
+        sweep(manager.discard_after)
+        expect(used, lifecycle.DISCARDED, "after discard_after in the background")
+        expect(other, lifecycle.ACTIVE, "the front tab")
+    finally:
+        lifecycle.time = real_time
+    close_window(ctx.app, window)
+    return {"lifecycle_sweep_ms": metric(median_ms(samples), "ms")}
+
+def bench_navigation(ctx):
+    window = new_window(ctx.main)
+    tab = window.current_tab()
+    wait_loaded(tab)
+    samples = []
+    for i in range(ctx.runs * 5):
+        loop = QEventLoop()
+        tab.browser.loadFinished.connect(loop.quit)
+        start = time.perf_counter()
+        window.navigate_to(ctx.page(i + 1))
+        QTimer.singleShot(10000, loop.quit)
+        loop.exec_()
+        samples.append(time.perf_counter() - start)
+        tab.browser.loadFinished.disconnect(loop.quit)
+    close_window(ctx.app, window)
+    return {"navigation_ms": metric(median_ms(samples), "ms")}
+
+def bench_theme(ctx):
+    window = new_window(ctx.main)
+    for i in range(ctx.tabs):
+        window.add_new_tab(ctx.page(i))
+    ctx.app.processEvents()
+    samples = []
+    themes = list(ctx.main.THEMES)
+    for i in range(ctx.runs * 4):
+        start = time.perf_counter()
+        window.apply_theme(themes[i % len(themes)])
+        ctx.app.processEvents()
+        samples.append(time.perf_counter() - start)
+    close_window(ctx.app, window)
+    return {f"apply_theme_{ctx.tabs}_tabs_ms": metric(median_ms(samples), "ms")}
+
+def bench_download(ctx):
+    import segmented
+    path = os.path.join(ctx.root, "download.bin")
+    results = {}
+    for segments in (1, 4):
+        if os.path.exists(path):
+            os.remove(path)
+        start = time.perf_counter()
+        segmented.SegmentedDownload(ctx.download_url, path, segments=segments).run()
+        elapsed = time.perf_counter() - start
+        results[f"download_{segments}_stream_mb_s"] = metric(
+            round(ctx.download_size / elapsed / 2**20, 1), "MB/s", "higher")
+    return results
+
+# ----------------------------
+# Results
+# ----------------------------
+def compare(metrics, baseline, tolerance):
+    """Print a comparison table; return the names of regressed metrics"""
+    regressions = []
+    print(f"{'metric':<32} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, current in sorted(metrics.items()):
+        old = baseline.get(name)
+        if old is None or not old["value"]:
+            print(f"{name:<32} {'-':>12} {current['value']:>12} {'new':>9}")
+            continue
+        change = (current["value"] - old["value"]) / old["value"]
+        worse = change > tolerance if current["better"] == "lower" else change < -tolerance
+        flag = "  REGRESSION" if worse else ""
+        print(f"{name:<32} {old['value']:>12} {current['value']:>12} {change:>+8.1%}{flag}")
+        if worse:
+            regressions.append(name)
+    return regressions
+
+class Context:
+    """Shared state handed to each scenario"""
+    def __init__(self, app, main, root, base_url, tabs, runs, download_size, settings_path=None):
+        self.app = app
+        self.main = main
+        self.root = root
+        self.base_url = base_url
+        self.tabs = tabs
+        self.runs = runs
+        self.download_size = download_size
+        self.download_url = f"{base_url}/download.bin"
+        self.settings_path = settings_path
+        self.failures = []  # failed built-in checks; any fails the run
+
+    def page(self, i):
+        return f"{self.base_url}/p{i % 50}.html"
+
+def load_settings(path):
+    """Settings from path (defaults if None), applied as before the browser's QApplication"""
+    import settings
+    profile = settings.Settings.load(path) if path else settings.Settings()
+    profile.apply_early()
+    return profile
+
+def probe_startup(url, settings_path=None):
+    """Child process for bench_startup: start the app and wait for first paint"""
+    QStandardPaths.setTestModeEnabled(True)
+    profile = load_settings(settings_path)
+    app = QApplication(sys.argv)
+    app.setApplicationName("Fibrowser Pro Bench")
+    import main
+    main.SETTINGS = profile
+    main.PRERENDER = False
+    main.DEFAULT_HOME_PAGE = url
+    window = main.Window(staged=True)
+    window.session.enabled = False
+    window.show()
+    app.processEvents()
+    main.STARTUP.mark("window shown")
+    while not window.started:
+        app.processEvents()
+    wait_for_paint(window.current_tab())
+    main.STARTUP.mark("first paint")
+    print("painted", flush=True)
+    print(json.dumps(main.STARTUP.as_dict()), flush=True)
+    os._exit(0)
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", default="benchmark-results.json")
+    parser.add_argument("--baseline")
+    parser.add_argument("--save-baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed slowdown (0.15 = 15%%)")
+    parser.add_argument("--only", nargs="+", choices=SCENARIOS)
+    parser.add_argument("--tabs", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--download-mb", type=int, default=32)
+    parser.add_argument("--settings", help="settings file to run with (default: built-in defaults)")
+    parser.add_argument("--probe-startup", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.probe_startup:
+        probe_startup(args.probe_startup, args.settings)
+
+    QStandardPaths.setTestModeEnabled(True)
+    profile = load_settings(args.settings)
+    app = QApplication(sys.argv)
+    app.setApplicationName("Fibrowser Pro Bench")
+    import main
+    main.SETTINGS = profile
+    # Prerender swaps views under navigate_to and would skew navigation timing
+    main.PRERENDER = False
+
+    metrics = {}
+    with tempfile.TemporaryDirectory() as root:
+        www = os.path.join(root, "www")
+        os.makedirs(www)
+        for i in range(50):
+            with open(os.path.join(www, f"p{i}.html"), "w") as f:
+                f.write(PAGE.format(i))
+        with open(os.path.join(www, "download.bin"), "wb") as f:
+            for _ in range(args.download_mb):
+                f.write(os.urandom(1024 * 1024))
+
+        with FixtureServer(www, rate_limit=8 * 1024 * 1024) as server:
+            main.DEFAULT_HOME_PAGE = f"{server.base_url}/p0.html"
+            ctx = Context(app, main, root, server.base_url, args.tabs, args.runs,
+                          args.download_mb * 1024 * 1024, args.settings)
+            for name in args.only or SCENARIOS:
+                start = time.perf_counter()
+                results = globals()[f"bench_{name}"](ctx)
+                metrics.update(results)
+                print(f"{name:<12} {time.perf_counter() - start:6.1f} s  "
+                      + ", ".join(f"{k}={v['value']}{v['unit']}" for k, v in results.items()))
+
+    report = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "tabs": args.tabs,
+            "runs": args.runs,
+            "settings": profile.applied
+        },
+        "metrics": metrics
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["metrics"]
+        if compare(metrics, baseline, args.tolerance):
+            sys.exit(1)
+    for failure in ctx.failures:
+        print(f"FAIL {failure}")
+    if ctx.failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    run()
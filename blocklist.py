@@ -0,0 +1,377 @@
+"""EasyList-style filter engine
+
+Network filters are compiled into two structures:
+
+* a hash map from host name to filters for ``||host^`` rules, checked by
+  walking the request host's suffixes (a.b.example.com, b.example.com, ...)
+* a token index: each remaining filter is filed under the rarest literal
+  token it must contain, so a request only checks filters whose token
+  appears in its URL. Filters without a usable token are checked always.
+
+Cosmetic (``##``) rules and filters with unsupported options are skipped.
+"""
+import os
+import re
+import pickle
+import hashlib
+from session import atomic_write
+
+ENGINE_VERSION = 1
+
+# Resource types used in filter options
+RESOURCE_TYPES = ("document", "subdocument", "stylesheet", "script", "image", "font",
+                  "object", "xmlhttprequest", "ping", "media", "websocket", "other")
+TYPE_BITS = {name: 1 << i for i, name in enumerate(RESOURCE_TYPES)}
+TYPE_ALIASES = {"xhr": "xmlhttprequest", "css": "stylesheet", "frame": "subdocument",
+                "object-subrequest": "object"}
+ALL_TYPES = (1 << len(RESOURCE_TYPES)) - 1 & ~TYPE_BITS["document"]
+IGNORED_OPTIONS = {"match-case", "collapse", "~collapse", "important"}
+
+TOKEN_RE = re.compile(r"[a-z0-9%]+")
+URL_TOKEN_RE = re.compile(r"[a-z0-9%]{2,}")
+HOST_RULE_RE = re.compile(r"^\|\|([a-z0-9.-]+)\^?$")
+SEPARATOR = r"(?:[^a-z0-9_.%-]|$)"
+
+# Second-level labels under which sites register (example.co.uk)
+SECOND_LEVEL = {"co", "com", "net", "org", "gov", "edu", "ac", "ne", "or", "go"}
+
+class Filter:
+    """One network filter; the regex is compiled on first use"""
+    __slots__ = ("text", "source", "types", "party", "domains", "not_domains", "regex")
+
+    def __init__(self, text, source, types, party, domains, not_domains):
+        self.text = text
+        self.source = source
+        self.types = types
+        self.party = party
+        self.domains = domains
+        self.not_domains = not_domains
+        self.regex = None
+
+    def __getstate__(self):
+        return (self.text, self.source, self.types, self.party, self.domains, self.not_domains)
+
+    def __setstate__(self, state):
+        (self.text, self.source, self.types, self.party,
+         self.domains, self.not_domains) = state
+        self.regex = None
+
+    def applies(self, type_bit, third_party, page_host):
+        """Check the options before the (more expensive) pattern"""
+        if not self.types & type_bit:
+            return False
+        if self.party is not None and self.party != third_party:
+            return False
+        if self.domains is not None or self.not_domains is not None:
+            suffixes = host_suffixes(page_host)
+            if self.not_domains is not None and any(s in self.not_domains for s in suffixes):
+                return False
+            if self.domains is not None and not any(s in self.domains for s in suffixes):
+                return False
+        return True
+
+    def matches(self, url):
+        if self.source is None:
+            return True
+        if self.regex is None:
+            try:
+                self.regex = re.compile(self.source)
+            except re.error:
+                self.source = "(?!)"
+                self.regex = re.compile(self.source)
+        return self.regex.search(url) is not None
+
+def host_of(url):
+    """Host part of a lowercase URL, without port or credentials"""
+    start = url.find("://")
+    if start < 0:
+        return ""
+    start += 3
+    end = len(url)
+    for sep in "/?#":
+        i = url.find(sep, start, end)
+        if i >= 0:
+            end = i
+    host = url[start:end]
+    host = host[host.rfind("@") + 1:]
+    if host.startswith("["):
+        return host[:host.find("]") + 1]
+    return host.split(":", 1)[0]
+
+def host_suffixes(host):
+    """a.b.c -> [a.b.c, b.c, c]"""
+    suffixes = [host]
+    i = host.find(".")
+    while i >= 0:
+        suffixes.append(host[i + 1:])
+        i = host.find(".", i + 1)
+    return suffixes
+
+def base_domain(host):
+    """Approximate registrable domain (no public suffix list)"""
+    labels = host.split(".")
+    if len(labels) > 2 and len(labels[-1]) == 2 and labels[-2] in SECOND_LEVEL:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+def pattern_regex(pattern):
+    """Translate an EasyList pattern into a regular expression"""
+    if len(pattern) > 2 and pattern.startswith("/") and pattern.endswith("/"):
+        return pattern[1:-1]
+    out = []
+    if pattern.startswith("||"):
+        out.append(r"^[a-z][a-z0-9+.-]*://(?:[^/?#]*\.)?")
+        pattern = pattern[2:]
+    elif pattern.startswith("|"):
+        out.append("^")
+        pattern = pattern[1:]
+    end = ""
+    if pattern.endswith("|"):
+        end = "$"
+        pattern = pattern[:-1]
+    for ch in pattern:
+        if ch == "*":
+            out.append(".*")
+        elif ch == "^":
+            out.append(SEPARATOR)
+        else:
+            out.append(re.escape(ch))
+    return "".join(out).replace(".*.*", ".*") + end
+
+def pattern_tokens(pattern):
+    """Tokens that must appear whole in any URL the pattern matches"""
+    if pattern.startswith("/") and pattern.endswith("/"):
+        return []
+    left_anchor = pattern.startswith("|")
+    right_anchor = pattern.endswith("|") and not pattern.endswith("||")
+    body = pattern.lstrip("|")
+    if right_anchor:
+        body = body[:-1]
+    tokens = []
+    for match in TOKEN_RE.finditer(body):
+        start, end = match.span()
+        if start == 0 and not left_anchor:
+            continue
+        if start > 0 and body[start - 1] == "*":
+            continue
+        if end == len(body) and not right_anchor:
+            continue
+        if end < len(body) and body[end] == "*":
+            continue
+        if len(match.group()) >= 2:
+            tokens.append(match.group())
+    return tokens
+
+def parse_options(text):
+    """Return (types, party, domains, not_domains, document) or None if unsupported"""
+    types = 0
+    not_types = 0
+    party = None
+    domains = not_domains = None
+    document = False
+    for option in text.split(","):
+        option = option.strip()
+        if not option or option in IGNORED_OPTIONS:
+            continue
+        negated = option.startswith("~")
+        name = option[1:] if negated else option
+        if name == "third-party" or name == "3p":
+            party = not negated
+        elif name == "first-party" or name == "1p":
+            party = negated
+        elif name.startswith("domain="):
+            for domain in name[7:].split("|"):
+                if domain.startswith("~"):
+                    not_domains = (not_domains or set()) | {domain[1:]}
+                elif domain:
+                    domains = (domains or set()) | {domain}
+        elif name == "document" and not negated:
+            document = True
+        else:
+            name = TYPE_ALIASES.get(name, name)
+            if name not in TYPE_BITS:
+                return None
+            if negated:
+                not_types |= TYPE_BITS[name]
+            else:
+                types |= TYPE_BITS[name]
+    if not types:
+        types = ALL_TYPES & ~not_types
+    return (types, party,
+            frozenset(domains) if domains else None,
+            frozenset(not_domains) if not_domains else None,
+            document)
+
+def parse_filter(line):
+    """Parse one list line into (exception, pattern, Filter), or None to skip it"""
+    line = line.strip()
+    if not line or line.startswith(("!", "[")) or "##" in line or "#@#" in line or "#?#" in line \
+            or "#$#" in line:
+        return None
+    exception = line.startswith("@@")
+    if exception:
+        line = line[2:]
+    pattern, options = line, None
+    dollar = line.rfind("$")
+    if dollar >= 0 and not (line.startswith("/") and line.endswith("/")):
+        pattern, options = line[:dollar], line[dollar + 1:]
+    if not (pattern.startswith("/") and pattern.endswith("/")):
+        pattern = pattern.lower()
+    parsed = parse_options(options.lower()) if options else (ALL_TYPES, None, None, None, False)
+    if parsed is None:
+        return None
+    types, party, domains, not_domains, document = parsed
+    if document:
+        if not exception:
+            return None
+        types |= TYPE_BITS["document"]
+    if pattern in ("", "*"):
+        if domains is None:
+            return None
+        source = None
+    else:
+        source = pattern_regex(pattern)
+    return exception, pattern, Filter(line, source, types, party, domains, not_domains)
+
+class Matcher:
+    """Host map plus token index for one kind of filter (block or exception)"""
+    def __init__(self):
+        self.hosts = {}
+        self.tokens = {}
+        self.untokenized = []
+
+    def build(self, parsed):
+        """parsed is a list of (pattern, Filter)"""
+        counts = {}
+        candidates = []
+        for pattern, flt in parsed:
+            host = HOST_RULE_RE.match(pattern)
+            if host:
+                self.hosts.setdefault(host.group(1), []).append(flt)
+                continue
+            tokens = pattern_tokens(pattern)
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            candidates.append((tokens, flt))
+        for tokens, flt in candidates:
+            if tokens:
+                best = min(tokens, key=lambda t: (counts[t], -len(t)))
+                self.tokens.setdefault(best, []).append(flt)
+            else:
+                self.untokenized.append(flt)
+
+    def match(self, url, host, type_bit, third_party, page_host):
+        hosts = self.hosts
+        if hosts:
+            for suffix in host_suffixes(host):
+                filters = hosts.get(suffix)
+                if filters:
+                    for flt in filters:
+                        if flt.applies(type_bit, third_party, page_host):
+                            return flt
+        index = self.tokens
+        for token in set(URL_TOKEN_RE.findall(url)):
+            filters = index.get(token)
+            if filters:
+                for flt in filters:
+                    if flt.applies(type_bit, third_party, page_host) and flt.matches(url):
+                        return flt
+        for flt in self.untokenized:
+            if flt.applies(type_bit, third_party, page_host) and flt.matches(url):
+                return flt
+        return None
+
+    def __len__(self):
+        return (sum(map(len, self.hosts.values())) + sum(map(len, self.tokens.values()))
+                + len(self.untokenized))
+
+class FilterEngine:
+    """Compiled block and exception filters"""
+    def __init__(self):
+        self.block = Matcher()
+        self.allow = Matcher()
+
+    @classmethod
+    def compile(cls, lines):
+        engine = cls()
+        block, allow = [], []
+        for line in lines:
+            parsed = parse_filter(line)
+            if parsed is None:
+                continue
+            exception, pattern, flt = parsed
+            (allow if exception else block).append((pattern, flt))
+        engine.block.build(block)
+        engine.allow.build(allow)
+        return engine
+
+    def __len__(self):
+        return len(self.block) + len(self.allow)
+
+    def check(self, url, page_url="", resource_type="other"):
+        """Return the blocking Filter for a request, or None to allow it"""
+        url = url.lower()
+        host = host_of(url)
+        page_host = host_of(page_url.lower()) if page_url else host
+        third_party = bool(page_host) and base_domain(host) != base_domain(page_host)
+        type_bit = TYPE_BITS.get(resource_type, TYPE_BITS["other"])
+
+        flt = self.block.match(url, host, type_bit, third_party, page_host)
+        if flt is None:
+            return None
+        if self.allow.match(url, host, type_bit, third_party, page_host):
+            return None
+        # $document exceptions allow everything on the page they match
+        if page_url and self.allow.match(page_url.lower(), page_host, TYPE_BITS["document"],
+                                         False, page_host):
+            return None
+        return flt
+
+    def should_block(self, url, page_url="", resource_type="other"):
+        return self.check(url, page_url, resource_type) is not None
+
+def read_lists(paths):
+    """Return (lines, digest) for the filter list files that exist"""
+    digest = hashlib.sha1(str(ENGINE_VERSION).encode())
+    lines = []
+    for path in sorted(paths):
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            continue
+        digest.update(path.encode("utf-8", "replace"))
+        digest.update(data)
+        lines.extend(data.decode("utf-8", "replace").splitlines())
+    return lines, digest.hexdigest()
+
+def load_engine(paths, cache_path=None):
+    """Compile the lists, or load the compiled form cached for the same input
+
+    Returns (engine, from_cache).
+    """
+    lines, digest = read_lists(paths)
+    if cache_path:
+        try:
+            with open(cache_path, "rb") as f:
+                cached_digest, engine = pickle.load(f)
+            if cached_digest == digest:
+                return engine, True
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError, TypeError):
+            pass
+
+    engine = FilterEngine.compile(lines)
+    if cache_path:
+        try:
+            atomic_write(cache_path, pickle.dumps((digest, engine), pickle.HIGHEST_PROTOCOL))
+        except OSError:
+            pass
+    return engine, False
+
+def list_files(directory):
+    """Filter lists (*.txt) in a directory"""
+    try:
+        return [os.path.join(directory, name) for name in os.listdir(directory)
+                if name.endswith(".txt")]
+    except OSError:
+        return []
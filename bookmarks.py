@@ -0,0 +1,556 @@
+import re
+import json
+import time
+import sqlite3
+import threading
+from collections import namedtuple
+from html.parser import HTMLParser
+from PyQt5.QtCore import Qt, QObject, QTimer, pyqtSignal
+from PyQt5.QtWidgets import QWidget, QHBoxLayout, QPushButton, QMenu, QToolButton, QSizePolicy
+
+# Root folders, created with the store
+BAR = 1
+OTHER = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bookmarks (
+    id INTEGER PRIMARY KEY,
+    parent INTEGER,
+    position INTEGER NOT NULL DEFAULT 0,
+    folder INTEGER NOT NULL DEFAULT 0,
+    title TEXT NOT NULL DEFAULT '',
+    url TEXT,
+    added REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS bookmarks_children ON bookmarks(parent, position);
+CREATE INDEX IF NOT EXISTS bookmarks_url ON bookmarks(url) WHERE url IS NOT NULL;
+INSERT OR IGNORE INTO bookmarks(id, parent, folder, title) VALUES (1, NULL, 1, 'Bookmarks bar');
+INSERT OR IGNORE INTO bookmarks(id, parent, folder, title) VALUES (2, NULL, 1, 'Other bookmarks');
+"""
+
+COLUMNS = "id, parent, folder, title, url"
+INSERT = ("INSERT INTO bookmarks(id, parent, position, folder, title, url, added) "
+          "VALUES (?, ?, ?, ?, ?, ?, ?)")
+CHILDREN_QUERY = f"SELECT {COLUMNS} FROM bookmarks WHERE parent = ? ORDER BY position LIMIT ? OFFSET ?"
+NEXT_POSITION = "SELECT COALESCE(MAX(position) + 1, 0) FROM bookmarks WHERE parent = ?"
+# Everything under a folder, for recursive deletes
+SUBTREE = """
+WITH RECURSIVE subtree(id) AS (
+    VALUES(?) UNION ALL SELECT b.id FROM bookmarks b JOIN subtree s ON b.parent = s.id
+)
+"""
+
+IMPORT_BATCH = 1000  # rows per executemany
+READ_CHUNK = 64 * 1024  # characters read from an import file at a time
+CHROME_EPOCH_OFFSET = 11644473600  # seconds from 1601-01-01 to 1970-01-01
+
+Bookmark = namedtuple("Bookmark", "id parent folder title url")
+
+def connect(path):
+    conn = sqlite3.connect(path, timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+# ----------------------------
+# Streaming importers
+# ----------------------------
+class Importer:
+    """Hands out row ids and per-folder positions while an import streams in
+
+    Ids are assigned here rather than by SQLite so a folder's children
+    can be written before the folder row itself, which is how Chrome
+    orders its file.
+    """
+    def __init__(self, conn):
+        self.conn = conn
+        self.first_id = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM bookmarks").fetchone()[0]
+        self.next_id = self.first_id
+        self.positions = {}
+        self.folders = 0
+        self.bookmarks = 0
+
+    def new_id(self):
+        self.next_id += 1
+        return self.next_id - 1
+
+    def position(self, parent):
+        position = self.positions.get(parent)
+        if position is None:
+            position = 0
+            if parent < self.first_id:
+                position = self.conn.execute(NEXT_POSITION, (parent,)).fetchone()[0]
+        self.positions[parent] = position + 1
+        return position
+
+    def row(self, node_id, parent, folder, title, url=None, added=0.0):
+        if folder:
+            self.folders += 1
+        else:
+            self.bookmarks += 1
+        return (node_id, parent, self.position(parent), int(folder), title or "", url, added)
+
+class NetscapeParser(HTMLParser):
+    """Incremental parser for Netscape bookmark files (browser HTML exports)
+
+    Fed a chunk at a time; completed rows collect in ``rows`` until the
+    caller drains them. Only the stack of open folders is kept.
+    """
+    def __init__(self, importer, parent=OTHER, bar=BAR):
+        super().__init__(convert_charrefs=True)
+        self.importer = importer
+        self.root = parent
+        self.bar = bar
+        self.folders = []  # folder id of each open <DL>
+        self.next_folder = None  # folder the next <DL> lists, from the preceding <H3>
+        self.element = None  # (tag, attrs) of the open <A> or <H3>
+        self.text = []
+        self.rows = []
+
+    def current(self):
+        return self.folders[-1] if self.folders else self.root
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "dl":
+            self.folders.append(self.next_folder if self.next_folder is not None else self.current())
+            self.next_folder = None
+        elif tag in ("a", "h3"):
+            self.element = (tag, dict(attrs))
+            self.text = []
+
+    def handle_data(self, data):
+        if self.element is not None:
+            self.text.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == "dl":
+            if self.folders:
+                self.folders.pop()
+            return
+        if self.element is None or tag != self.element[0]:
+            return
+        tag, attrs = self.element
+        self.element = None
+        title = "".join(self.text).strip()
+        try:
+            added = float(attrs.get("add_date") or 0)
+        except ValueError:
+            added = 0.0
+        if tag == "h3":
+            if (attrs.get("personal_toolbar_folder") or "").lower() == "true":
+                self.next_folder = self.bar
+                return
+            self.next_folder = self.importer.new_id()
+            self.rows.append(self.importer.row(self.next_folder, self.current(), True, title,
+                                               added=added))
+        elif attrs.get("href"):
+            self.rows.append(self.importer.row(self.importer.new_id(), self.current(), False,
+                                               title, attrs["href"], added))
+
+def netscape_rows(f, importer, parent=OTHER):
+    """Yield rows for a Netscape bookmark file, reading it in chunks"""
+    parser = NetscapeParser(importer, parent)
+    while True:
+        chunk = f.read(READ_CHUNK)
+        if chunk:
+            parser.feed(chunk)
+        else:
+            parser.close()
+        yield from parser.rows
+        parser.rows = []
+        if not chunk:
+            return
+
+# Separators are skipped: whether a string is a key or a value follows
+# from the enclosing object's state
+JSON_TOKEN_RE = re.compile(r'[\s,:]*(?:([{}\[\]])|("(?:[^"\\]|\\.)*")|([^\s,:{}\[\]"]+))')
+JSON_BRACKETS = {"{": "start_map", "}": "end_map", "[": "start_array", "]": "end_array"}
+
+def json_events(f):
+    """Yield (event, value) tokens from a JSON file, reading it in chunks
+
+    Events are start_map/end_map/start_array/end_array and
+    string/literal; a minimal pull parser since the standard library
+    only decodes whole documents.
+    """
+    buf = ""
+    pos = 0
+    eof = False
+    while True:
+        match = JSON_TOKEN_RE.match(buf, pos)
+        # A token touching the end of the buffer may continue in the next chunk
+        if match is None or (match.end() == len(buf) and not eof):
+            if eof:
+                if buf[pos:].strip(" \t\r\n,:"):
+                    raise ValueError("malformed or truncated JSON")
+                return
+            chunk = f.read(READ_CHUNK)
+            buf = buf[pos:] + chunk
+            pos = 0
+            eof = not chunk
+            continue
+        pos = match.end()
+        bracket, string, literal = match.groups()
+        if bracket:
+            yield JSON_BRACKETS[bracket], None
+        elif string is not None:
+            yield "string", string[1:-1] if "\\" not in string else json.loads(string)
+        else:
+            yield "literal", json.loads(literal)
+
+NODE_FIELDS = ("type", "name", "url", "date_added")
+
+def chrome_rows(f, importer, roots):
+    """Yield rows for a Chrome/Chromium ``Bookmarks`` JSON file
+
+    ``roots`` maps the file's root folders (bookmark_bar, other, synced)
+    to folders of this store; their children are imported into those.
+    Nodes are built from the event stream one object at a time.
+    """
+    stack = []
+    for event, value in json_events(f):
+        top = stack[-1] if stack else None
+        if event in ("string", "literal") and top is not None and top["map"] and top["key"] is None:
+            top["key"] = value
+        elif event == "start_map":
+            node = None
+            if top is not None and not top["map"] and top["parent"] is not None:
+                node = {"id": importer.new_id(), "parent": top["parent"]}
+            elif top is not None and top["map"] and top["roots"]:
+                node = {"id": roots.get(top["key"], roots["other"]), "root": True}
+            is_roots = len(stack) == 1 and top["key"] == "roots"
+            stack.append({"map": True, "key": None, "node": node, "roots": is_roots})
+        elif event == "start_array":
+            parent = None
+            if top is not None and top["map"] and top["node"] is not None and top["key"] == "children":
+                parent = top["node"]["id"]
+            stack.append({"map": False, "parent": parent})
+        elif event in ("end_map", "end_array"):
+            frame = stack.pop()
+            node = frame.get("node")
+            if node is not None and not node.get("root") and node.get("type") in ("folder", "url"):
+                try:
+                    added = int(node.get("date_added") or 0) / 1e6 - CHROME_EPOCH_OFFSET
+                except ValueError:
+                    added = 0.0
+                yield importer.row(node["id"], node["parent"], node["type"] == "folder",
+                                   node.get("name"), node.get("url"), max(added, 0.0))
+            if stack and stack[-1]["map"]:
+                stack[-1]["key"] = None
+        elif top is not None and top["map"]:
+            if top["node"] is not None and top["key"] in NODE_FIELDS:
+                top["node"][top["key"]] = value
+            top["key"] = None
+
+def sniff_format(path):
+    """"chrome" for a JSON file, otherwise "netscape\""""
+    with open(path, encoding="utf-8-sig", errors="replace") as f:
+        head = f.read(256).lstrip()
+    return "chrome" if head.startswith("{") else "netscape"
+
+# ----------------------------
+# Store
+# ----------------------------
+class BookmarkStore(QObject):
+    """SQLite (WAL) bookmark tree with folders and an index on URL
+
+    Reads and single edits use a connection on the GUI thread; imports
+    stream through their own connection on a worker thread and emit
+    ``imported`` when done.
+    """
+    changed = pyqtSignal()
+    imported = pyqtSignal(dict)
+
+    def __init__(self, path, defaults=(), parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.conn = connect(path)
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+            if self.conn.execute("PRAGMA user_version").fetchone()[0] == 0:
+                for title, url in defaults:
+                    self._insert(BAR, False, title, url)
+                self.conn.execute("PRAGMA user_version = 1")
+
+    def close(self):
+        self.conn.close()
+
+    def _insert(self, parent, folder, title, url=None):
+        position = self.conn.execute(NEXT_POSITION, (parent,)).fetchone()[0]
+        cursor = self.conn.execute(
+            "INSERT INTO bookmarks(parent, position, folder, title, url, added) VALUES (?, ?, ?, ?, ?, ?)",
+            (parent, position, int(folder), title or "", url, time.time())
+        )
+        return cursor.lastrowid
+
+    def add(self, url, title="", parent=BAR):
+        with self.conn:
+            bookmark_id = self._insert(parent, False, title, url)
+        self.changed.emit()
+        return bookmark_id
+
+    def add_folder(self, title, parent=BAR):
+        with self.conn:
+            folder_id = self._insert(parent, True, title)
+        self.changed.emit()
+        return folder_id
+
+    def remove(self, bookmark_id):
+        """Delete a bookmark, or a folder with everything in it"""
+        with self.conn:
+            self.conn.execute(SUBTREE + "DELETE FROM bookmarks WHERE id IN subtree AND id > ?",
+                              (bookmark_id, OTHER))
+        self.changed.emit()
+
+    def children(self, folder, limit=-1, offset=0):
+        return [Bookmark(*row) for row in self.conn.execute(CHILDREN_QUERY, (folder, limit, offset))]
+
+    def count(self, folder):
+        return self.conn.execute("SELECT COUNT(*) FROM bookmarks WHERE parent = ?", (folder,)).fetchone()[0]
+
+    def find(self, url):
+        """Bookmarks for url, through the URL index"""
+        return [Bookmark(*row) for row in self.conn.execute(
+            f"SELECT {COLUMNS} FROM bookmarks WHERE url = ?", (url,))]
+
+    def is_bookmarked(self, url):
+        return self.conn.execute("SELECT 1 FROM bookmarks WHERE url = ? LIMIT 1", (url,)).fetchone() is not None
+
+    def urls(self):
+        """(url, title) of every bookmark, for suggestion indexes (any thread)"""
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        try:
+            yield from conn.execute("SELECT url, title FROM bookmarks WHERE url IS NOT NULL")
+        finally:
+            conn.close()
+
+    def import_file(self, path, parent=OTHER):
+        """Stream a Netscape HTML or Chrome JSON file into folder parent (any thread)
+
+        Rows are written in batches inside one transaction, so memory
+        stays flat however large the file is and a failed import leaves
+        nothing behind. Returns counts and timing.
+        """
+        start = time.perf_counter()
+        fmt = sniff_format(path)
+        conn = connect(self.path)
+        try:
+            importer = Importer(conn)
+            with open(path, encoding="utf-8-sig", errors="replace") as f, conn:
+                if fmt == "chrome":
+                    rows = chrome_rows(f, importer, {"bookmark_bar": BAR, "other": parent,
+                                                     "synced": parent})
+                else:
+                    rows = netscape_rows(f, importer, parent)
+                batch = []
+                for row in rows:
+                    batch.append(row)
+                    if len(batch) >= IMPORT_BATCH:
+                        conn.executemany(INSERT, batch)
+                        batch = []
+                conn.executemany(INSERT, batch)
+        finally:
+            conn.close()
+        return {"format": fmt, "bookmarks": importer.bookmarks, "folders": importer.folders,
+                "ms": round((time.perf_counter() - start) * 1000, 1)}
+
+    def import_async(self, path, parent=OTHER):
+        """Import on a worker thread; emits imported (with "error" on failure) and changed"""
+        def work():
+            try:
+                stats = self.import_file(path, parent)
+            except (OSError, ValueError, sqlite3.Error) as e:
+                stats = {"error": str(e)}
+            stats["path"] = path
+            self.imported.emit(stats)
+        self.imported.connect(self.on_imported, Qt.UniqueConnection)
+        threading.Thread(target=work, name="bookmark-import", daemon=True).start()
+
+    def on_imported(self, stats):
+        if "error" not in stats:
+            self.changed.emit()
+
+# ----------------------------
+# Bookmark bar
+# ----------------------------
+BUTTON_MAX_WIDTH = 160  # px of title before it is elided
+MENU_PAGE = 200  # menu entries added per "More…"
+
+class BookmarkMenu(QMenu):
+    """Folder contents, read from the store the first time the menu opens
+
+    Large folders are shown a page at a time; subfolders are menus of
+    their own and stay empty until opened. icon_for(url), if given,
+    supplies bookmark icons.
+    """
+    urlActivated = pyqtSignal(str)
+
+    def __init__(self, store, folder, offset=0, icon_for=None, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.folder = folder
+        self.icon_for = icon_for
+        self.offset = offset
+        self.loaded = 0
+        self.populated = False
+        self.more_action = None
+        self.aboutToShow.connect(self.populate)
+
+    def reset(self, offset=None):
+        if offset is not None:
+            self.offset = offset
+        self.clear()
+        self.loaded = 0
+        self.populated = False
+        self.more_action = None
+
+    def populate(self):
+        if not self.populated:
+            self.populated = True
+            self.add_page()
+
+    def add_page(self):
+        if self.more_action is not None:
+            self.removeAction(self.more_action)
+            self.more_action = None
+        items = self.store.children(self.folder, MENU_PAGE + 1, self.offset + self.loaded)
+        for item in items[:MENU_PAGE]:
+            title = elide(self.fontMetrics(), item.title or item.url or "")
+            if item.folder:
+                submenu = BookmarkMenu(self.store, item.id, icon_for=self.icon_for, parent=self)
+                submenu.setTitle(title)
+                submenu.urlActivated.connect(self.urlActivated)
+                self.addMenu(submenu)
+            else:
+                action = self.addAction(title)
+                action.setToolTip(item.url)
+                if self.icon_for is not None:
+                    action.setIcon(self.icon_for(item.url))
+                action.triggered.connect(lambda _, u=item.url: self.urlActivated.emit(u))
+        self.loaded += len(items[:MENU_PAGE])
+        if len(items) > MENU_PAGE:
+            self.more_action = self.addAction("More…")
+            # Keep the menu open while the next page is added
+            self.more_action.triggered.connect(lambda: (self.add_page(), self.popup(self.pos())))
+        if not self.loaded:
+            self.addAction("(empty)").setEnabled(False)
+
+def elide(metrics, text):
+    return metrics.elidedText(text, Qt.ElideRight, BUTTON_MAX_WIDTH)
+
+class BookmarkBar(QWidget):
+    """Bookmark bar that creates buttons only for the items that fit
+
+    Items are read from the store a page at a time as the bar needs
+    them; whatever does not fit is reached through a "»" menu that is
+    filled when opened. ``buttonAdded`` reports each new button and its
+    URL (None for folders) so callers can watch them, e.g. for hover
+    prerendering. icon_for(url), if given, supplies bookmark icons.
+    """
+    urlActivated = pyqtSignal(str)
+    buttonAdded = pyqtSignal(object, object)
+    PAGE_SIZE = 64
+
+    def __init__(self, store, folder=BAR, icon_for=None, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.folder = folder
+        self.icon_for = icon_for
+        self.items = []
+        self.exhausted = False
+        self.buttons = []
+        self.shown = 0
+
+        self.row = QHBoxLayout()
+        self.row.setContentsMargins(0, 0, 0, 0)
+        self.row.setSpacing(2)
+        self.setLayout(self.row)
+        self.row.addStretch()
+        self.overflow_menu = BookmarkMenu(store, folder, icon_for=icon_for, parent=self)
+        self.overflow_menu.urlActivated.connect(self.urlActivated)
+        self.overflow = QToolButton()
+        self.overflow.setText("»")
+        self.overflow.setPopupMode(QToolButton.InstantPopup)
+        self.overflow.setMenu(self.overflow_menu)
+        self.overflow.setVisible(False)
+        self.row.addWidget(self.overflow)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
+
+        self.relayout_timer = QTimer(self)
+        self.relayout_timer.setSingleShot(True)
+        self.relayout_timer.setInterval(0)
+        self.relayout_timer.timeout.connect(self.relayout)
+        store.changed.connect(self.reload)
+
+    def item(self, index):
+        """The folder's index-th item, reading further pages as needed"""
+        while index >= len(self.items) and not self.exhausted:
+            page = self.store.children(self.folder, self.PAGE_SIZE, len(self.items))
+            self.exhausted = len(page) < self.PAGE_SIZE
+            self.items.extend(page)
+        return self.items[index] if index < len(self.items) else None
+
+    def button(self, index):
+        """The index-th button, created on first use; None past the last item"""
+        while len(self.buttons) <= index:
+            item = self.item(len(self.buttons))
+            if item is None:
+                return None
+            btn = QPushButton(elide(self.fontMetrics(), item.title or item.url or ""))
+            btn.setCursor(Qt.PointingHandCursor)
+            btn.setFlat(True)
+            if item.folder:
+                menu = BookmarkMenu(self.store, item.id, icon_for=self.icon_for, parent=btn)
+                menu.urlActivated.connect(self.urlActivated)
+                btn.setMenu(menu)
+            else:
+                btn.setToolTip(item.url)
+                if self.icon_for is not None:
+                    btn.setIcon(self.icon_for(item.url))
+                btn.clicked.connect(lambda _, u=item.url: self.urlActivated.emit(u))
+            btn.setVisible(False)
+            self.row.insertWidget(len(self.buttons), btn)
+            self.buttons.append(btn)
+            self.buttonAdded.emit(btn, None if item.folder else item.url)
+        return self.buttons[index]
+
+    def relayout(self):
+        """Show as many buttons as fit; the rest go to the overflow menu"""
+        spacing = self.row.spacing()
+        available = self.width() - self.overflow.sizeHint().width() - spacing
+        used = 0
+        shown = 0
+        while True:
+            btn = self.button(shown)
+            if btn is None:
+                break
+            width = btn.sizeHint().width() + spacing
+            if used + width > available:
+                break
+            used += width
+            shown += 1
+        for i, btn in enumerate(self.buttons):
+            btn.setVisible(i < shown)
+        if shown != self.shown:
+            self.overflow_menu.reset(shown)
+        self.shown = shown
+        self.overflow.setVisible(self.item(shown) is not None)
+
+    def reload(self):
+        """Drop buttons and cached items after the store changed"""
+        for btn in self.buttons:
+            btn.deleteLater()
+        self.buttons = []
+        self.items = []
+        self.exhausted = False
+        self.overflow_menu.reset(0)
+        self.shown = 0
+        self.relayout_timer.start()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.relayout_timer.start()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.relayout_timer.start()
@@ -0,0 +1,256 @@
+import os
+import time
+import threading
+from collections import deque
+from PyQt5.QtCore import QObject, QTimer, QUrl, QCoreApplication, pyqtSignal
+from PyQt5.QtWebEngineWidgets import QWebEngineProfile, QWebEnginePage
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QLabel,
+                             QPushButton)
+from telemetry import available_memory
+
+COOKIE_POLICIES = {
+    "never": QWebEngineProfile.NoPersistentCookies,
+    "allow": QWebEngineProfile.AllowPersistentCookies,
+    "force": QWebEngineProfile.ForcePersistentCookies
+}
+
+# Resource Timing: an entry with a body but nothing transferred came from
+# the HTTP cache. Cross-origin entries without Timing-Allow-Origin report
+# no sizes and are left out.
+CACHE_PROBE_JS = """(function () {
+    var entries = performance.getEntriesByType("navigation")
+        .concat(performance.getEntriesByType("resource"));
+    var r = {resources: 0, cached: 0, transferred: 0, decoded: 0};
+    entries.forEach(function (e) {
+        if (!e.decodedBodySize) return;
+        r.resources++;
+        r.decoded += e.decodedBodySize;
+        r.transferred += e.transferSize;
+        if (e.transferSize === 0) r.cached++;
+    });
+    return r;
+})()"""
+
+def directory_size(path):
+    """Total size of the files under path"""
+    total = 0
+    stack = [path]
+    while stack:
+        try:
+            entries = list(os.scandir(stack.pop()))
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    total += entry.stat(follow_symlinks=False).st_size
+            except OSError:
+                continue
+    return total
+
+class BrowserProfile(QObject):
+    """Named persistent profile with a sized disk cache and cache stats
+
+    ``prewarm_urls`` are loaded one at a time into a hidden page once the
+    browser has been idle for ``prewarm_delay`` ms, so their resources
+    are in the disk cache before the first real visit. ``is_busy`` is
+    polled to postpone pre-warming while the user's own pages load.
+    """
+    statsChanged = pyqtSignal(dict)
+
+    def __init__(self, name, storage_path=None, cache_path=None, cache_size=0, cookies="allow",
+                 prewarm_urls=(), prewarm_delay=15000, prewarm_timeout=30000,
+                 min_free_memory=1024 * 1024 * 1024, is_busy=None, parent=None):
+        super().__init__(parent)
+        self.profile = QWebEngineProfile(name, self)
+        if storage_path:
+            self.profile.setPersistentStoragePath(storage_path)
+        if cache_path:
+            self.profile.setCachePath(cache_path)
+        self.profile.setHttpCacheType(QWebEngineProfile.DiskHttpCache)
+        self.profile.setHttpCacheMaximumSize(cache_size)
+        self.profile.setPersistentCookiesPolicy(COOKIE_POLICIES[cookies])
+        self.cookies = cookies
+
+        self.prewarm_queue = deque(prewarm_urls)
+        self.prewarm_timeout = prewarm_timeout
+        self.min_free_memory = min_free_memory
+        self.is_busy = is_busy or (lambda: False)
+        self.prewarm_page = None
+        self.prewarm_started = 0.0
+
+        self.stats = {"loads": 0, "resources": 0, "cached": 0, "transferred": 0, "decoded": 0,
+                      "prewarmed": 0, "prewarm_ms": 0.0, "cache_bytes": None}
+
+        self.prewarm_timer = QTimer(self)
+        self.prewarm_timer.setSingleShot(True)
+        self.prewarm_timer.setInterval(prewarm_delay)
+        self.prewarm_timer.timeout.connect(self.prewarm_next)
+        self.abort_timer = QTimer(self)
+        self.abort_timer.setSingleShot(True)
+        self.abort_timer.timeout.connect(lambda: self.on_prewarmed(False))
+
+    def info(self):
+        """Static settings, for the stats view"""
+        return {
+            "name": self.profile.storageName(),
+            "cache_path": self.profile.cachePath(),
+            "cache_max": self.profile.httpCacheMaximumSize(),
+            "storage_path": self.profile.persistentStoragePath(),
+            "cookies": self.cookies
+        }
+
+    # ----------------------------
+    # Cache hit indicators
+    # ----------------------------
+    def observe(self, page):
+        """Count cache hits for a page that has just finished loading"""
+        if page.url().scheme() in ("http", "https"):
+            page.runJavaScript(CACHE_PROBE_JS, self.on_probe)
+
+    def on_probe(self, result):
+        if not isinstance(result, dict):
+            return
+        self.stats["loads"] += 1
+        for key in ("resources", "cached", "transferred", "decoded"):
+            self.stats[key] += int(result.get(key, 0))
+
+    def hit_ratio(self):
+        if not self.stats["resources"]:
+            return 0.0
+        return self.stats["cached"] / self.stats["resources"]
+
+    def refresh_size(self):
+        """Measure the cache directory on a worker thread; emits statsChanged"""
+        def measure():
+            self.stats["cache_bytes"] = directory_size(self.profile.cachePath())
+            self.statsChanged.emit(dict(self.stats))
+        threading.Thread(target=measure, name="cache-size", daemon=True).start()
+
+    def clear_cache(self):
+        self.profile.clearHttpCache()
+        for key in ("loads", "resources", "cached", "transferred", "decoded"):
+            self.stats[key] = 0
+        self.refresh_size()
+
+    # ----------------------------
+    # Pre-warming
+    # ----------------------------
+    def start_prewarm(self):
+        if self.prewarm_queue:
+            self.prewarm_timer.start()
+
+    def prewarm_next(self):
+        """Load the next configured URL into a hidden page, when idle"""
+        if not self.prewarm_queue or self.prewarm_page is not None:
+            return
+        free = available_memory()
+        if self.is_busy() or (free is not None and free < self.min_free_memory):
+            self.prewarm_timer.start()
+            return
+        url = self.prewarm_queue.popleft()
+        self.prewarm_page = QWebEnginePage(self.profile, self)
+        self.prewarm_page.setAudioMuted(True)
+        self.prewarm_page.loadFinished.connect(self.on_prewarmed)
+        self.prewarm_started = time.perf_counter()
+        self.abort_timer.start(self.prewarm_timeout)
+        self.prewarm_page.load(QUrl(url))
+
+    def on_prewarmed(self, ok):
+        if self.prewarm_page is None:
+            return
+        self.abort_timer.stop()
+        if ok:
+            self.stats["prewarmed"] += 1
+            self.stats["prewarm_ms"] += round((time.perf_counter() - self.prewarm_started) * 1000, 1)
+        self.prewarm_page.loadFinished.disconnect(self.on_prewarmed)
+        self.prewarm_page.deleteLater()
+        self.prewarm_page = None
+        self.statsChanged.emit(dict(self.stats))
+        if self.prewarm_queue:
+            QTimer.singleShot(1000, self.prewarm_next)
+
+    def shutdown(self):
+        self.prewarm_timer.stop()
+        self.prewarm_queue.clear()
+        if self.prewarm_page is not None:
+            self.on_prewarmed(False)
+
+_profiles = {}
+
+def shared_profile(name, **settings):
+    """Return the application's BrowserProfile called name, creating it on first use
+
+    A storage name may only be open once per process, and pages must be
+    deleted before their profile, so the profile belongs to the
+    application rather than to a window. ``settings`` only apply the
+    first time.
+    """
+    browser_profile = _profiles.get(name)
+    if browser_profile is None:
+        app = QCoreApplication.instance()
+        browser_profile = _profiles[name] = BrowserProfile(name, parent=app, **settings)
+        app.aboutToQuit.connect(browser_profile.shutdown)
+    return browser_profile
+
+def format_bytes(n):
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+class CacheStatsDialog(QDialog):
+    """Cache size, settings and hit indicators for the browser profile"""
+    def __init__(self, browser_profile, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Cache")
+        self.setMinimumWidth(480)
+        self.browser_profile = browser_profile
+
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+        layout.addWidget(QLabel("<h2>Cache</h2>"))
+        form = QFormLayout()
+        layout.addLayout(form)
+        self.labels = {}
+        for key, title in (("name", "Profile"), ("cache_path", "Location"), ("size", "Size"),
+                           ("cookies", "Cookies"), ("loads", "Pages observed"),
+                           ("hits", "Resources from cache"), ("saved", "Transferred / total"),
+                           ("prewarmed", "Pre-warmed URLs")):
+            self.labels[key] = QLabel()
+            form.addRow(title, self.labels[key])
+
+        buttons = QHBoxLayout()
+        layout.addLayout(buttons)
+        refresh = QPushButton("Refresh")
+        refresh.clicked.connect(browser_profile.refresh_size)
+        clear = QPushButton("Clear cache")
+        clear.clicked.connect(browser_profile.clear_cache)
+        buttons.addStretch()
+        buttons.addWidget(refresh)
+        buttons.addWidget(clear)
+        browser_profile.statsChanged.connect(self.update_stats)
+
+    def showEvent(self, event):
+        self.update_stats(self.browser_profile.stats)
+        self.browser_profile.refresh_size()
+        super().showEvent(event)
+
+    def update_stats(self, stats):
+        info = self.browser_profile.info()
+        size = stats["cache_bytes"]
+        self.labels["name"].setText(info["name"])
+        self.labels["cache_path"].setText(info["cache_path"])
+        self.labels["size"].setText(
+            f"{format_bytes(size) if size is not None else '…'} of "
+            f"{format_bytes(info['cache_max']) if info['cache_max'] else 'automatic'}")
+        self.labels["cookies"].setText(info["cookies"])
+        self.labels["loads"].setText(str(stats["loads"]))
+        self.labels["hits"].setText(
+            f"{stats['cached']} of {stats['resources']} "
+            f"({self.browser_profile.hit_ratio():.0%})")
+        self.labels["saved"].setText(
+            f"{format_bytes(stats['transferred'])} / {format_bytes(stats['decoded'])}")
+        self.labels["prewarmed"].setText(str(stats["prewarmed"]))
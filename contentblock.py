@@ -0,0 +1,111 @@
+import time
+import threading
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from PyQt5.QtWebEngineCore import QWebEngineUrlRequestInterceptor, QWebEngineUrlRequestInfo
+import blocklist
+from telemetry import RollingJsonlWriter
+
+RESOURCE_TYPE_NAMES = {
+    QWebEngineUrlRequestInfo.ResourceTypeMainFrame: "document",
+    QWebEngineUrlRequestInfo.ResourceTypeSubFrame: "subdocument",
+    QWebEngineUrlRequestInfo.ResourceTypeStylesheet: "stylesheet",
+    QWebEngineUrlRequestInfo.ResourceTypeScript: "script",
+    QWebEngineUrlRequestInfo.ResourceTypeImage: "image",
+    QWebEngineUrlRequestInfo.ResourceTypeFavicon: "image",
+    QWebEngineUrlRequestInfo.ResourceTypeFontResource: "font",
+    QWebEngineUrlRequestInfo.ResourceTypeObject: "object",
+    QWebEngineUrlRequestInfo.ResourceTypePluginResource: "object",
+    QWebEngineUrlRequestInfo.ResourceTypeMedia: "media",
+    QWebEngineUrlRequestInfo.ResourceTypeXhr: "xmlhttprequest",
+    QWebEngineUrlRequestInfo.ResourceTypePing: "ping",
+    QWebEngineUrlRequestInfo.ResourceTypeCspReport: "ping",
+}
+FILTERED_SCHEMES = ("http", "https", "ws", "wss")
+
+class ContentBlocker(QObject):
+    """Shared filter engine plus blocked-request counters
+
+    Lists are compiled (or read from the compiled cache) on a worker
+    thread; requests pass unfiltered until the engine is ready. Count
+    changes are announced at most every ``notify_interval`` ms. With
+    ``record_path`` every checked request is appended to a JSONL file that
+    benchmarks/bench_content_blocking.py can replay.
+    """
+    loaded = pyqtSignal(dict)
+    countsChanged = pyqtSignal()
+
+    def __init__(self, list_paths, cache_path=None, notify_interval=500, record_path=None,
+                 parent=None):
+        super().__init__(parent)
+        self.list_paths = list_paths
+        self.cache_path = cache_path
+        self.engine = blocklist.FilterEngine()
+        self.enabled = True
+        self.blocked = 0
+        self.checked = 0
+        self.recorder = RollingJsonlWriter(record_path) if record_path else None
+        self.recorded = []
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(notify_interval)
+        self.timer.timeout.connect(self.notify)
+
+    def load(self):
+        """Load the filter lists in the background"""
+        threading.Thread(target=self._load, name="blocklist-load", daemon=True).start()
+
+    def _load(self):
+        start = time.perf_counter()
+        engine, from_cache = blocklist.load_engine(self.list_paths, self.cache_path)
+        self.engine = engine
+        self.loaded.emit({
+            "filters": len(engine),
+            "cached": from_cache,
+            "ms": round((time.perf_counter() - start) * 1000, 1)
+        })
+
+    def should_block(self, info):
+        if not self.enabled or info.requestUrl().scheme() not in FILTERED_SCHEMES:
+            return False
+        resource_type = info.resourceType()
+        # Never block top-level navigations the user asked for
+        if resource_type == QWebEngineUrlRequestInfo.ResourceTypeMainFrame:
+            return False
+        self.checked += 1
+        url = info.requestUrl().toString()
+        page_url = info.firstPartyUrl().toString()
+        type_name = RESOURCE_TYPE_NAMES.get(resource_type, "other")
+        if self.recorder is not None:
+            self.recorded.append({"url": url, "page": page_url, "type": type_name})
+            if not self.timer.isActive():
+                self.timer.start()
+        return self.engine.should_block(url, page_url, type_name)
+
+    def count_blocked(self):
+        self.blocked += 1
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def notify(self):
+        """Flush recorded requests and announce new counts"""
+        if self.recorded:
+            try:
+                self.recorder.write(self.recorded)
+            except OSError:
+                pass
+            self.recorded = []
+        self.countsChanged.emit()
+
+class PageBlocker(QWebEngineUrlRequestInterceptor):
+    """Per-page interceptor (runs on the GUI thread) counting what it blocks"""
+    def __init__(self, blocker, parent=None):
+        super().__init__(parent)
+        self.blocker = blocker
+        self.blocked = 0
+
+    def interceptRequest(self, info):
+        if self.blocker.should_block(info):
+            info.block(True)
+            self.blocked += 1
+            self.blocker.count_blocked()
@@ -0,0 +1,366 @@
+import re
+import time
+import queue
+import sqlite3
+import hashlib
+import threading
+from PyQt5.QtCore import Qt, QObject, QTimer, QAbstractTableModel, QModelIndex
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QLineEdit, QTableView, QHeaderView,
+                             QAbstractItemView, QLabel)
+from history import TOKEN_RE, connect, fts_query
+
+# Pages share a document when their text is identical (hash of the
+# whitespace-normalized text); FTS5 keeps the inverted index on disk
+# with delta- and varint-compressed postings and merges it incrementally.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL DEFAULT '',
+    body TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    doc INTEGER NOT NULL REFERENCES docs(id),
+    title TEXT NOT NULL DEFAULT '',
+    visited REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_doc ON pages(doc);
+CREATE INDEX IF NOT EXISTS pages_visited ON pages(visited);
+CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(
+    title, body, content='docs', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2', prefix='2 3 4 5 6 7 8'
+);
+CREATE TRIGGER IF NOT EXISTS docs_ai AFTER INSERT ON docs BEGIN
+    INSERT INTO docs_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+END;
+CREATE TRIGGER IF NOT EXISTS docs_ad AFTER DELETE ON docs BEGIN
+    INSERT INTO docs_fts(docs_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+END;
+"""
+
+UPSERT_PAGE = """
+INSERT INTO pages(url, doc, title, visited) VALUES (?, ?, ?, ?)
+ON CONFLICT(url) DO UPDATE SET doc = excluded.doc, title = excluded.title, visited = excluded.visited
+"""
+DELETE_ORPHANS = "DELETE FROM docs WHERE id NOT IN (SELECT doc FROM pages)"
+# Title matches weigh more than body matches; lower ranks are better.
+# Snippets are cut in Python around the first match: FTS5's snippet()
+# re-tokenizes the whole body, which takes milliseconds on large pages.
+RANK_QUERY = """
+SELECT rowid, rank FROM docs_fts
+WHERE docs_fts MATCH ? AND rank MATCH 'bm25(4.0, 1.0)' ORDER BY rank LIMIT ?
+"""
+BODY_QUERY = "SELECT id, body FROM docs WHERE id IN ({})"
+PAGES_QUERY = "SELECT url, title, visited, doc FROM pages WHERE doc IN ({})"
+
+INDEXED_SCHEMES = ("http", "https")
+MAX_BACKLOG = 32  # pages waiting for the writer; further pages are dropped
+EVICT_BATCH = 100  # oldest pages dropped at a time past max_docs
+SNIPPET_CHARS = 160
+
+def snippet(body, words, width=SNIPPET_CHARS):
+    """The part of body around the first of words, which may be prefixes"""
+    pattern = re.compile(r"\b(?:" + "|".join(map(re.escape, words)) + ")", re.IGNORECASE)
+    match = pattern.search(body)
+    start = max(0, match.start() - width // 3) if match else 0
+    text = body[start:start + width]
+    return ("…" if start else "") + text + ("…" if start + width < len(body) else "")
+
+class ContentIndex:
+    """Full-text index of visited page text, written by a background thread
+
+    ``add`` only queues the text. The writer truncates it to
+    ``max_chars``, skips pages whose text is already indexed, and
+    inserts the rest into FTS5, whose work runs without the GIL. It
+    then sleeps long enough to stay within ``budget`` characters per
+    second, so a run of heavy pages cannot take the CPU from the GUI.
+    The oldest pages are dropped past ``max_docs`` documents. Searches
+    use a separate read-only connection.
+    """
+    def __init__(self, path, max_chars=200000, max_docs=20000, budget=2000000):
+        self.path = path
+        self.max_chars = max_chars
+        self.max_docs = max_docs
+        self.budget = budget
+        self.queue = queue.Queue()
+        self.stats = {"pages": 0, "indexed": 0, "deduplicated": 0, "dropped": 0,
+                      "chars": 0, "evicted": 0, "ms": 0.0}
+
+        conn = connect(path)
+        conn.executescript(SCHEMA)
+        conn.close()
+
+        self._reader = None
+        self.thread = threading.Thread(target=self._run, name="content-index", daemon=True)
+        self.thread.start()
+
+    def add(self, url, title, text, when=None):
+        """Queue a page's text for indexing; never blocks on disk"""
+        if self.queue.qsize() >= MAX_BACKLOG:
+            self.stats["dropped"] += 1
+            return False
+        when = time.time() if when is None else when
+        self.queue.put((url, title or "", text, when))
+        return True
+
+    def flush(self):
+        """Wait until every queued page is indexed"""
+        done = threading.Event()
+        self.queue.put(done)
+        done.wait()
+
+    def close(self):
+        """Index what is queued and stop the writer
+
+        The rate budget is lifted so the (bounded) backlog drains
+        quickly; a daemon writer would lose it at interpreter exit.
+        """
+        self.budget = 0
+        self.queue.put(None)
+        self.thread.join()
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    def _run(self):
+        conn = connect(self.path)
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            if isinstance(item, threading.Event):
+                item.set()
+                continue
+            start = time.perf_counter()
+            chars = self._index(conn, *item)
+            elapsed = time.perf_counter() - start
+            self.stats["ms"] += elapsed * 1000
+            if self.budget:
+                time.sleep(max(0.0, chars / self.budget - elapsed))
+        conn.close()
+
+    def _index(self, conn, url, title, text, when):
+        body = " ".join(text[:self.max_chars].split())
+        if not body:
+            return 0
+        digest = hashlib.sha1(body.encode("utf-8")).hexdigest()
+        self.stats["pages"] += 1
+        try:
+            with conn:
+                row = conn.execute("SELECT id FROM docs WHERE hash = ?", (digest,)).fetchone()
+                if row is not None:
+                    doc = row[0]
+                    self.stats["deduplicated"] += 1
+                else:
+                    doc = conn.execute("INSERT INTO docs(hash, title, body) VALUES (?, ?, ?)",
+                                       (digest, title, body)).lastrowid
+                    self.stats["indexed"] += 1
+                    self.stats["chars"] += len(body)
+                old = conn.execute("SELECT doc FROM pages WHERE url = ?", (url,)).fetchone()
+                conn.execute(UPSERT_PAGE, (url, doc, title, when))
+                if old is not None and old[0] != doc:
+                    conn.execute("DELETE FROM docs WHERE id = ? AND id NOT IN (SELECT doc FROM pages)",
+                                 (old[0],))
+                if row is None:
+                    self._evict(conn)
+        except sqlite3.Error:
+            return 0
+        return 0 if row is not None else len(body)
+
+    def _evict(self, conn):
+        count = conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+        if count <= self.max_docs:
+            return
+        conn.execute("DELETE FROM pages WHERE url IN "
+                     "(SELECT url FROM pages ORDER BY visited LIMIT ?)", (EVICT_BATCH,))
+        self.stats["evicted"] += conn.execute(DELETE_ORPHANS).rowcount
+
+    def reader(self):
+        """Read-only connection for the calling (GUI) thread"""
+        if self._reader is None:
+            self._reader = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        return self._reader
+
+    def search(self, text, limit=50):
+        """Return (url, title, snippet, score, visited) rows, best match first"""
+        match = fts_query(text)
+        if not match:
+            return []
+        try:
+            conn = self.reader()
+            ranks = dict(conn.execute(RANK_QUERY, (match, limit)).fetchall())
+            if not ranks:
+                return []
+            marks = ",".join("?" * len(ranks))
+            bodies = dict(conn.execute(BODY_QUERY.format(marks), tuple(ranks)).fetchall())
+            pages = conn.execute(PAGES_QUERY.format(marks), tuple(ranks)).fetchall()
+        except sqlite3.Error:
+            return []
+        words = TOKEN_RE.findall(text.lower())
+        snippets = {doc: snippet(body, words) for doc, body in bodies.items()}
+        rows = [(url, title, snippets.get(doc, ""), ranks[doc], visited)
+                for url, title, visited, doc in pages]
+        return sorted(rows, key=lambda row: row[3])[:limit]
+
+class PageTextCollector(QObject):
+    """Feeds finished pages' text to a ContentIndex, one page at a time
+
+    Pages are read ``delay`` ms after they finish loading, and not while
+    ``is_busy()`` says another load is under way, so extraction stays
+    off the critical path. A page that navigated away in the meantime
+    is skipped; one reloaded before its turn is read once.
+    """
+    NEXT_INTERVAL = 250  # ms between pages when several are waiting
+    TEXT_TIMEOUT = 10.0  # s to wait for toPlainText before moving on
+
+    def __init__(self, index, delay=2000, is_busy=None, parent=None):
+        super().__init__(parent)
+        self.index = index
+        self.delay = delay
+        self.is_busy = is_busy
+        self.pending = {}  # url -> (page, title), oldest first
+        self.requested = None  # monotonic time of the toPlainText in flight
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.collect)
+
+    def schedule(self, page, url, title=""):
+        """Index page's text once it has settled"""
+        if url.scheme() not in INDEXED_SCHEMES:
+            return
+        key = url.toString()
+        self.pending.pop(key, None)
+        self.pending[key] = (page, title)
+        if not self.timer.isActive():
+            self.timer.start(self.delay)
+
+    def collect(self):
+        if self.requested is not None and time.monotonic() - self.requested < self.TEXT_TIMEOUT:
+            return
+        self.requested = None
+        if self.is_busy is not None and self.is_busy():
+            self.timer.start(self.delay)
+            return
+        while self.pending:
+            url = next(iter(self.pending))
+            page, title = self.pending.pop(url)
+            try:
+                if page.url().toString() != url:
+                    continue
+                page.toPlainText(lambda text, u=url, t=title: self.on_text(u, t, text))
+            except RuntimeError:
+                continue  # the page was deleted
+            self.requested = time.monotonic()
+            return
+
+    def on_text(self, url, title, text):
+        self.requested = None
+        if text:
+            self.index.add(url, title, text)
+        if self.pending:
+            self.timer.start(self.NEXT_INTERVAL)
+
+class ContentResultsModel(QAbstractTableModel):
+    """Search results; pages open in a tab come first"""
+    HEADERS = ("Title", "Match", "URL")
+
+    def __init__(self, icon_for=None, parent=None):
+        super().__init__(parent)
+        self.icon_for = icon_for
+        self.rows = []
+        self.open = set()
+
+    def set_rows(self, rows, open_urls=()):
+        self.beginResetModel()
+        self.open = set(open_urls)
+        self.rows = sorted(rows, key=lambda row: row[0] not in self.open)
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        url, title, snippet, _, _ = self.rows[index.row()]
+        column = index.column()
+        if role == Qt.DisplayRole:
+            if column == 0:
+                title = title or url
+                return f"{title} (open tab)" if url in self.open else title
+            if column == 1:
+                return snippet
+            return url
+        if role == Qt.ToolTipRole:
+            return snippet if column == 1 else url
+        if role == Qt.UserRole:
+            return url
+        if role == Qt.DecorationRole and column == 0 and self.icon_for is not None:
+            return self.icon_for(url)
+        return None
+
+class ContentSearchDialog(QDialog):
+    """Search the text of open tabs and previously visited pages"""
+    def __init__(self, index, open_url, open_urls=None, icon_for=None, limit=50, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Search Page Contents")
+        self.setMinimumSize(800, 450)
+        self.index = index
+        self.open_url = open_url
+        self.open_urls = open_urls
+        self.limit = limit
+
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+        layout.addWidget(QLabel("<h2>Search Page Contents</h2>"))
+
+        self.search = QLineEdit()
+        self.search.setPlaceholderText("Words from a page you have visited")
+        self.search.setClearButtonEnabled(True)
+        layout.addWidget(self.search)
+
+        self.model = ContentResultsModel(icon_for, self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.table.doubleClicked.connect(self.activate)
+        layout.addWidget(self.table)
+
+        self.status = QLabel()
+        layout.addWidget(self.status)
+
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(150)
+        self.search_timer.timeout.connect(self.run_search)
+        self.search.textChanged.connect(self.search_timer.start)
+
+    def run_search(self):
+        start = time.perf_counter()
+        rows = self.index.search(self.search.text(), self.limit)
+        self.model.set_rows(rows, self.open_urls() if self.open_urls is not None else ())
+        ms = (time.perf_counter() - start) * 1000
+        self.status.setText(f"{len(rows)} results in {ms:.1f} ms" if self.search.text() else "")
+
+    def showEvent(self, event):
+        self.search.setFocus()
+        self.search.selectAll()
+        super().showEvent(event)
+
+    def activate(self, index):
+        url = index.data(Qt.UserRole)
+        if url:
+            self.open_url(url)
@@ -0,0 +1,360 @@
+import os
+import time
+import threading
+from collections import deque
+from PyQt5.QtCore import (Qt, QSize, QTimer, QRect, QObject, QAbstractListModel, QModelIndex,
+                          pyqtSignal)
+from PyQt5.QtWebEngineWidgets import QWebEngineDownloadItem
+from PyQt5.QtWidgets import (QApplication, QDialog, QVBoxLayout, QHBoxLayout, QLabel,
+                             QPushButton, QListView, QStyle, QStyledItemDelegate,
+                             QStyleOptionProgressBar, QAbstractItemView)
+import segmented
+
+# UI refresh rate for download progress (ms)
+REFRESH_INTERVAL = 250
+# Rolling window for throughput estimates (s)
+THROUGHPUT_WINDOW = 5.0
+
+ENTRY_ROLE = Qt.UserRole + 1
+
+IN_PROGRESS = "In progress"
+COMPLETED = "Completed"
+CANCELLED = "Cancelled"
+INTERRUPTED = "Interrupted"
+
+def format_size(num_bytes):
+    """Human readable byte count"""
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(num_bytes) < 1024 or unit == "GB":
+            return f"{num_bytes:.0f} {unit}" if unit == "B" else f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+
+def format_eta(seconds):
+    """Human readable remaining time"""
+    if seconds is None:
+        return "--:--"
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+class ThroughputEstimator:
+    """Rolling-window throughput and ETA estimate"""
+    def __init__(self, window=THROUGHPUT_WINDOW):
+        self.window = window
+        self.samples = deque()
+
+    def add(self, received, now=None):
+        """Record the total bytes received at a point in time"""
+        now = time.monotonic() if now is None else now
+        self.samples.append((now, received))
+        while len(self.samples) > 2 and now - self.samples[0][0] > self.window:
+            self.samples.popleft()
+
+    def rate(self):
+        """Bytes per second over the window"""
+        if len(self.samples) < 2:
+            return 0.0
+        (t0, b0), (t1, b1) = self.samples[0], self.samples[-1]
+        if t1 <= t0:
+            return 0.0
+        return max(b1 - b0, 0) / (t1 - t0)
+
+    def eta(self, remaining):
+        """Seconds until remaining bytes arrive, or None if stalled"""
+        rate = self.rate()
+        return remaining / rate if rate > 0 else None
+
+class DownloadEntry:
+    """Plain state for one row of the download list"""
+    def __init__(self, name, path, download=None):
+        self.name = name
+        self.path = path
+        self.download = download
+        self.received = 0
+        self.total = 0
+        self.state = IN_PROGRESS
+        self.estimator = ThroughputEstimator()
+        self.job = None
+        self.row = -1
+
+    def percent(self):
+        if self.state == COMPLETED:
+            return 100
+        return int(self.received * 100 / self.total) if self.total > 0 else 0
+
+    def status_text(self):
+        if self.state != IN_PROGRESS:
+            return self.state
+        rate = self.estimator.rate()
+        eta = self.estimator.eta(self.total - self.received) if self.total > 0 else None
+        size = format_size(self.received)
+        if self.total > 0:
+            size += f" / {format_size(self.total)}"
+        return f"{size}  {format_size(rate)}/s  {format_eta(eta)}"
+
+class DownloadListModel(QAbstractListModel):
+    """Download list with progress updates coalesced to a fixed rate"""
+    activeCountChanged = pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.entries = []
+        self._active = set()
+        self._dirty = set()
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(REFRESH_INTERVAL)
+        self.timer.timeout.connect(self.flush)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.entries)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.entries):
+            return None
+        entry = self.entries[index.row()]
+        if role == Qt.DisplayRole:
+            return entry.name
+        if role == Qt.ToolTipRole:
+            return entry.path
+        if role == ENTRY_ROLE:
+            return entry
+        return None
+
+    def add_entry(self, entry):
+        """Append an entry and start tracking it"""
+        row = len(self.entries)
+        self.beginInsertRows(QModelIndex(), row, row)
+        entry.row = row
+        self.entries.append(entry)
+        self.endInsertRows()
+        if entry.state == IN_PROGRESS:
+            self._active.add(entry)
+            if not self.timer.isActive():
+                self.timer.start()
+        self.activeCountChanged.emit(len(self._active))
+        return entry
+
+    def add_download(self, download):
+        """Track a QWebEngineDownloadItem"""
+        entry = DownloadEntry(os.path.basename(download.path()), download.path(), download)
+        download.downloadProgress.connect(
+            lambda received, total, e=entry: self.set_progress(e, received, total))
+        download.stateChanged.connect(
+            lambda state, e=entry: self.set_state(e, self.map_state(state)))
+        return self.add_entry(entry)
+
+    @staticmethod
+    def map_state(state):
+        return {
+            QWebEngineDownloadItem.DownloadCompleted: COMPLETED,
+            QWebEngineDownloadItem.DownloadCancelled: CANCELLED,
+            QWebEngineDownloadItem.DownloadInterrupted: INTERRUPTED,
+        }.get(state, IN_PROGRESS)
+
+    def set_progress(self, entry, received, total):
+        """Record progress; the view is refreshed on the next tick"""
+        entry.received = received
+        entry.total = total
+
+    def set_state(self, entry, state):
+        """Record a state change; finished rows get a final refresh"""
+        entry.state = state
+        if state == IN_PROGRESS and entry not in self._active:
+            self._active.add(entry)
+            self.timer.start()
+            self.activeCountChanged.emit(len(self._active))
+        elif state != IN_PROGRESS and entry in self._active:
+            self._active.discard(entry)
+            self._dirty.add(entry)
+            self.activeCountChanged.emit(len(self._active))
+
+    def flush(self):
+        """Push all pending changes to the view in one dataChanged"""
+        now = time.monotonic()
+        for entry in self._active:
+            entry.estimator.add(entry.received, now)
+        changed = self._active | self._dirty
+        self._dirty = set()
+        if changed:
+            rows = [e.row for e in changed if e.row >= 0]
+            if rows:
+                self.dataChanged.emit(self.index(min(rows)), self.index(max(rows)))
+        if not self._active:
+            self.timer.stop()
+
+    def remove_entry(self, entry):
+        """Remove a single entry from the list"""
+        if entry.row < 0:
+            return
+        row = entry.row
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.entries[row]
+        for e in self.entries[row:]:
+            e.row -= 1
+        entry.row = -1
+        self._active.discard(entry)
+        self._dirty.discard(entry)
+        self.endRemoveRows()
+        self.activeCountChanged.emit(len(self._active))
+
+    def clear_completed(self):
+        """Remove completed downloads from the list"""
+        keep = [e for e in self.entries if e.state != COMPLETED]
+        if len(keep) == len(self.entries):
+            return
+        self.beginResetModel()
+        for e in self.entries:
+            e.row = -1
+        self.entries = keep
+        for row, e in enumerate(self.entries):
+            e.row = row
+        self._dirty = {e for e in self._dirty if e.row >= 0}
+        self.endResetModel()
+
+class SegmentedJob(QObject):
+    """Runs a SegmentedDownload on a worker thread and reports back via signals"""
+    progress = pyqtSignal('qint64', 'qint64')
+    stateChanged = pyqtSignal(str, str)
+    unsupported = pyqtSignal(str)
+
+    def __init__(self, url, path, segments, parent=None):
+        super().__init__(parent)
+        self.url = url
+        self.path = path
+        self.segments = segments
+        self.engine = None
+
+    def start(self):
+        """Start, or resume from the journal after an interruption"""
+        self.engine = segmented.SegmentedDownload(
+            self.url, self.path, self.segments, progress=self.progress.emit
+        )
+        self.stateChanged.emit(IN_PROGRESS, "")
+        threading.Thread(target=self._run, name="segmented-download", daemon=True).start()
+
+    def cancel(self):
+        if self.engine:
+            self.engine.cancel()
+
+    def _run(self):
+        try:
+            self.engine.run()
+        except segmented.RangesNotSupported as e:
+            self.unsupported.emit(str(e))
+        except segmented.DownloadCancelled:
+            self.stateChanged.emit(CANCELLED, "")
+        except (segmented.DownloadError, OSError) as e:
+            self.stateChanged.emit(INTERRUPTED, str(e))
+        else:
+            self.stateChanged.emit(COMPLETED, "")
+
+class DownloadDelegate(QStyledItemDelegate):
+    """Paints a download row: name, status and a progress bar"""
+    ROW_HEIGHT = 44
+    MARGIN = 6
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.ROW_HEIGHT)
+
+    def paint(self, painter, option, index):
+        entry = index.data(ENTRY_ROLE)
+        if entry is None:
+            return super().paint(painter, option, index)
+
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawPrimitive(QStyle.PE_PanelItemViewItem, option, painter, option.widget)
+
+        rect = option.rect.adjusted(self.MARGIN, self.MARGIN // 2, -self.MARGIN, -self.MARGIN // 2)
+        text_height = option.fontMetrics.height()
+        status = entry.status_text()
+        status_width = option.fontMetrics.horizontalAdvance(status)
+
+        painter.save()
+        if option.state & QStyle.State_Selected:
+            painter.setPen(option.palette.highlightedText().color())
+        name_rect = QRect(rect.left(), rect.top(), rect.width() - status_width - self.MARGIN, text_height)
+        name = option.fontMetrics.elidedText(entry.name, Qt.ElideMiddle, name_rect.width())
+        painter.drawText(name_rect, Qt.AlignLeft | Qt.AlignVCenter, name)
+        painter.drawText(QRect(rect.right() - status_width, rect.top(), status_width, text_height),
+                         Qt.AlignRight | Qt.AlignVCenter, status)
+        painter.restore()
+
+        bar = QStyleOptionProgressBar()
+        bar.rect = QRect(rect.left(), rect.top() + text_height + 4, rect.width(),
+                         max(rect.height() - text_height - 4, 4))
+        bar.minimum = 0
+        bar.maximum = 100
+        bar.progress = entry.percent()
+        bar.textVisible = False
+        bar.state = option.state | QStyle.State_Enabled
+        style.drawControl(QStyle.CE_ProgressBar, bar, painter, option.widget)
+
+class DownloadManager(QDialog):
+    """Download manager window"""
+    fallbackRequested = pyqtSignal(str, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Downloads")
+        self.setMinimumSize(600, 400)
+
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+
+        # Header
+        header = QLabel("<h2>Downloads</h2>")
+        layout.addWidget(header)
+
+        # Download list
+        self.model = DownloadListModel(self)
+        self.download_list = QListView()
+        self.download_list.setModel(self.model)
+        self.download_list.setItemDelegate(DownloadDelegate(self.download_list))
+        self.download_list.setUniformItemSizes(True)
+        self.download_list.setAlternatingRowColors(True)
+        self.download_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.download_list.doubleClicked.connect(self.resume_download)
+        layout.addWidget(self.download_list)
+
+        # Buttons
+        btn_layout = QHBoxLayout()
+        layout.addLayout(btn_layout)
+
+        self.clear_btn = QPushButton("Clear Completed")
+        self.clear_btn.clicked.connect(self.clear_completed)
+        btn_layout.addWidget(self.clear_btn)
+
+        self.close_btn = QPushButton("Close")
+        self.close_btn.clicked.connect(self.hide)
+        btn_layout.addWidget(self.close_btn)
+
+    def add_download(self, download_item):
+        """Add a new download to the manager"""
+        return self.model.add_download(download_item)
+
+    def add_segmented(self, url, path, segments):
+        """Download url with the segmented engine; falls back if ranges are unsupported"""
+        entry = self.model.add_entry(DownloadEntry(os.path.basename(path), path))
+        entry.job = SegmentedJob(url, path, segments, self)
+        entry.job.progress.connect(lambda received, total: self.model.set_progress(entry, received, total))
+        entry.job.stateChanged.connect(lambda state, error: self.model.set_state(entry, state))
+        entry.job.unsupported.connect(lambda _: self.on_unsupported(entry))
+        entry.job.start()
+        return entry
+
+    def on_unsupported(self, entry):
+        """Hand a download the engine cannot take back to the browser"""
+        self.model.remove_entry(entry)
+        self.fallbackRequested.emit(entry.job.url, entry.path)
+
+    def resume_download(self, index):
+        """Resume an interrupted segmented download from its journal"""
+        entry = index.data(ENTRY_ROLE)
+        if entry is not None and entry.job is not None and entry.state in (INTERRUPTED, CANCELLED):
+            entry.job.start()
+
+    def clear_completed(self):
+        """Remove completed downloads from the list"""
+        self.model.clear_completed()
@@ -0,0 +1,125 @@
+import time
+import queue
+import threading
+from collections import deque, namedtuple
+from logging import DEBUG, INFO, WARNING, ERROR, getLevelName
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from telemetry import RollingJsonlWriter
+
+LogRecord = namedtuple("LogRecord", "time level category message")
+
+class FileSink:
+    """Writes log records to a rotating JSONL file on a background thread"""
+    def __init__(self, path, max_bytes=5 * 1024 * 1024, backups=3, max_pending=10000):
+        self.writer = RollingJsonlWriter(path, max_bytes, backups)
+        self.queue = queue.Queue(max_pending)
+        self.dropped = 0
+        self.thread = threading.Thread(target=self._run, name="log-sink", daemon=True)
+        self.thread.start()
+
+    def put(self, records):
+        try:
+            self.queue.put_nowait(records)
+        except queue.Full:
+            self.dropped += len(records)
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join(timeout=2)
+
+    def _run(self):
+        while True:
+            batch = self.queue.get()
+            if batch is None:
+                return
+            records = list(batch)
+            # Drain whatever else is waiting so rotation checks happen once
+            while True:
+                try:
+                    more = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if more is None:
+                    self._write(records)
+                    return
+                records.extend(more)
+            self._write(records)
+
+    def _write(self, records):
+        try:
+            self.writer.write([
+                {
+                    "time": round(r.time, 3),
+                    "level": getLevelName(r.level),
+                    "category": r.category,
+                    "message": r.message
+                }
+                for r in records
+            ])
+        except OSError:
+            self.dropped += len(records)
+
+class EventLog(QObject):
+    """Structured log with a ring buffer and batched delivery
+
+    ``log()`` only filters and appends; the console and file sink receive
+    records in batches every ``flush_interval`` ms. Categories can be
+    sampled (keep one record in N) or dropped with a rate of 0.
+    """
+    flushed = pyqtSignal(list)
+
+    def __init__(self, capacity=5000, flush_interval=200, level=INFO,
+                 sampling=None, sink=None, parent=None):
+        super().__init__(parent)
+        self.records = deque(maxlen=capacity)
+        self.level = level
+        self.sampling = dict(sampling or {})
+        self.sink = sink
+        self.counts = {}
+        self._pending = deque(maxlen=capacity)
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(flush_interval)
+        self.timer.timeout.connect(self.flush)
+
+    def log(self, message, level=INFO, category="general"):
+        """Record a message; returns False if it was filtered out"""
+        if level < self.level:
+            return False
+        rate = self.sampling.get(category, 1)
+        if rate != 1:
+            seen = self.counts.get(category, 0)
+            self.counts[category] = seen + 1
+            if rate <= 0 or seen % rate:
+                return False
+
+        record = LogRecord(time.time(), level, category, message)
+        self.records.append(record)
+        self._pending.append(record)
+        if not self.timer.isActive():
+            self.timer.start()
+        return True
+
+    def flush(self):
+        """Deliver pending records to the console and file sink"""
+        self.timer.stop()
+        if not self._pending:
+            return
+        batch = list(self._pending)
+        self._pending.clear()
+        if self.sink:
+            self.sink.put(batch)
+        self.flushed.emit(batch)
+
+    def close(self):
+        self.flush()
+        if self.sink:
+            self.sink.close()
+
+def format_record(record):
+    """Render a record as a console line"""
+    timestamp = time.strftime("%H:%M:%S", time.localtime(record.time))
+    if record.level == INFO:
+        return f"[{timestamp}] {record.message}"
+    return f"[{timestamp}] {getLevelName(record.level)}: {record.message}"
@@ -0,0 +1,228 @@
+import os
+import time
+import sqlite3
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from PyQt5.QtCore import QObject, QUrl, QBuffer, QIODevice, pyqtSignal
+from PyQt5.QtGui import QIcon, QPixmap
+from session import atomic_write
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS hosts (
+    host TEXT PRIMARY KEY,
+    hash TEXT NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS hosts_last_used ON hosts(last_used);
+CREATE INDEX IF NOT EXISTS hosts_hash ON hosts(hash);
+"""
+
+UPSERT_HOST = """
+INSERT INTO hosts(host, hash, last_used) VALUES (?, ?, ?)
+ON CONFLICT(host) DO UPDATE SET hash = excluded.hash, last_used = excluded.last_used
+"""
+ORPHANS = "SELECT hash FROM blobs WHERE hash NOT IN (SELECT hash FROM hosts)"
+EVICT_BATCH = 64  # hosts dropped per eviction round
+EVICT_TARGET = 0.9  # evict down to this fraction of the disk limit
+
+def host_of(url):
+    if not isinstance(url, QUrl):
+        url = QUrl(url)
+    return url.host().lower()
+
+def connect(path, check_same_thread=True):
+    conn = sqlite3.connect(path, timeout=10, check_same_thread=check_same_thread)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+class FaviconCache(QObject):
+    """Favicons by host: a memory LRU of decoded icons over a content-addressed disk store
+
+    Icon files are named by the SHA-1 of their PNG encoding, so hosts
+    sharing an icon share one file and one decoded QIcon. An index maps
+    each host to its icon's hash. ``store`` only grabs the image on the
+    GUI thread; encoding, hashing, writing and disk eviction run on a
+    single worker thread. Until a store lands the icon is served from
+    memory, so a lookup right after ``iconChanged`` already hits.
+    """
+    stored = pyqtSignal(str, str, bool, int)  # host, hash, new file, files evicted
+
+    def __init__(self, directory, max_icons=512, max_disk_bytes=20 * 1024 * 1024, size=32,
+                 parent=None):
+        super().__init__(parent)
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.index_path = os.path.join(directory, "index.sqlite")
+        self.max_icons = max_icons
+        self.max_disk_bytes = max_disk_bytes
+        self.size = size
+
+        conn = connect(self.index_path)
+        conn.executescript(SCHEMA)
+        conn.close()
+        self._reader = None
+        self._writer = None  # used only by the worker thread
+
+        self.icons = OrderedDict()  # hash -> QIcon, least recently used first
+        self.hosts = {}  # host -> hash, or None when the host has no icon on disk
+        self.pending = {}  # host -> QIcon not yet on disk
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stored": 0,
+                      "deduplicated": 0, "evicted_memory": 0, "evicted_disk": 0}
+
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="favicons")
+        self.stored.connect(self.on_stored)
+
+    def blob_path(self, digest):
+        return os.path.join(self.directory, digest[:2], f"{digest}.png")
+
+    def reader(self):
+        if self._reader is None:
+            self._reader = connect(self.index_path)
+        return self._reader
+
+    # ----------------------------
+    # Lookups (GUI thread)
+    # ----------------------------
+    def lookup(self, url):
+        """Return the cached QIcon for url's host, or None"""
+        host = host_of(url)
+        if not host:
+            return None
+        icon = self.pending.get(host)
+        if icon is not None:
+            self.stats["memory_hits"] += 1
+            return icon
+        if host in self.hosts:
+            digest = self.hosts[host]
+        else:
+            row = self.reader().execute("SELECT hash FROM hosts WHERE host = ?", (host,)).fetchone()
+            digest = self.hosts[host] = row[0] if row else None
+        if digest is None:
+            self.stats["misses"] += 1
+            return None
+        icon = self.icons.get(digest)
+        if icon is not None:
+            self.icons.move_to_end(digest)
+            self.stats["memory_hits"] += 1
+            return icon
+        pixmap = QPixmap(self.blob_path(digest))
+        if pixmap.isNull():
+            self.hosts[host] = None
+            self.stats["misses"] += 1
+            return None
+        icon = QIcon(pixmap)
+        self.remember(digest, icon)
+        self.stats["disk_hits"] += 1
+        self.executor.submit(self._touch, host, time.time())
+        return icon
+
+    def icon_for(self, url):
+        """Like lookup, with an empty QIcon on a miss; for item views and buttons"""
+        icon = self.lookup(url)
+        return icon if icon is not None else QIcon()
+
+    def remember(self, digest, icon):
+        self.icons[digest] = icon
+        self.icons.move_to_end(digest)
+        while len(self.icons) > self.max_icons:
+            self.icons.popitem(last=False)
+            self.stats["evicted_memory"] += 1
+
+    def hit_rate(self):
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        total = hits + self.stats["misses"]
+        return hits / total if total else 0.0
+
+    # ----------------------------
+    # Stores
+    # ----------------------------
+    def store(self, url, icon):
+        """Cache a page's favicon for its host; the disk write is asynchronous"""
+        host = host_of(url)
+        if not host or icon.isNull():
+            return
+        self.pending[host] = icon
+        image = icon.pixmap(self.size, self.size).toImage()
+        self.executor.submit(self._store, host, image)
+
+    def on_stored(self, host, digest, new, evicted):
+        self.hosts[host] = digest
+        icon = self.pending.pop(host, None)
+        if icon is not None and digest not in self.icons:
+            self.remember(digest, icon)
+        self.stats["stored"] += 1
+        if not new:
+            self.stats["deduplicated"] += 1
+        self.stats["evicted_disk"] += evicted
+
+    def writer(self):
+        if self._writer is None:
+            self._writer = connect(self.index_path, check_same_thread=False)
+        return self._writer
+
+    def _store(self, host, image):
+        buffer = QBuffer()
+        buffer.open(QIODevice.WriteOnly)
+        image.save(buffer, "PNG")
+        data = bytes(buffer.data())
+        digest = hashlib.sha1(data).hexdigest()
+        path = self.blob_path(digest)
+        new = not os.path.exists(path)
+        try:
+            if new:
+                atomic_write(path, data)
+            conn = self.writer()
+            with conn:
+                conn.execute("INSERT OR IGNORE INTO blobs(hash, size) VALUES (?, ?)", (digest, len(data)))
+                conn.execute(UPSERT_HOST, (host, digest, time.time()))
+            evicted = self._evict(conn)
+        except (OSError, sqlite3.Error):
+            return
+        self.stored.emit(host, digest, new, evicted)
+
+    def _touch(self, host, when):
+        try:
+            with self.writer() as conn:
+                conn.execute("UPDATE hosts SET last_used = ? WHERE host = ?", (when, host))
+        except sqlite3.Error:
+            pass
+
+    def _evict(self, conn):
+        """Drop least recently used hosts, and files no host uses, past the disk limit"""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        if total <= self.max_disk_bytes:
+            return 0
+        removed = 0
+        while total > self.max_disk_bytes * EVICT_TARGET:
+            with conn:
+                hosts = conn.execute("SELECT host FROM hosts ORDER BY last_used LIMIT ?",
+                                     (EVICT_BATCH,)).fetchall()
+                if not hosts:
+                    break
+                conn.executemany("DELETE FROM hosts WHERE host = ?", hosts)
+                orphans = [row[0] for row in conn.execute(ORPHANS)]
+                conn.executemany("DELETE FROM blobs WHERE hash = ?", ((h,) for h in orphans))
+            for digest in orphans:
+                try:
+                    os.remove(self.blob_path(digest))
+                except OSError:
+                    pass
+            removed += len(orphans)
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        return removed
+
+    def shutdown(self):
+        """Finish pending writes and close the index"""
+        self.executor.shutdown(wait=True)
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
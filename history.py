@@ -0,0 +1,305 @@
+import re
+import time
+import queue
+import sqlite3
+import threading
+from PyQt5.QtCore import Qt, QTimer, QAbstractTableModel, QModelIndex, QDateTime
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QLineEdit, QTableView, QHeaderView,
+                             QAbstractItemView, QLabel)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL DEFAULT '',
+    visit_count INTEGER NOT NULL DEFAULT 0,
+    last_visit REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS urls_last_visit ON urls(last_visit);
+CREATE TABLE IF NOT EXISTS visits (
+    id INTEGER PRIMARY KEY,
+    url_id INTEGER NOT NULL REFERENCES urls(id),
+    visit_time REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS visits_url ON visits(url_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS urls_fts USING fts5(
+    url, title, content='urls', content_rowid='id', prefix='2 3 4 5 6 7 8'
+);
+CREATE TRIGGER IF NOT EXISTS urls_ai AFTER INSERT ON urls BEGIN
+    INSERT INTO urls_fts(rowid, url, title) VALUES (new.id, new.url, new.title);
+END;
+CREATE TRIGGER IF NOT EXISTS urls_ad AFTER DELETE ON urls BEGIN
+    INSERT INTO urls_fts(urls_fts, rowid, url, title) VALUES ('delete', old.id, old.url, old.title);
+END;
+CREATE TRIGGER IF NOT EXISTS urls_au AFTER UPDATE OF url, title ON urls
+WHEN old.url IS NOT new.url OR old.title IS NOT new.title BEGIN
+    INSERT INTO urls_fts(urls_fts, rowid, url, title) VALUES ('delete', old.id, old.url, old.title);
+    INSERT INTO urls_fts(rowid, url, title) VALUES (new.id, new.url, new.title);
+END;
+"""
+
+UPSERT_VISIT = """
+INSERT INTO urls(url, title, visit_count, last_visit) VALUES (?, ?, 1, ?)
+ON CONFLICT(url) DO UPDATE SET
+    visit_count = visit_count + 1,
+    last_visit = excluded.last_visit,
+    title = CASE WHEN excluded.title != '' THEN excluded.title ELSE title END
+"""
+INSERT_VISIT = "INSERT INTO visits(url_id, visit_time) SELECT id, ? FROM urls WHERE url = ?"
+UPDATE_TITLE = "UPDATE urls SET title = ? WHERE url = ?"
+
+COLUMNS = "u.url, u.title, u.visit_count, u.last_visit"
+RECENT_QUERY = f"SELECT {COLUMNS} FROM urls u ORDER BY u.last_visit DESC LIMIT ? OFFSET ?"
+# Matches are walked newest-first by rowid so LIMIT stops the scan early;
+# ordering by bm25 rank would score every match of a common term.
+SEARCH_QUERY = (f"SELECT {COLUMNS} FROM urls_fts f JOIN urls u ON u.id = f.rowid "
+                f"WHERE urls_fts MATCH ? ORDER BY f.rowid DESC LIMIT ? OFFSET ?")
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+# Longest prefix covered by the FTS prefix index; longer prefixes would
+# make FTS5 materialize the whole doclist
+MAX_PREFIX = 8
+
+def fts_query(text):
+    """Turn free text into an FTS5 query: whole words plus a prefix for the last one"""
+    tokens = TOKEN_RE.findall(text.lower())
+    if not tokens:
+        return ""
+    terms = [f'"{token}"' for token in tokens[:-1]]
+    terms.append(f'"{tokens[-1][:MAX_PREFIX]}"*')
+    return " ".join(terms)
+
+def connect(path):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+class HistoryStore:
+    """SQLite (WAL) browsing history with a background writer thread
+
+    Visits are queued by the GUI thread and written in batched
+    transactions by the writer; reads use a separate connection.
+    """
+    def __init__(self, path, batch_delay=0.5, max_batch=500):
+        self.path = path
+        self.batch_delay = batch_delay
+        self.max_batch = max_batch
+        self.queue = queue.Queue()
+
+        conn = connect(path)
+        conn.executescript(SCHEMA)
+        conn.close()
+
+        self._reader = None
+        self.thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self.thread.start()
+
+    def record_visit(self, url, title="", when=None):
+        """Queue a visit; never blocks on disk"""
+        when = time.time() if when is None else when
+        self.queue.put(("visit", url, title or "", when))
+
+    def update_title(self, url, title):
+        """Queue a title update for a visited URL"""
+        self.queue.put(("title", url, title))
+
+    def flush(self):
+        """Wait until every queued visit is written"""
+        done = threading.Event()
+        self.queue.put(done)
+        done.wait()
+
+    def close(self):
+        """Write pending visits and stop the writer
+
+        Waits for the whole queue: the writer is a daemon thread, so
+        anything still queued when the interpreter exits is lost.
+        """
+        self.queue.put(None)
+        self.thread.join()
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    def _run(self):
+        conn = connect(self.path)
+        running = True
+        while running:
+            item = self.queue.get()
+            if item is None:
+                break
+            if isinstance(item, threading.Event):
+                item.set()
+                continue
+            batch = [item]
+            done = None
+            deadline = time.monotonic() + self.batch_delay
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    running = False
+                    break
+                if isinstance(item, threading.Event):
+                    done = item
+                    break
+                batch.append(item)
+            self._write(conn, batch)
+            if done is not None:
+                done.set()
+        conn.close()
+
+    def _write(self, conn, batch):
+        try:
+            with conn:
+                for op in batch:
+                    if op[0] == "visit":
+                        _, url, title, when = op
+                        conn.execute(UPSERT_VISIT, (url, title, when))
+                        conn.execute(INSERT_VISIT, (when, url))
+                    else:
+                        _, url, title = op
+                        conn.execute(UPDATE_TITLE, (title, url))
+        except sqlite3.Error:
+            pass
+
+    def reader(self):
+        """Read-only connection for the calling (GUI) thread"""
+        if self._reader is None:
+            self._reader = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        return self._reader
+
+    def query(self, text="", limit=100, offset=0):
+        """Return (url, title, visit_count, last_visit) rows, newest or best first"""
+        match = fts_query(text)
+        try:
+            if match:
+                return self.reader().execute(SEARCH_QUERY, (match, limit, offset)).fetchall()
+            return self.reader().execute(RECENT_QUERY, (limit, offset)).fetchall()
+        except sqlite3.Error:
+            return []
+
+    def top_urls(self, limit=50000):
+        """Most visited URLs, for building suggestion indexes (any thread)"""
+        try:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            try:
+                return conn.execute(
+                    f"SELECT {COLUMNS} FROM urls u ORDER BY u.visit_count DESC LIMIT ?", (limit,)
+                ).fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return []
+
+class HistoryModel(QAbstractTableModel):
+    """History rows fetched from the store one page at a time"""
+    HEADERS = ("Title", "URL", "Visits", "Last visited")
+    PAGE_SIZE = 200
+
+    def __init__(self, store, icon_for=None, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.icon_for = icon_for
+        self.text = ""
+        self.rows = []
+        self.exhausted = False
+
+    def set_filter(self, text):
+        self.beginResetModel()
+        self.text = text
+        self.rows = []
+        self.exhausted = False
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        url, title, visits, last_visit = self.rows[index.row()]
+        if role == Qt.DisplayRole:
+            column = index.column()
+            if column == 0:
+                return title or url
+            if column == 1:
+                return url
+            if column == 2:
+                return visits
+            return QDateTime.fromMSecsSinceEpoch(int(last_visit * 1000)).toString("yyyy-MM-dd hh:mm")
+        if role == Qt.ToolTipRole:
+            return url
+        if role == Qt.UserRole:
+            return url
+        if role == Qt.DecorationRole and index.column() == 0 and self.icon_for is not None:
+            return self.icon_for(url)
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        page = self.store.query(self.text, self.PAGE_SIZE, len(self.rows))
+        if len(page) < self.PAGE_SIZE:
+            self.exhausted = True
+        if page:
+            self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(page) - 1)
+            self.rows.extend(page)
+            self.endInsertRows()
+
+class HistoryDialog(QDialog):
+    """Searchable history view"""
+    def __init__(self, store, open_url, icon_for=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("History")
+        self.setMinimumSize(700, 450)
+        self.open_url = open_url
+
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+        layout.addWidget(QLabel("<h2>History</h2>"))
+
+        self.search = QLineEdit()
+        self.search.setPlaceholderText("Search history")
+        self.search.setClearButtonEnabled(True)
+        layout.addWidget(self.search)
+
+        self.model = HistoryModel(store, icon_for, self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.table.doubleClicked.connect(self.activate)
+        layout.addWidget(self.table)
+
+        # Debounce typing so each keystroke does not hit the database
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(150)
+        self.search_timer.timeout.connect(lambda: self.model.set_filter(self.search.text()))
+        self.search.textChanged.connect(self.search_timer.start)
+
+    def showEvent(self, event):
+        self.model.set_filter(self.search.text())
+        super().showEvent(event)
+
+    def activate(self, index):
+        url = index.data(Qt.UserRole)
+        if url:
+            self.open_url(url)
@@ -0,0 +1,78 @@
+import os
+from collections import Counter
+from PyQt5.QtCore import QObject
+
+import telemetry
+
+class LeakTracker(QObject):
+    """Debug counter of live tabs, views and pages
+
+    Objects are counted from track() until Qt destroys them, so a count
+    that keeps growing while tabs are opened and closed is a leak.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.live = Counter()
+        self.created = Counter()
+
+    def track(self, obj, kind):
+        self.live[kind] += 1
+        self.created[kind] += 1
+        obj.destroyed.connect(lambda *_: self.untrack(kind))
+
+    def untrack(self, kind):
+        self.live[kind] -= 1
+
+    def snapshot(self):
+        """Return live object counts plus renderer processes and RSS"""
+        counts = {kind: self.live[kind] for kind in ("tab", "view", "page")}
+        counts["renderers"] = len(renderer_pids())
+        counts["rss_mb"] = round(process_tree_rss() / (1024 * 1024), 1)
+        return counts
+
+def child_pids(root=None):
+    """Return every descendant of root (default: this process) from /proc"""
+    root = root or os.getpid()
+    children = {}
+    try:
+        entries = [e for e in os.listdir("/proc") if e.isdigit()]
+    except OSError:
+        return []
+    for entry in entries:
+        try:
+            with open(f"/proc/{entry}/stat", "rb") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # The command name may contain spaces, so split after the closing paren
+        ppid = int(stat[stat.rfind(b")") + 2:].split()[1])
+        children.setdefault(ppid, []).append(int(entry))
+
+    found = []
+    stack = [root]
+    while stack:
+        for pid in children.get(stack.pop(), ()):
+            found.append(pid)
+            stack.append(pid)
+    return found
+
+def renderer_pids():
+    """Return the PIDs of Chromium renderer processes started by this process"""
+    pids = []
+    for pid in child_pids():
+        try:
+            with open(f"/proc/{pid}/cmdline", "rb") as f:
+                if b"--type=renderer" in f.read():
+                    pids.append(pid)
+        except OSError:
+            continue
+    return pids
+
+def process_tree_rss():
+    """Resident memory of this process and all of its descendants, in bytes"""
+    total = 0
+    for pid in [os.getpid()] + child_pids():
+        stats = telemetry.read_proc_stats(pid)
+        if stats:
+            total += stats[0]
+    return total
@@ -0,0 +1,122 @@
+import time
+from collections import Counter
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+# ----------------------------
+# Tab lifecycle states
+# ----------------------------
+ACTIVE = "Active"
+FROZEN = "Frozen"
+DISCARDED = "Discarded"
+STATES = (ACTIVE, FROZEN, DISCARDED)
+
+class TabLifecycleManager(QObject):
+    """Freezes and then discards idle background tabs
+
+    Tabs are expected to expose ``lifecycle_state``, ``last_active``,
+    ``is_exempt()``, ``freeze()``, ``discard()`` and ``materialize()``.
+    """
+    statsChanged = pyqtSignal(dict)
+
+    def __init__(self, tabs, freeze_after=300, discard_after=1800,
+                 max_live_views=10, interval=10000, parent=None):
+        super().__init__(parent)
+        self.tabs = tabs
+        self.freeze_after = freeze_after
+        self.discard_after = discard_after
+        self.max_live_views = max_live_views
+        self.enabled = True
+
+        # Transition counters since startup
+        self.transitions = Counter()
+        # The tab in front; it is in use, so its idle time starts when it leaves
+        self.front = None
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.sweep)
+        self.timer.start()
+
+    def all_tabs(self):
+        """Iterate over every tab in the tab widget"""
+        for i in range(self.tabs.count()):
+            tab = self.tabs.widget(i)
+            if tab is not None:
+                yield tab
+
+    def tab_activated(self, tab):
+        """Bring a tab back to Active and mark it most recently used"""
+        now = time.monotonic()
+        if self.front is not None and self.front is not tab:
+            self.front.last_active = now
+        self.front = tab
+        self.wake(tab)
+
+    def wake(self, tab):
+        """Bring a tab back to Active without bringing it to the front"""
+        tab.last_active = time.monotonic()
+        if tab.lifecycle_state != ACTIVE:
+            self.transitions[f"{tab.lifecycle_state}->{ACTIVE}"] += 1
+            tab.materialize()
+            self.enforce_live_cap()
+            self.statsChanged.emit(self.counts())
+
+    def counts(self):
+        """Return the number of tabs in each lifecycle state"""
+        counts = dict.fromkeys(STATES, 0)
+        for tab in self.all_tabs():
+            counts[tab.lifecycle_state] += 1
+        return counts
+
+    def sweep(self):
+        """Move idle background tabs down the lifecycle"""
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        current = self.tabs.currentWidget()
+        if current is not None:
+            current.last_active = now
+        changed = False
+
+        for tab in self.all_tabs():
+            if tab is current or tab.lifecycle_state == DISCARDED or tab.is_exempt():
+                continue
+            idle = now - tab.last_active
+            if idle >= self.discard_after:
+                changed |= self._transition(tab, DISCARDED)
+            elif idle >= self.freeze_after and tab.lifecycle_state == ACTIVE:
+                changed |= self._transition(tab, FROZEN)
+
+        changed |= self.enforce_live_cap()
+        if changed:
+            self.statsChanged.emit(self.counts())
+
+    def enforce_live_cap(self):
+        """Discard least recently used tabs beyond the live view cap"""
+        if self.max_live_views <= 0:
+            return False
+        current = self.tabs.currentWidget()
+        live = [t for t in self.all_tabs() if t.lifecycle_state != DISCARDED]
+        excess = len(live) - self.max_live_views
+        if excess <= 0:
+            return False
+
+        changed = False
+        candidates = sorted(
+            (t for t in live if t is not current and not t.is_exempt()),
+            key=lambda t: t.last_active
+        )
+        for tab in candidates[:excess]:
+            changed |= self._transition(tab, DISCARDED)
+        return changed
+
+    def _transition(self, tab, state):
+        """Apply a lifecycle transition and count it"""
+        previous = tab.lifecycle_state
+        if state == FROZEN:
+            ok = tab.freeze()
+        else:
+            ok = tab.discard()
+        if ok:
+            self.transitions[f"{previous}->{state}"] += 1
+        return bool(ok)
@@ -0,0 +1,207 @@
+import time
+import threading
+from bisect import bisect_left
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from PyQt5.QtCore import QObject, QTimer
+from session import atomic_write
+
+# Upper bounds in ms; a final +Inf bucket is implied
+BUCKETS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# (metric, help text); every metric is a per-domain histogram in seconds
+METRICS = (
+    ("load", "loadStarted to loadFinished, as seen by the tab"),
+    ("ttfb", "Navigation Timing: request start to first response byte"),
+    ("dom_content_loaded", "Navigation Timing: DOMContentLoaded event end"),
+    ("load_event", "Navigation Timing: load event end"),
+    ("first_paint", "Paint Timing: first paint"),
+    ("first_contentful_paint", "Paint Timing: first contentful paint")
+)
+PREFIX = "fibrowser_page_"
+OTHER_DOMAIN = "other"
+
+# Read once per load, after loadFinished; values are ms from navigation start
+TIMING_JS = """(function () {
+    var nav = performance.getEntriesByType("navigation")[0];
+    var r = {};
+    if (nav) {
+        r.ttfb = nav.responseStart - nav.startTime;
+        r.dom_content_loaded = nav.domContentLoadedEventEnd;
+        r.load_event = nav.loadEventEnd;
+    }
+    performance.getEntriesByType("paint").forEach(function (e) {
+        r[e.name.replace(/-/g, "_")] = e.startTime;
+    });
+    return r;
+})()"""
+
+class Histogram:
+    """Fixed-bucket histogram; counts are per bucket, made cumulative on export"""
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, ms):
+        self.counts[bisect_left(BUCKETS, ms)] += 1
+        self.sum += ms
+        self.count += 1
+
+def escape_label(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def format_seconds(ms):
+    """Short form for bucket bounds, which are whole ms; never for sums"""
+    return f"{ms / 1000:g}"
+
+class LoadMetrics(QObject):
+    """Per-domain page-load histograms with a Prometheus text export
+
+    Recording happens on the GUI thread and is a bucket increment under
+    a lock; the one page round trip per load (``TIMING_JS``) is
+    asynchronous. The export is rendered by the HTTP server's thread or
+    for the periodic dump, which is written on a worker thread.
+    Domains past ``max_domains`` are counted as "other" so the series
+    count stays bounded.
+    """
+    def __init__(self, max_domains=200, dump_path=None, dump_interval=60000, parent=None):
+        super().__init__(parent)
+        self.max_domains = max_domains
+        self.dump_path = dump_path
+        self.histograms = {}  # (metric, domain) -> Histogram
+        self.loads = {}  # (domain, result) -> count
+        self.domains = set()
+        self.lock = threading.Lock()
+        self.server = None
+
+        self.dump_timer = QTimer(self)
+        self.dump_timer.setInterval(dump_interval)
+        self.dump_timer.timeout.connect(self.dump)
+        if dump_path and dump_interval > 0:
+            self.dump_timer.start()
+
+    # ----------------------------
+    # Recording (GUI thread)
+    # ----------------------------
+    def domain(self, url):
+        host = url.host().lower() or url.scheme()
+        if host not in self.domains:
+            if len(self.domains) >= self.max_domains:
+                return OTHER_DOMAIN
+            self.domains.add(host)
+        return host
+
+    def observe(self, domain, metric, ms):
+        key = (metric, domain)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(ms)
+
+    def record(self, page, url, started, ok):
+        """Record a finished load; started is its perf_counter() at loadStarted"""
+        domain = self.domain(url)
+        result = "ok" if ok else "failed"
+        with self.lock:
+            self.loads[(domain, result)] = self.loads.get((domain, result), 0) + 1
+        if started is not None:
+            self.observe(domain, "load", (time.perf_counter() - started) * 1000)
+        if ok and url.scheme() in ("http", "https"):
+            page.runJavaScript(TIMING_JS, lambda timing: self.on_timing(domain, timing))
+
+    def on_timing(self, domain, timing):
+        if not isinstance(timing, dict):
+            return
+        for metric, _ in METRICS[1:]:
+            value = timing.get(metric)
+            # Events that have not happened yet report 0
+            if isinstance(value, (int, float)) and value > 0:
+                self.observe(domain, metric, value)
+
+    # ----------------------------
+    # Export (any thread)
+    # ----------------------------
+    def exposition(self):
+        """Render every histogram in the Prometheus text exposition format"""
+        with self.lock:
+            histograms = {key: (list(h.counts), h.sum, h.count) for key, h in self.histograms.items()}
+            loads = dict(self.loads)
+        lines = [f"# HELP {PREFIX}loads_total Finished page loads",
+                 f"# TYPE {PREFIX}loads_total counter"]
+        for (domain, result), count in sorted(loads.items()):
+            lines.append(f'{PREFIX}loads_total{{domain="{escape_label(domain)}",result="{result}"}} {count}')
+        bounds = [format_seconds(b) for b in BUCKETS] + ["+Inf"]
+        for metric, help_text in METRICS:
+            name = f"{PREFIX}{metric}_seconds"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for (m, domain), (counts, total, count) in sorted(histograms.items()):
+                if m != metric:
+                    continue
+                label = escape_label(domain)
+                cumulative = 0
+                for bound, n in zip(bounds, counts):
+                    cumulative += n
+                    lines.append(f'{name}_bucket{{domain="{label}",le="{bound}"}} {cumulative}')
+                # repr() round-trips the float; :g keeps only six significant digits
+                lines.append(f'{name}_sum{{domain="{label}"}} {total / 1000!r}')
+                lines.append(f'{name}_count{{domain="{label}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def dump(self):
+        """Write the export to dump_path on a worker thread"""
+        if not self.dump_path:
+            return
+        path = self.dump_path
+
+        def write():
+            try:
+                atomic_write(path, self.exposition().encode("utf-8"))
+            except OSError:
+                pass
+        threading.Thread(target=write, name="load-metrics-dump", daemon=True).start()
+
+    # ----------------------------
+    # HTTP endpoint
+    # ----------------------------
+    def serve(self, port, host="127.0.0.1"):
+        """Serve GET /metrics on a localhost port; returns the bound address"""
+        if self.server is None:
+            metrics = self
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split("?")[0] not in ("/", "/metrics"):
+                        self.send_error(404)
+                        return
+                    body = metrics.exposition().encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, *args):
+                    pass
+
+            self.server = ThreadingHTTPServer((host, port), Handler)
+            self.server.daemon_threads = True
+            threading.Thread(target=self.server.serve_forever, name="load-metrics-http",
+                             daemon=True).start()
+        return self.server.server_address
+
+    def shutdown(self):
+        """Stop the endpoint and write a last dump"""
+        self.dump_timer.stop()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        if self.dump_path:
+            try:
+                atomic_write(self.dump_path, self.exposition().encode("utf-8"))
+            except OSError:
+                pass
@@ -1,15 +1,38 @@
 import sys
 import os
 import json
-from datetime import datetime
-from PyQt5.QtCore import QUrl, Qt, QSize, QTimer, QPoint, QPropertyAnimation, QEasingCurve
+import time
+import threading
+import startup
+STARTUP = startup.StartupProfiler()  # before the Qt imports, so they are timed too
+from PyQt5.QtCore import (QUrl, Qt, QSize, QTimer, QPoint, QPropertyAnimation, QEasingCurve,
+                          QByteArray, QDataStream, QIODevice, QStandardPaths, QObject)
 from PyQt5.QtGui import QIcon, QKeySequence, QPalette, QColor, QDesktopServices, QPixmap
-from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEngineProfile, QWebEngineDownloadItem
+from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEnginePage
 from PyQt5.QtWidgets import (QMainWindow, QApplication, QStatusBar, QToolBar, QAction, 
                              QLineEdit, QTabWidget, QWidget, QVBoxLayout, QPushButton,
-                             QMenu, QHBoxLayout, QLabel, QFrame, QDialog, QTextEdit,
-                             QFileDialog, QProgressBar, QStyle, QShortcut, QToolButton,
-                             QSizePolicy, QStackedWidget, QListWidget, QListWidgetItem)
+                             QMenu, QLabel, QFrame, QFileDialog, QProgressBar, QStyle,
+                             QShortcut, QToolButton, QSizePolicy, QStackedWidget, QPlainTextEdit)
+import lifecycle
+import session
+import telemetry
+import eventlog
+import history
+import suggestions
+import viewpool
+import contentblock
+import blocklist
+import tabstate
+import prerender
+import leaks
+import themes
+import browserprofile
+import bookmarks
+import favicons
+import loadmetrics
+import contentindex
+import settings
+STARTUP.mark("imports")
 
 # ----------------------------
 # Constants and Configuration
@@ -21,32 +44,142 @@ SEARCH_ENGINES = {
     "DuckDuckGo": "https://duckduckgo.com/?q={}",
     "YouTube": "https://www.youtube.com/results?search_query={}"
 }
-THEMES = {
-    "Light": {
-        "bg": "#ffffff",
-        "fg": "#000000",
-        "tab_bg": "#f1f1f1",
-        "tab_active": "#ffffff",
-        "url_bg": "#f1f3f4"
-    },
-    "Dark": {
-        "bg": "#202124",
-        "fg": "#e8eaed",
-        "tab_bg": "#3c4043",
-        "tab_active": "#202124",
-        "url_bg": "#525355"
-    },
-    "Blue": {
-        "bg": "#e3f2fd",
-        "fg": "#0d47a1",
-        "tab_bg": "#bbdefb",
-        "tab_active": "#e3f2fd",
-        "url_bg": "#bbdefb"
-    }
+THEMES = themes.load_dir(themes.BUILTIN_DIR)  # themes/*.json
+THEMES_DIR = "themes"  # user theme files in the app data directory
+DEFAULT_THEME = "Dark"
+
+# Seeded into the bookmark bar when the bookmark store is first created
+DEFAULT_BOOKMARKS = {
+    "Google": "https://www.google.com",
+    "YouTube": "https://www.youtube.com",
+    "GitHub": "https://github.com",
+    "StackOverflow": "https://stackoverflow.com",
+    "PyPI": "https://pypi.org"
 }
 
+# Background tab lifecycle (seconds)
+TAB_FREEZE_AFTER = 5 * 60
+TAB_DISCARD_AFTER = 30 * 60
+MAX_LIVE_TABS = 10
+
+# Debug: count live tabs/views/pages and log them as tabs close
+LEAK_TRACKING = False
+
+# Warm view pool for new tabs
+VIEW_POOL_SIZE = 2
+VIEW_POOL_PRELOAD = True  # load the home page into pooled views
+VIEW_POOL_REFILL_DELAY = 1000  # ms
+VIEW_POOL_MIN_FREE_MEMORY = 512 * 1024 * 1024
+VIEW_POOL_PRESSURE_INTERVAL = 30000  # ms between memory checks of an idle pool
+
+# Segmented downloads for large files
+SEGMENTED_DOWNLOADS = True
+SEGMENTED_MIN_SIZE = 64 * 1024 * 1024
+SEGMENTED_CONNECTIONS = 4
+
+# Session persistence
+SESSION_FILE = "session.json"
+SESSION_SAVE_DELAY = 1000  # ms
+
+# Resource telemetry
+TELEMETRY_FILE = "telemetry.jsonl"
+TELEMETRY_INTERVAL = 5000  # ms
+TELEMETRY_MAX_PIDS = 64
+
+# Event log
+LOG_FILE = "events.jsonl"
+LOG_LEVEL = eventlog.INFO
+LOG_CAPACITY = 5000  # records kept in memory
+LOG_CONSOLE_BLOCKS = 2000  # lines kept in the console
+LOG_FLUSH_INTERVAL = 200  # ms
+# Keep one record in N per category (0 drops the category)
+LOG_SAMPLING = {"navigation": 1}
+
+# Browsing history
+HISTORY_FILE = "history.sqlite"
+HISTORY_SCHEMES = ("http", "https", "file")
+
+# Bookmarks
+BOOKMARKS_FILE = "bookmarks.sqlite"
+
+# Favicons, cached per host (decoded in memory, deduplicated PNGs on disk)
+FAVICON_DIR = "favicons"
+FAVICON_MEMORY_ICONS = 512
+FAVICON_DISK_BYTES = 20 * 1024 * 1024
+FAVICON_SIZE = 32  # px, as stored on disk
+
+# Full-text index of visited pages' text (opt-in; Ctrl+Shift+F searches it)
+CONTENT_INDEX = False
+CONTENT_INDEX_FILE = "content_index.sqlite"
+CONTENT_INDEX_DELAY = 2000  # ms after a page finishes loading
+CONTENT_INDEX_MAX_CHARS = 200000  # per page; the rest is not indexed
+CONTENT_INDEX_MAX_DOCS = 20000  # oldest pages are dropped past this
+CONTENT_INDEX_BUDGET = 2000000  # characters indexed per second at most
+
+# Content blocking (EasyList-format *.txt lists in the filters directory)
+CONTENT_BLOCKING = True
+FILTER_LISTS_DIR = "filters"
+FILTER_CACHE_FILE = "filters.cache"
+FILTER_RECORD_FILE = None  # e.g. "requests.jsonl" to record requests for the benchmark
+
+# Tab bar refresh (ms); tab titles and icons are batched
+TAB_BAR_UPDATE_INTERVAL = 100
+
+# Speculative preloading (confidences are 0-1)
+PRERENDER = True
+PRERENDER_THRESHOLD = 0.5  # prerender at or above, else preconnect
+PRECONNECT_THRESHOLD = 0.2
+PRERENDER_HOVER_CONFIDENCE = 0.4  # a hover alone only preconnects
+PRERENDER_OMNIBOX_SCORE_SCALE = 200.0  # suggestion score at which the top one is half trusted
+PRERENDER_MIN_TRANSITIONS = 3  # times a next URL was seen before it is predicted
+PRERENDER_MAX_PER_MINUTE = 12
+PRERENDER_MAX_RSS = 300 * 1024 * 1024
+PRERENDER_MIN_FREE_MEMORY = 1024 * 1024 * 1024
+
+# Automation server (started with --automation [name])
+AUTOMATION_SOCKET = "fibrowser-automation"
+AUTOMATION_TIMEOUT = 30.0  # seconds per command
+
+# Page-load metrics (Prometheus text format, served with --metrics-port [port])
+LOAD_METRICS = True
+LOAD_METRICS_PORT = 9464  # localhost only
+LOAD_METRICS_FILE = "load_metrics.prom"  # rewritten every dump interval; None to disable
+LOAD_METRICS_DUMP_INTERVAL = 60000  # ms
+LOAD_METRICS_MAX_DOMAINS = 200  # further domains are counted as "other"
+
+# Persistent browsing profile and HTTP disk cache
+PROFILE_NAME = "Fibrowser"
+PROFILE_CACHE_DIR = None  # None: Qt's cache location for the profile; relative to app data otherwise
+PROFILE_COOKIES = "allow"  # "never", "allow" (keep persistent cookies) or "force" (keep all)
+PROFILE_PREWARM_URLS = []  # loaded into the cache when the browser is idle
+PROFILE_PREWARM_DELAY = 15000  # ms
+PROFILE_PREWARM_MIN_FREE_MEMORY = 1024 * 1024 * 1024
+
+# Performance settings: process model, GPU rasterization, background
+# throttling, disk cache size and animations (Settings button, or
+# python main.py --settings FILE for a fixed profile, e.g. in benchmarks)
+SETTINGS_FILE = "settings.json"
+SETTINGS = settings.Settings()  # defaults until __main__ loads the file before QApplication
+
+# Startup phase timings (python main.py --profile-startup)
+PROFILE_STARTUP = False
+STARTUP_PROFILE_FILE = "startup.jsonl"
+
+# Omnibox suggestions
+SUGGEST_MAX_ENTRIES = 500000
+SUGGEST_DELAY = 30  # ms
+SUGGEST_LIMIT = 8
+
+def app_data_path(filename):
+    """Return a path inside the per-user application data directory"""
+    base = QStandardPaths.writableLocation(QStandardPaths.AppDataLocation)
+    os.makedirs(base, exist_ok=True)
+    return os.path.join(base, filename)
+
 class AnimatedButton(QPushButton):
-    """Button with hover animation"""
+    """Button with hover animation, unless animations are turned off in the settings"""
+    animated = True
+    
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.setCursor(Qt.PointingHandCursor)
@@ -56,182 +189,778 @@ class AnimatedButton(QPushButton):
         self.setIconSize(QSize(24, 24))
         
     def enterEvent(self, event):
-        self._animation.setStartValue(self.iconSize())
-        self._animation.setEndValue(QSize(28, 28))
-        self._animation.start()
+        if self.animated:
+            self._animation.setStartValue(self.iconSize())
+            self._animation.setEndValue(QSize(28, 28))
+            self._animation.start()
         super().enterEvent(event)
         
     def leaveEvent(self, event):
-        self._animation.setStartValue(self.iconSize())
-        self._animation.setEndValue(QSize(24, 24))
-        self._animation.start()
+        if self.animated:
+            self._animation.setStartValue(self.iconSize())
+            self._animation.setEndValue(QSize(24, 24))
+            self._animation.start()
         super().leaveEvent(event)
 
-class DownloadItemWidget(QWidget):
-    """Custom widget for download items"""
-    def __init__(self, download_item, parent=None):
-        super().__init__(parent)
-        self.download = download_item
-        
-        layout = QHBoxLayout()
-        self.setLayout(layout)
-        
-        self.icon = QLabel()
-        icon_pixmap = QStyle.standardIcon(
-            QApplication.style(), 
-            QStyle.SP_FileIcon
-        ).pixmap(24, 24)
-        self.icon.setPixmap(icon_pixmap)
-        layout.addWidget(self.icon)
-        
-        self.filename = QLabel(os.path.basename(download_item.path()))
-        layout.addWidget(self.filename, 1)
-        
-        self.progress = QProgressBar()
-        self.progress.setRange(0, 100)
-        self.progress.setValue(0)
-        layout.addWidget(self.progress, 2)
-        
-        self.speed_label = QLabel("0 KB/s")
-        layout.addWidget(self.speed_label)
-        
-        self.download.downloadProgress.connect(self.update_progress)
-        self.download.stateChanged.connect(self.update_state)
-        
-    def update_progress(self, bytes_received, bytes_total):
-        if bytes_total > 0:
-            percent = int((bytes_received / bytes_total) * 100)
-            self.progress.setValue(percent)
-            
-            # Calculate download speed
-            elapsed = self.download.startTime().secsTo(datetime.now().time())
-            if elapsed > 0:
-                speed = bytes_received / (elapsed * 1024)
-                self.speed_label.setText(f"{speed:.1f} KB/s")
-                
-    def update_state(self, state):
-        if state == QWebEngineDownloadItem.DownloadCompleted:
-            self.progress.setValue(100)
-            self.speed_label.setText("Completed")
-
-class DownloadManager(QDialog):
-    """Download manager window"""
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.setWindowTitle("Downloads")
-        self.setMinimumSize(600, 400)
-        
-        layout = QVBoxLayout()
-        self.setLayout(layout)
-        
-        # Header
-        header = QLabel("<h2>Downloads</h2>")
-        layout.addWidget(header)
-        
-        # Download list
-        self.download_list = QListWidget()
-        self.download_list.setAlternatingRowColors(True)
-        layout.addWidget(self.download_list)
-        
-        # Buttons
-        btn_layout = QHBoxLayout()
-        layout.addLayout(btn_layout)
-        
-        self.clear_btn = QPushButton("Clear Completed")
-        self.clear_btn.clicked.connect(self.clear_completed)
-        btn_layout.addWidget(self.clear_btn)
-        
-        self.close_btn = QPushButton("Close")
-        self.close_btn.clicked.connect(self.hide)
-        btn_layout.addWidget(self.close_btn)
-        
-        self.downloads = []
-        
-    def add_download(self, download_item):
-        """Add a new download to the manager"""
-        item = QListWidgetItem(self.download_list)
-        widget = DownloadItemWidget(download_item, self)
-        item.setSizeHint(widget.sizeHint())
-        self.download_list.addItem(item)
-        self.download_list.setItemWidget(item, widget)
-        self.downloads.append(widget)
-        
-    def clear_completed(self):
-        """Remove completed downloads from the list"""
-        for i in range(self.download_list.count() - 1, -1, -1):
-            item = self.download_list.item(i)
-            widget = self.download_list.itemWidget(item)
-            if widget.progress.value() == 100:
-                self.download_list.takeItem(i)
-
 class Tab(QWidget):
     """Browser tab with enhanced features"""
-    def __init__(self, window, url=None, parent=None):
+    def __init__(self, window, url=None, parent=None, title=None, history_blob=None, lazy=False,
+                 view=None, preloaded=False):
         super(Tab, self).__init__(parent)
         self.window = window
-        layout = QVBoxLayout()
-        layout.setContentsMargins(0, 0, 0, 0)
+        self.view_layout = QVBoxLayout()
+        self.view_layout.setContentsMargins(0, 0, 0, 0)
+        self.setLayout(self.view_layout)
         
-        # WebEngine View
-        self.browser = QWebEngineView()
-        profile = QWebEngineProfile.defaultProfile()
-        profile.downloadRequested.connect(self.on_download_requested)
-        self.browser.setUrl(QUrl(url or DEFAULT_HOME_PAGE))
-        
-        # Connect signals
-        self.browser.urlChanged.connect(self.update_url)
-        self.browser.titleChanged.connect(self.update_title)
-        self.browser.iconChanged.connect(self.update_icon)
-        self.browser.loadProgress.connect(self.update_progress)
+        # Tab state
+        self.title = title or "New Tab"
+        self.url = QUrl(url or DEFAULT_HOME_PAGE)
+        # The site's cached favicon until the page reports its own
+        self.icon = window.favicons.icon_for(self.url)
+        self.icon_dirty = False
+        self.progress = 100
+        self.loading = False
+        self.load_ok = None  # result of the last finished load
+        self.history_blob = QByteArray(history_blob) if history_blob else None
+        self.lifecycle_state = lifecycle.DISCARDED
+        self.last_active = time.monotonic()
+        self.pending_downloads = 0
+        self.automated = False  # driven by the automation server
+        self.blocked_before = 0  # blocked by views this tab has discarded
+        self.back_history = None  # history replaced by a prerendered view
+        self.load_started = None  # perf_counter() at loadStarted, for load metrics
+        if window.leak_tracker is not None:
+            window.leak_tracker.track(self, "tab")
+        
+        # WebEngine View (lazy tabs build it when first selected)
+        self.browser = None
+        if not lazy:
+            self.materialize(view, preloaded)
+        
+    def create_browser(self, view=None):
+        """Create the web view (or adopt a pooled one) and connect its signals"""
+        self.browser = view or self.window.services.create_view()
+        for signal, slot in self.view_connections():
+            signal.connect(slot)
+        self.view_layout.addWidget(self.browser)
+        
+    def view_connections(self):
+        """(signal, slot) pairs linking the web view to this tab"""
+        return (
+            (self.browser.urlChanged, self.update_url),
+            (self.browser.titleChanged, self.update_title),
+            (self.browser.iconChanged, self.update_icon),
+            (self.browser.loadProgress, self.update_progress),
+            (self.browser.loadStarted, self.on_load_started),
+            (self.browser.loadFinished, self.on_load_finished)
+        )
+        
+    def release_browser(self):
+        """Disconnect the web view and delete it, page before view"""
+        for signal, slot in self.view_connections():
+            signal.disconnect(slot)
+        self.view_layout.removeWidget(self.browser)
+        viewpool.dispose_view(self.browser)
+        self.browser = None
+        
+    def dispose(self):
+        """Tear the tab down for good once it has left the tab widget"""
+        if self.browser is not None:
+            self.release_browser()
+        self.history_blob = None
+        self.back_history = None
+        self.deleteLater()
+        
+    def is_exempt(self):
+        """Tabs playing audio, downloading or driven by automation are never frozen or discarded"""
+        if self.pending_downloads > 0 or self.automated:
+            return True
+        return self.browser is not None and self.browser.page().recentlyAudible()
+        
+    def freeze(self):
+        """Freeze the page so its timers and scripts stop running"""
+        if self.browser is None:
+            return False
+        page = self.browser.page()
+        if page.lifecycleState() != QWebEnginePage.LifecycleState.Active or page.isVisible():
+            return False
+        page.setLifecycleState(QWebEnginePage.LifecycleState.Frozen)
+        self.lifecycle_state = lifecycle.FROZEN
+        return True
+        
+    def discard(self):
+        """Destroy the web view, keeping URL, title, icon and history"""
+        if self.browser is None:
+            return False
+        
+        self.url = self.browser.url()
+        self.history_blob = self.serialize_history()
+        self.blocked_before = self.blocked_requests()
+        
+        self.release_browser()
+        self.lifecycle_state = lifecycle.DISCARDED
+        return True
+        
+    def adopt_view(self, view):
+        """Swap in a prerendered view; going back restores the old history"""
+        if self.browser is not None:
+            self.back_history = self.serialize_history()
+            self.blocked_before = self.blocked_requests()
+            self.release_browser()
+        self.materialize(view, preloaded=True)
+        
+    def go_back(self):
+        """Go back, falling back to the history a prerender swap replaced"""
+        if self.browser.history().canGoBack() or self.back_history is None:
+            self.browser.back()
+            return
+        stream = QDataStream(self.back_history)
+        stream >> self.browser.history()
+        self.back_history = None
+        
+    def blocked_requests(self):
+        """Requests blocked by the content blocker in this tab"""
+        if self.browser is None:
+            return self.blocked_before
+        return self.blocked_before + self.browser.blocker.blocked
+        
+    def renderer_pid(self):
+        """Return the renderer process ID, or 0 if the tab has no view"""
+        if self.browser is None:
+            return 0
+        return self.browser.page().renderProcessPid()
+        
+    def serialize_history(self):
+        """Return the navigation history as a QByteArray"""
+        if self.browser is None:
+            return self.history_blob
+        blob = QByteArray()
+        stream = QDataStream(blob, QIODevice.WriteOnly)
+        stream << self.browser.history()
+        return blob
+        
+    def session_state(self):
+        """Return the state saved in the session file"""
+        return {
+            "url": self.url.toString(),
+            "title": self.title,
+            "history": session.encode_blob(self.serialize_history())
+        }
         
-        layout.addWidget(self.browser)
-        self.setLayout(layout)
+    def materialize(self, view=None, preloaded=False):
+        """Bring a frozen or discarded tab back to Active
         
-        # Tab state
-        self.title = "New Tab"
-        self.icon = QIcon()
+        A pooled view that is already loading the tab's URL is adopted
+        as-is; its state so far is copied since its signals fired earlier.
+        """
+        if self.browser is None:
+            self.create_browser(view)
+            if self.history_blob is not None and not self.history_blob.isEmpty():
+                stream = QDataStream(self.history_blob)
+                stream >> self.browser.history()
+            elif preloaded:
+                self.update_url(self.browser.url())
+                if self.browser.title():
+                    self.update_title(self.browser.title())
+                self.update_icon(self.browser.icon())
+                self.loading = self.browser.loading
+                self.load_ok = self.browser.load_ok
+                self.progress = 0 if self.loading else 100
+            elif view is None:
+                self.browser.setUrl(self.url)
+            self.history_blob = None
+        else:
+            self.browser.page().setLifecycleState(QWebEnginePage.LifecycleState.Active)
+        self.lifecycle_state = lifecycle.ACTIVE
+        
+    def is_current(self):
+        return self.window.tabs.currentWidget() is self
         
     def update_url(self, url):
-        """Update address bar when URL changes"""
-        if hasattr(self.window, 'URLBar') and self.window.URLBar:
-            self.window.URLBar.setText(url.toString())
-            self.window.URLBar.setCursorPosition(0)
-            self.window.log_action(f"Navigated to: {url.toString()}")
+        """Record the new URL; only the current tab drives the address bar"""
+        previous = self.url.toString()
+        self.url = url
+        self.window.session.schedule()
+        if url.scheme() in HISTORY_SCHEMES:
+            self.window.history.record_visit(url.toString())
+            self.window.suggestions.record_visit(url.toString())
+        if previous != url.toString():
+            self.window.suggestions.tab_closed(previous)
+            self.window.suggestions.tab_opened(url.toString(), self.title)
+            if self.is_current():
+                self.window.predictor.record(previous, url.toString())
+        self.window.tab_bar_updater.mark(self)
+        if self.is_current():
+            self.window.show_url(url)
+        self.window.log_action(f"Navigated to: {url.toString()}", category="navigation")
         
     def update_title(self, title):
-        """Update tab title when page title changes"""
-        self.title = title[:30] + "..." if len(title) > 30 else title
-        if self.window.tabs:
-            index = self.window.tabs.indexOf(self)
-            if index != -1:
-                self.window.tabs.setTabText(index, self.title)
+        """Record the page title; the tab bar picks it up on its next flush"""
+        self.title = title
+        self.window.session.schedule()
+        if self.url.scheme() in HISTORY_SCHEMES and title:
+            self.window.history.update_title(self.url.toString(), title)
+            self.window.suggestions.update_title(self.url.toString(), title)
+        self.window.tab_bar_updater.mark(self)
             
     def update_icon(self, icon):
-        """Update tab icon when favicon changes"""
+        """Record the favicon; the tab bar picks it up on its next flush"""
+        if icon.isNull():
+            # Pages drop their icon while navigating; show the site's cached one
+            icon = self.window.favicons.icon_for(self.url)
+        else:
+            self.window.favicons.store(self.url, icon)
         self.icon = icon
-        if self.window.tabs:
-            index = self.window.tabs.indexOf(self)
-            if index != -1:
-                self.window.tabs.setTabIcon(index, icon)
+        self.icon_dirty = True
+        self.window.tab_bar_updater.mark(self)
             
     def update_progress(self, progress):
-        """Update progress bar during page load"""
-        if hasattr(self.window, 'progress_bar') and self.window.progress_bar:
-            self.window.progress_bar.setVisible(progress < 100)
-            self.window.progress_bar.setValue(progress)
+        """Record load progress; only the current tab drives the progress bar"""
+        self.progress = progress
+        if self.is_current():
+            self.window.show_progress(self)
+            
+    def on_load_started(self):
+        self.loading = True
+        self.progress = 0
+        self.load_started = time.perf_counter()
+        if self.is_current():
+            self.window.show_progress(self)
+            
+    def on_load_finished(self, ok):
+        self.loading = False
+        self.load_ok = ok
+        self.progress = 100
+        load_metrics = self.window.load_metrics
+        if load_metrics is not None:
+            load_metrics.record(self.browser.page(), self.browser.url(), self.load_started, ok)
+        self.load_started = None
+        if ok:
+            self.window.browser_profile.observe(self.browser.page())
+            if self.window.page_text_collector is not None:
+                self.window.page_text_collector.schedule(self.browser.page(), self.browser.url(), self.title)
+        if self.is_current():
+            self.window.show_progress(self)
+            self.window.predict_next(self)
+        
+    def on_download_finished(self):
+        """Release the lifecycle exemption held by a download"""
+        self.pending_downloads = max(0, self.pending_downloads - 1)
+
+class Services(QObject):
+    """Process-wide state shared by every window
+    
+    History, suggestions, the session file, the event log, content
+    blocking, downloads and automation exist once per process, as do the
+    browser profile and the view pool and prerenderer built on it.
+    Windows reach them through ``window.services``. The profile is
+    created on first use, so a staged window is on screen before
+    WebEngine starts up.
+    """
+    _instance = None
+    
+    @classmethod
+    def instance(cls):
+        """Return the services, creating them with the first window"""
+        if cls._instance is None:
+            cls._instance = cls(QApplication.instance())
+        return cls._instance
+    
+    def __init__(self, parent=None):
+        super(Services, self).__init__(parent)
+        self.windows = []  # open windows, oldest first
+        self.started = False
+        self.session_restored = False
+        
+        # Browsing history, written by a background thread
+        self.history = history.HistoryStore(app_data_path(HISTORY_FILE))
+        self.suggestions = suggestions.SuggestionIndex()
+        
+        # Bookmarks; imports stream in on a worker thread
+        self.bookmarks = bookmarks.BookmarkStore(
+            app_data_path(BOOKMARKS_FILE), DEFAULT_BOOKMARKS.items(), self
+        )
+        self.bookmarks.imported.connect(self.on_bookmarks_imported)
+        
+        # Favicons per host for tabs, bookmarks, history and suggestions
+        self.favicons = favicons.FaviconCache(
+            app_data_path(FAVICON_DIR),
+            max_icons=FAVICON_MEMORY_ICONS,
+            max_disk_bytes=FAVICON_DISK_BYTES,
+            size=FAVICON_SIZE,
+            parent=self
+        )
+        
+        # Opt-in full-text index of page text, searched from every window
+        self.content_index = None
+        self.page_text_collector = None
+        if CONTENT_INDEX:
+            self.content_index = contentindex.ContentIndex(
+                app_data_path(CONTENT_INDEX_FILE),
+                max_chars=CONTENT_INDEX_MAX_CHARS,
+                max_docs=CONTENT_INDEX_MAX_DOCS,
+                budget=CONTENT_INDEX_BUDGET
+            )
+            self.page_text_collector = contentindex.PageTextCollector(
+                self.content_index, delay=CONTENT_INDEX_DELAY, is_busy=self.any_tab_loading, parent=self
+            )
+        threading.Thread(target=self.load_suggestions, name="suggestions-load", daemon=True).start()
+        
+        # Structured event log, flushed to each window's console in batches
+        self.event_log = eventlog.EventLog(
+            capacity=LOG_CAPACITY,
+            flush_interval=LOG_FLUSH_INTERVAL,
+            level=LOG_LEVEL,
+            sampling=LOG_SAMPLING,
+            sink=eventlog.FileSink(app_data_path(LOG_FILE)),
+            parent=self
+        )
+        self.leak_tracker = leaks.LeakTracker(self) if LEAK_TRACKING else None
+        
+        # Session persistence, one entry per window
+        self.session = session.SessionStore(
+            app_data_path(SESSION_FILE), self.session_state, SESSION_SAVE_DELAY, self
+        )
+        self.session.saveFailed.connect(
+            lambda error: self.log(f"Could not save session: {error}", eventlog.ERROR, category="session")
+        )
+        
+        # Content blocking, shared by every view's request interceptor
+        self.content_blocker = contentblock.ContentBlocker(
+            blocklist.list_files(app_data_path(FILTER_LISTS_DIR)),
+            cache_path=app_data_path(FILTER_CACHE_FILE),
+            record_path=app_data_path(FILTER_RECORD_FILE) if FILTER_RECORD_FILE else None,
+            parent=self
+        )
+        self.content_blocker.enabled = CONTENT_BLOCKING
+        self.content_blocker.loaded.connect(self.on_filters_loaded)
+        if CONTENT_BLOCKING:
+            self.content_blocker.load()
+        
+        # Speculative preconnect/prerender of the likely next navigation,
+        # fed by bookmark hover, the omnibox and this session's transitions
+        self.predictor = prerender.NavigationPredictor()
+        
+        # Page-load histograms per domain
+        self.load_metrics = None
+        if LOAD_METRICS:
+            self.load_metrics = loadmetrics.LoadMetrics(
+                max_domains=LOAD_METRICS_MAX_DOMAINS,
+                dump_path=app_data_path(LOAD_METRICS_FILE) if LOAD_METRICS_FILE else None,
+                dump_interval=LOAD_METRICS_DUMP_INTERVAL,
+                parent=self
+            )
+        
+        # Per-tab resource telemetry
+        self.resource_sampler = telemetry.ResourceSampler(
+            self.telemetry_targets,
+            interval=TELEMETRY_INTERVAL,
+            max_pids=TELEMETRY_MAX_PIDS,
+            log_path=app_data_path(TELEMETRY_FILE),
+            parent=self
+        )
+        
+        # Built on first use
+        self._browser_profile = None
+        self._view_pool = None
+        self._prerenderer = None
+        self.download_manager = None
+        self.download_passthrough = set()
+        # Local JSON-RPC automation, off unless start_automation() is called
+        self.automation = None
+        
+        # Record the configuration this run uses so runs can be compared
+        self.apply_settings()
+        profile = SETTINGS.applied or SETTINGS.profile()
+        self.log(f"Settings profile {profile['id']}: {json.dumps(profile, sort_keys=True)}",
+                 category="settings")
+        for problem in SETTINGS.problems:
+            self.log(f"Settings: {problem}; using the default", eventlog.WARNING, category="settings")
+        
+    @property
+    def browser_profile(self):
+        """Named persistent profile shared by every view"""
+        if self._browser_profile is None:
+            self._browser_profile = browserprofile.shared_profile(
+                PROFILE_NAME,
+                cache_path=app_data_path(PROFILE_CACHE_DIR) if PROFILE_CACHE_DIR else None,
+                cache_size=SETTINGS.disk_cache_mb * 1024 * 1024,
+                cookies=PROFILE_COOKIES,
+                prewarm_urls=PROFILE_PREWARM_URLS,
+                prewarm_delay=PROFILE_PREWARM_DELAY,
+                min_free_memory=PROFILE_PREWARM_MIN_FREE_MEMORY,
+                is_busy=self.any_tab_loading
+            )
+            self._browser_profile.profile.downloadRequested.connect(self.on_download_requested)
+        return self._browser_profile
+        
+    @property
+    def view_pool(self):
+        """Pre-warmed views for Ctrl+T, filled once the first tab is up"""
+        if self._view_pool is None:
+            self._view_pool = viewpool.ViewPool(
+                size=VIEW_POOL_SIZE,
+                preload_url=DEFAULT_HOME_PAGE if VIEW_POOL_PRELOAD else None,
+                refill_delay=VIEW_POOL_REFILL_DELAY,
+                min_free_memory=VIEW_POOL_MIN_FREE_MEMORY,
+                pressure_interval=VIEW_POOL_PRESSURE_INTERVAL,
+                factory=self.create_view,
+                parent=self
+            )
+        return self._view_pool
+        
+    @property
+    def prerenderer(self):
+        if self._prerenderer is None:
+            self._prerenderer = prerender.Prerenderer(
+                self.create_view,
+                prerender_threshold=PRERENDER_THRESHOLD,
+                preconnect_threshold=PRECONNECT_THRESHOLD,
+                max_per_minute=PRERENDER_MAX_PER_MINUTE,
+                max_rss=PRERENDER_MAX_RSS,
+                min_free_memory=PRERENDER_MIN_FREE_MEMORY,
+                profile=self.browser_profile.profile,
+                parent=self
+            )
+            self._prerenderer.enabled = PRERENDER
+            self._prerenderer.statsChanged.connect(self.on_prerender_stats)
+        return self._prerenderer
+        
+    def start(self):
+        """Fill the view pool and pre-warm the cache once the first tab is up"""
+        if self.started:
+            return
+        self.started = True
+        self.view_pool.start()
+        self.browser_profile.start_prewarm()
+        self.log("Browser started")
+        
+    def load_suggestions(self):
+        """Build the suggestion index from history and bookmarks (runs on a worker thread)"""
+        self.suggestions.load(self.history.top_urls(SUGGEST_MAX_ENTRIES), bookmarks=self.bookmarks.urls())
+        
+    def on_bookmarks_imported(self, stats):
+        """Log an import and add the new bookmarks to the suggestions"""
+        name = os.path.basename(stats["path"])
+        if "error" in stats:
+            self.log(f"Bookmark import failed: {name}: {stats['error']}", eventlog.WARNING,
+                     category="bookmarks")
+            return
+        self.log(f"Imported {stats['bookmarks']} bookmarks in {stats['folders']} folders "
+                 f"from {name} in {stats['ms']} ms", category="bookmarks")
+        threading.Thread(target=self.suggestions.load, args=((),),
+                         kwargs={"bookmarks": self.bookmarks.urls()},
+                         name="suggestions-bookmarks", daemon=True).start()
+        
+    def create_view(self):
+        """Create a web view with the content blocker attached to its page"""
+        view = QWebEngineView()
+        view.setPage(QWebEnginePage(self.browser_profile.profile, view))
+        view.blocker = contentblock.PageBlocker(self.content_blocker, view)
+        view.page().setUrlRequestInterceptor(view.blocker)
+        viewpool.track_load(view)
+        if self.leak_tracker is not None:
+            self.leak_tracker.track(view, "view")
+            self.leak_tracker.track(view.page(), "page")
+        return view
+        
+    def log(self, message, level=eventlog.INFO, category="general"):
+        self.event_log.log(message, level, category)
+        
+    def apply_settings(self):
+        """Apply the settings that take effect without a restart"""
+        AnimatedButton.animated = SETTINGS.animations
+        for effect in (Qt.UI_AnimateMenu, Qt.UI_AnimateCombo, Qt.UI_AnimateTooltip, Qt.UI_FadeMenu,
+                       Qt.UI_FadeTooltip):
+            QApplication.setEffectEnabled(effect, SETTINGS.animations)
+        for window in self.windows:
+            for button in window.findChildren(AnimatedButton):
+                button.setIconSize(QSize(24, 24))
+        if self._browser_profile is not None:
+            self._browser_profile.profile.setHttpCacheMaximumSize(SETTINGS.disk_cache_mb * 1024 * 1024)
+        
+    def save_settings(self, values):
+        """Save edited settings, apply what can be applied now and log the new profile"""
+        try:
+            values.save(values.path or app_data_path(SETTINGS_FILE))
+        except OSError as e:
+            self.log(f"Could not save settings: {e}", eventlog.ERROR, category="settings")
+        self.apply_settings()
+        profile = values.profile()
+        self.log(f"Settings profile {profile['id']} saved: {json.dumps(profile, sort_keys=True)}",
+                 category="settings")
+        pending = values.pending_restart()
+        if pending:
+            self.log(f"Restart to apply: {', '.join(pending)}", category="settings")
+        
+    # ----------------------------
+    # Windows
+    # ----------------------------
+    def active_window(self):
+        """The window that last had focus"""
+        active = QApplication.activeWindow()
+        if active in self.windows:
+            return active
+        return self.windows[-1] if self.windows else None
+        
+    def new_window(self, tab=None, pos=None, session_entry=None):
+        """Open another window, optionally around a tab taken from another one"""
+        window = Window(services=self, tab=tab, session_entry=session_entry)
+        window.setAttribute(Qt.WA_DeleteOnClose)
+        source = self.active_window()
+        if source is not None and source is not window:
+            window.resize(source.size())
+        if pos is not None:
+            window.move(pos)
+        window.show()
+        window.activateWindow()
+        return window
+        
+    def move_tab(self, source, index, target, to_index=-1):
+        """Move a tab to another window, keeping its web view and page state
+        
+        The view is reparented along with the tab, so the page is not
+        reloaded and keeps its scroll position, form input and history.
+        """
+        tab = source.release_tab(index)
+        target.insert_tab(tab, to_index)
+        target.activateWindow()
+        if tabstate.DetachableTabBar.dragging is None:
+            source.close_if_empty()
+        self.log(f"Tab moved to window {self.windows.index(target) + 1}", category="tabs")
+        
+    def detach_tab(self, source, index, pos=None):
+        """Move a tab into a new window of its own"""
+        tab = source.release_tab(index)
+        window = self.new_window(tab=tab, pos=pos)
+        self.log(f"Tab moved to window {self.windows.index(window) + 1}", category="tabs")
+        return window
+        
+    def window_closing(self, window):
+        """Drop a closing window; the last one shuts the services down"""
+        if window not in self.windows:
+            return
+        if len(self.windows) == 1:
+            self.shutdown()
+            return
+        window.dispose_tabs()
+        self.windows.remove(window)
+        self.session.schedule()
+        self.log("Window closed", category="tabs")
+        
+    def take_saved_windows(self):
+        """Return the previous session's windows; handed out once"""
+        if self.session_restored:
+            return []
+        self.session_restored = True
+        return session.window_entries(self.session.load())
+        
+    def session_state(self):
+        """Collect the current session for the session file"""
+        return {"windows": [window.session_state() for window in self.windows]}
+        
+    def any_tab_loading(self):
+        return any(window.any_tab_loading() for window in self.windows)
+        
+    def tab_for_page(self, page):
+        """Return the tab showing page in any window, or None"""
+        for window in self.windows:
+            tab = window.tab_for_page(page)
+            if tab is not None:
+                return tab
+        return None
+        
+    def open_urls(self):
+        """URLs shown in a tab of any window"""
+        return {window.tabs.widget(i).url.toString()
+                for window in self.windows for i in range(window.tabs.count())}
+        
+    def switch_to_url(self, url):
+        """Bring up the tab showing url, in whichever window; False if none does"""
+        for window in self.windows:
+            for i in range(window.tabs.count()):
+                if window.tabs.widget(i).url.toString() == url:
+                    window.tabs.setCurrentIndex(i)
+                    window.raise_()
+                    window.activateWindow()
+                    return True
+        return False
+        
+    def telemetry_targets(self):
+        """Map each tab to its renderer process for the resource sampler"""
+        targets = [("Browser", os.getpid())]
+        for w, window in enumerate(self.windows):
+            prefix = f"{w+1}." if len(self.windows) > 1 else ""
+            for i in range(window.tabs.count()):
+                tab = window.tabs.widget(i)
+                targets.append((f"{prefix}{i+1}: {tab.title}", tab.renderer_pid()))
+        return targets
+        
+    # ----------------------------
+    # Downloads
+    # ----------------------------
+    def use_segmented_download(self, download):
+        """Large plain HTTP(S) downloads go to the segmented engine"""
+        url = download.url()
+        if url.toString() in self.download_passthrough:
+            self.download_passthrough.discard(url.toString())
+            return False
+        return (SEGMENTED_DOWNLOADS and url.scheme() in ('http', 'https')
+                and download.totalBytes() >= SEGMENTED_MIN_SIZE)
         
     def on_download_requested(self, download):
-        """Handle download requests"""
+        """Handle download requests from every window"""
+        if self.use_segmented_download(download):
+            path = download.path()
+            download.cancel()
+            manager = self.get_download_manager()
+            manager.add_segmented(download.url().toString(), path, SEGMENTED_CONNECTIONS)
+            manager.show()
+            self.log(f"Segmented download started: {os.path.basename(path)}", category="download")
+            return
+        
+        tab = self.tab_for_page(download.page())
+        if tab is not None:
+            tab.pending_downloads += 1
+            download.finished.connect(tab.on_download_finished)
         download.accept()
-        if hasattr(self.window, 'download_manager') and self.window.download_manager:
-            self.window.download_manager.add_download(download)
-            self.window.download_manager.show()
-            self.window.log_action(f"Download started: {os.path.basename(download.path())}")
+        manager = self.get_download_manager()
+        manager.add_download(download)
+        manager.show()
+        self.log(f"Download started: {os.path.basename(download.path())}", category="download")
+        
+    def fallback_download(self, url, path):
+        """Restart a download through the browser's own download path"""
+        window = self.active_window()
+        tab = window.current_tab() if window is not None else None
+        if tab is None or tab.browser is None:
+            return
+        self.download_passthrough.add(url)
+        tab.browser.page().download(QUrl(url), path)
+        self.log(f"Segmented download unavailable, using browser: {os.path.basename(path)}",
+                 category="download")
+        
+    def get_download_manager(self):
+        """Return the download manager, building it on first use
+        
+        It has no parent window, so closing one window leaves the
+        downloads running.
+        """
+        if self.download_manager is None:
+            import downloads
+            self.download_manager = downloads.DownloadManager()
+            self.download_manager.fallbackRequested.connect(self.fallback_download)
+        return self.download_manager
+        
+    # ----------------------------
+    # Logging and automation
+    # ----------------------------
+    def on_filters_loaded(self, stats):
+        """Log the size and load time of the filter engine"""
+        source = "cache" if stats["cached"] else "lists"
+        self.log(f"Content blocker: {stats['filters']} filters from {source} "
+                 f"in {stats['ms']} ms", category="blocking")
+        
+    def on_prerender_stats(self, stats):
+        """Log prerender hit rate and time saved after each navigation"""
+        if stats.get("hits") or stats.get("wasted"):
+            self.log(
+                f"Prerender - hits {stats.get('hits', 0)}/{stats.get('commits', 0)} "
+                f"(precision {stats['precision']:.0%}), saved {stats.get('saved_ms', 0)} ms",
+                category="prerender"
+            )
+            
+    def serve_load_metrics(self, port=LOAD_METRICS_PORT):
+        """Serve the page-load metrics on a localhost port; returns its URL"""
+        if self.load_metrics is None:
+            return None
+        try:
+            host, port = self.load_metrics.serve(port)
+        except OSError as e:
+            self.log(f"Load metrics endpoint unavailable on port {port}: {e}", eventlog.WARNING,
+                     category="metrics")
+            return None
+        url = f"http://{host}:{port}/metrics"
+        self.log(f"Load metrics at {url}", category="metrics")
+        return url
+        
+    def start_automation(self, name=AUTOMATION_SOCKET):
+        """Serve JSON-RPC automation on a local socket; returns its path"""
+        if self.automation is None:
+            import automation
+            self.automation = automation.AutomationServer(self, name, AUTOMATION_TIMEOUT, self)
+            self.log(f"Automation server listening on {self.automation.address()}",
+                     category="automation")
+        return self.automation.address()
+        
+    def shutdown(self):
+        """Save the session and stop background work as the last window closes"""
+        self.session.save()
+        if self._browser_profile is not None:
+            self._browser_profile.profile.downloadRequested.disconnect(self.on_download_requested)
+        if self._view_pool is not None:
+            self._view_pool.shutdown()
+        if self._prerenderer is not None:
+            self._prerenderer.shutdown()
+        if self.automation is not None:
+            self.automation.close()
+        if self.download_manager is not None:
+            self.download_manager.close()
+        self.resource_sampler.shutdown()
+        if self.load_metrics is not None:
+            self.load_metrics.shutdown()
+        self.log(f"Favicon cache: {self.favicons.hit_rate():.0%} hit rate, {self.favicons.stats}",
+                 category="favicons")
+        self.favicons.shutdown()
+        if self.content_index is not None:
+            self.log(f"Content index: {self.content_index.stats}", category="content_index")
+            self.content_index.close()
+        self.event_log.close()
+        self.history.close()
+        self.bookmarks.close()
+        self.windows.clear()
+        if Services._instance is self:
+            Services._instance = None
+
+def shared(name):
+    """Window attribute that reads the process-wide service called name"""
+    return property(lambda self: getattr(self.services, name))
 
 class Window(QMainWindow):
     """Main browser window with enhanced features"""
-    def __init__(self, *args, **kwargs):
+    history = shared("history")
+    suggestions = shared("suggestions")
+    event_log = shared("event_log")
+    session = shared("session")
+    leak_tracker = shared("leak_tracker")
+    bookmarks = shared("bookmarks")
+    favicons = shared("favicons")
+    content_index = shared("content_index")
+    page_text_collector = shared("page_text_collector")
+    content_blocker = shared("content_blocker")
+    browser_profile = shared("browser_profile")
+    view_pool = shared("view_pool")
+    predictor = shared("predictor")
+    prerenderer = shared("prerenderer")
+    resource_sampler = shared("resource_sampler")
+    automation = shared("automation")
+    load_metrics = shared("load_metrics")
+    
+    def __init__(self, *args, services=None, staged=False, tab=None, session_entry=None, **kwargs):
+        """Build the window frame, then the first tab
+        
+        A staged window returns with just the frame (toolbar, URL bar,
+        empty tab widget) and builds the first web view from the event
+        loop, so the frame can be shown before WebEngine starts up. The
+        download manager, developer tools and bookmark bar are built the
+        first time they are needed.
+        
+        The first window restores the saved session. Later windows start
+        with ``tab``, taken from another window, with the tabs of a saved
+        window in ``session_entry``, or with a new tab.
+        """
         super(Window, self).__init__(*args, **kwargs)
+        self.services = services or Services.instance()
         
         # Window settings
         self.setWindowTitle("Fibrowser Pro")
@@ -328,28 +1057,35 @@ class Window(QMainWindow):
         self.bookmarks_toolbar = QToolBar('Bookmarks')
         self.bookmarks_toolbar.setVisible(False)
         
-        # Add bookmarks
-        bookmarks = {
-            "Google": "https://www.google.com",
-            "YouTube": "https://www.youtube.com",
-            "GitHub": "https://github.com",
-            "StackOverflow": "https://stackoverflow.com",
-            "PyPI": "https://pypi.org"
-        }
-        
-        for name, url in bookmarks.items():
-            btn = QPushButton(name)
-            btn.setCursor(Qt.PointingHandCursor)
-            btn.setFlat(True)
-            btn.clicked.connect(lambda checked, u=url: self.navigate_to(u))
-            self.bookmarks_toolbar.addWidget(btn)
-        
-        # Create tab widget AFTER URLBar initialization
-        self.tabs = QTabWidget()
+        self.bookmark_bar = None  # built when the bar is first shown
+        self.history_dialog = None
+        self.content_search_dialog = None
+        self.cache_dialog = None
+        self.settings_dialog = None
+        
+        # Omnibox suggestions from history, bookmarks and open tabs
+        self.omnibox = suggestions.Omnibox(
+            self.URLBar, self.suggestions, delay=SUGGEST_DELAY, limit=SUGGEST_LIMIT,
+            icon_for=self.favicons.icon_for, parent=self
+        )
+        self.omnibox.urlChosen.connect(self.navigate_to)
+        
+        # Create tab widget AFTER URLBar initialization; tabs can be
+        # dragged out into a new window or onto another window's tab bar
+        self.tabs = tabstate.BrowserTabWidget()
         self.tabs.setTabsClosable(True)
         self.tabs.setMovable(True)
+        self.tabs.setStyleSheet(themes.TAB_PANE_STYLESHEET)
         self.tabs.tabCloseRequested.connect(self.close_tab)
         self.tabs.currentChanged.connect(self.tab_changed)
+        tab_bar = self.tabs.tabBar()
+        tab_bar.tabMoved.connect(lambda *_: self.session.schedule())
+        tab_bar.tabReceived.connect(self.on_tab_received)
+        tab_bar.tabDetached.connect(self.on_tab_detached)
+        tab_bar.dragFinished.connect(self.close_if_empty)
+        
+        # Tab titles and icons reach the tab bar in coalesced batches
+        self.tab_bar_updater = tabstate.TabBarUpdater(self.tabs, TAB_BAR_UPDATE_INTERVAL, self)
         
         # Add new tab button
         self.new_tab_btn = QToolButton()
@@ -358,8 +1094,19 @@ class Window(QMainWindow):
         self.new_tab_btn.clicked.connect(self.add_new_tab)
         self.tabs.setCornerWidget(self.new_tab_btn, Qt.TopRightCorner)
         
-        # Add initial tab
-        self.add_new_tab()
+        # Freeze and discard idle background tabs
+        self.lifecycle = lifecycle.TabLifecycleManager(
+            self.tabs,
+            freeze_after=TAB_FREEZE_AFTER,
+            discard_after=TAB_DISCARD_AFTER,
+            max_live_views=MAX_LIVE_TABS,
+            parent=self
+        )
+        self.lifecycle.statsChanged.connect(self.on_lifecycle_stats)
+        
+        self.content_blocker.countsChanged.connect(self.update_blocked_label)
+        self.hover_hints = None  # created with the bookmark bar
+        self.omnibox.candidatesChanged.connect(self.on_omnibox_candidates)
         
         # Progress bar
         self.progress_bar = QProgressBar()
@@ -372,33 +1119,88 @@ class Window(QMainWindow):
         self.setStatusBar(self.status_bar)
         self.status_label = QLabel("Ready")
         self.status_bar.addWidget(self.status_label)
+        self.blocked_label = QLabel()
+        self.status_bar.addPermanentWidget(self.blocked_label)
         
-        # Developer console
-        self.console = QTextEdit()
-        self.console.setVisible(False)
-        self.console.setMinimumHeight(100)
+        # Developer console and resource panel, built on first F12
+        self.dev_tools = None
+        self.console = None
+        self.resource_panel = None
+        self.console_stale = True
+        self.event_log.flushed.connect(self.show_log_batch)
         
         # Add widgets to main layout
+        self.main_layout = main_layout
         main_layout.addWidget(self.nav_toolbar)
         main_layout.addWidget(self.bookmarks_toolbar)
         main_layout.addWidget(self.tabs)
         main_layout.addWidget(self.progress_bar)
-        main_layout.addWidget(self.console)
         
-        # Initialize managers
-        self.download_manager = DownloadManager(self)
-        self.log_action("Browser started")
-        
-        # Apply theme
-        self.apply_theme("Dark")
+        # Apply theme; files in the app data directory add to or override the built-ins
+        self.themes = dict(THEMES)
+        self.themes.update(themes.load_dir(app_data_path(THEMES_DIR)))
+        self.theme = None
+        self.apply_theme(DEFAULT_THEME)
         
         # Register shortcuts
         self.register_shortcuts()
+        self.services.windows.append(self)
+        STARTUP.mark("window frame")
+        
+        # The first tab; its renderer starts up while the rest of the
+        # startup work runs
+        self.started = False
+        self.initial_tab = tab
+        self.session_entry = session_entry
+        if staged:
+            QTimer.singleShot(0, self.finish_startup)
+        else:
+            self.finish_startup()
+        
+    def finish_startup(self):
+        """Second startup stage: first web view, then the shared services"""
+        if self.started:
+            return
+        self.started = True
+        
+        # A tab moved in from another window, a saved window, or a new tab
+        if self.initial_tab is not None:
+            self.insert_tab(self.initial_tab, 0)
+            self.initial_tab = None
+            return
+        if self.session_entry is None:
+            entries = self.services.take_saved_windows()
+            if entries:
+                self.session_entry = entries[0]
+                for entry in entries[1:]:
+                    self.services.new_window(session_entry=entry)
+        if self.session_entry is None or not self.restore_session(self.session_entry):
+            self.add_new_tab()
+        self.session_entry = None
+        if self.services.started or self.services.windows[0] is not self:
+            return
+        STARTUP.mark("first view")
+        self.current_tab().browser.loadFinished.connect(self.on_first_load)
+        self.services.start()
+        
+    def on_first_load(self, ok):
+        """Startup is over once the first page has loaded"""
+        self.sender().loadFinished.disconnect(self.on_first_load)
+        STARTUP.mark("first page loaded")
+        if PROFILE_STARTUP:
+            STARTUP.report()
+            try:
+                STARTUP.append_to(app_data_path(STARTUP_PROFILE_FILE))
+            except OSError:
+                pass
+            self.log_action(f"Startup: {STARTUP.as_dict()['total_ms']} ms to first page load",
+                            category="startup")
         
     def register_shortcuts(self):
         """Register keyboard shortcuts"""
-        # Tab management
+        # Tab and window management
         QShortcut(QKeySequence("Ctrl+T"), self, self.add_new_tab)
+        QShortcut(QKeySequence("Ctrl+N"), self, self.services.new_window)
         QShortcut(QKeySequence("Ctrl+W"), self, self.close_current_tab)
         QShortcut(QKeySequence("Ctrl+Tab"), self, self.next_tab)
         QShortcut(QKeySequence("Ctrl+Shift+Tab"), self, self.previous_tab)
@@ -408,28 +1210,122 @@ class Window(QMainWindow):
         QShortcut(QKeySequence("F5"), self, self.refresh_page)
         QShortcut(QKeySequence("Ctrl+F5"), self, self.hard_refresh)
         QShortcut(QKeySequence("Ctrl+H"), self, self.show_history)
+        QShortcut(QKeySequence("Ctrl+Shift+F"), self, self.show_content_search)
+        QShortcut(QKeySequence("Ctrl+D"), self, self.bookmark_current_page)
         
         # Developer tools
         QShortcut(QKeySequence("F12"), self, self.toggle_dev_tools)
         
-    def add_new_tab(self, url=None):
+    def session_state(self):
+        """Collect this window's tabs for the session file"""
+        tabs = [self.tabs.widget(i) for i in range(self.tabs.count())]
+        return {
+            "current": self.tabs.currentIndex(),
+            "tabs": [tab.session_state() for tab in tabs]
+        }
+        
+    def restore_session(self, data):
+        """Restore a saved window's tabs; only the active tab gets a web view"""
+        entries = data.get("tabs")
+        if not entries:
+            return False
+        
+        current = min(max(data.get("current", 0), 0), len(entries) - 1)
+        self.tabs.blockSignals(True)
+        for i, entry in enumerate(entries):
+            tab = Tab(
+                self,
+                entry.get("url"),
+                title=entry.get("title"),
+                history_blob=session.decode_blob(entry.get("history")),
+                lazy=(i != current)
+            )
+            self.tabs.addTab(tab, tab.icon, tabstate.tab_text(tab.title))
+        self.tabs.setCurrentIndex(current)
+        self.tabs.blockSignals(False)
+        self.tab_changed(current)
+        return True
+        
+    def add_new_tab(self, url=None, background=False):
         """Add a new browser tab"""
-        tab = Tab(self, url)
-        index = self.tabs.addTab(tab, "New Tab")
-        self.tabs.setCurrentIndex(index)
+        view, preloaded = self.view_pool.take(url or DEFAULT_HOME_PAGE)
+        tab = Tab(self, url, view=view, preloaded=preloaded)
+        index = self.tabs.addTab(tab, tab.icon, tabstate.tab_text(tab.title))
+        self.session.schedule()
         
-        # Set focus to address bar
-        self.URLBar.setFocus()
+        if not background:
+            self.tabs.setCurrentIndex(index)
+            # Set focus to address bar
+            self.URLBar.setFocus()
         
-        self.log_action(f"New tab opened: {index+1}")
+        self.log_action(f"New tab opened: {index+1}", category="tabs")
         return tab
         
     def close_tab(self, index):
         """Close tab at specified index"""
         if self.tabs.count() > 1:
+            tab = self.tabs.widget(index)
+            self.suggestions.tab_closed(tab.url.toString())
+            self.tab_bar_updater.forget(tab)
+            if self.automation is not None:
+                self.automation.tab_closed(tab)
             self.tabs.removeTab(index)
-            self.log_action(f"Tab closed: {index+1}")
+            tab.dispose()
+            self.session.schedule()
+            self.log_action(f"Tab closed: {index+1}", category="tabs")
+            if self.leak_tracker is not None:
+                QTimer.singleShot(0, self.log_leak_counts)
+            
+    def release_tab(self, index):
+        """Take a tab out of this window without closing it"""
+        tab = self.tabs.widget(index)
+        self.tab_bar_updater.forget(tab)
+        self.tabs.removeTab(index)
+        self.session.schedule()
+        return tab
+        
+    def insert_tab(self, tab, index=-1):
+        """Show a tab taken from another window, view and all"""
+        tab.window = self
+        index = self.tabs.insertTab(index, tab, tab.icon, tabstate.tab_text(tab.title))
+        self.tabs.setCurrentIndex(index)
+        self.tab_bar_updater.mark(tab)
+        self.session.schedule()
+        return index
+        
+    def dispose_tabs(self):
+        """Tear down every tab as the window closes"""
+        while self.tabs.count():
+            tab = self.release_tab(0)
+            self.suggestions.tab_closed(tab.url.toString())
+            if self.automation is not None:
+                self.automation.tab_closed(tab)
+            tab.dispose()
+            
+    def close_if_empty(self):
+        """Close a window whose last tab was dragged away"""
+        if self.tabs.count() == 0:
+            self.close()
+            
+    def on_tab_received(self, source_bar, index, to_index):
+        """A tab was dropped on this window's tab bar"""
+        source = source_bar.window()
+        if source is self:
+            self.tabs.tabBar().moveTab(index, min(to_index, self.tabs.count() - 1))
+        elif source in self.services.windows:
+            self.services.move_tab(source, index, self, to_index)
+            
+    def on_tab_detached(self, index, pos):
+        """A tab was dropped outside every tab bar: give it a window"""
+        if self.tabs.count() == 1:
+            self.move(pos)
+        else:
+            self.services.detach_tab(self, index, pos)
             
+    def move_tab_to_new_window(self):
+        if self.tabs.count() > 1:
+            self.services.detach_tab(self, self.tabs.currentIndex())
+        
     def close_current_tab(self):
         """Close the currently active tab"""
         current_index = self.tabs.currentIndex()
@@ -452,8 +1348,42 @@ class Window(QMainWindow):
         if index >= 0 and hasattr(self, 'URLBar'):
             tab = self.tabs.widget(index)
             if tab:
-                self.URLBar.setText(tab.browser.url().toString())
-                self.URLBar.setCursorPosition(0)
+                self.lifecycle.tab_activated(tab)
+                self.show_url(tab.url)
+                self.show_progress(tab)
+                self.session.schedule()
+                self.update_blocked_label()
+                
+    def show_url(self, url):
+        """Bind the address bar to the current tab's URL"""
+        self.URLBar.setText(url.toString())
+        self.URLBar.setCursorPosition(0)
+        
+    def show_progress(self, tab):
+        """Bind the progress bar to the current tab's load state"""
+        if not hasattr(self, 'progress_bar'):
+            return
+        self.progress_bar.setVisible(tab.loading and tab.progress < 100)
+        self.progress_bar.setValue(tab.progress)
+                
+    def on_lifecycle_stats(self, counts):
+        """Log how many tabs sit in each lifecycle state"""
+        summary = ", ".join(f"{state}: {count}" for state, count in counts.items())
+        self.log_action(f"Tab lifecycle - {summary}", category="lifecycle")
+        
+    def log_leak_counts(self):
+        """Log live tab/view/page/renderer counts (LEAK_TRACKING only)"""
+        counts = self.leak_tracker.snapshot()
+        self.log_action(", ".join(f"{kind} {n}" for kind, n in counts.items()), category="leaks")
+        
+    def update_blocked_label(self):
+        """Show how many requests were blocked in the current tab"""
+        tab = self.current_tab()
+        if not hasattr(self, 'blocked_label') or tab is None:
+            return
+        blocked = tab.blocked_requests()
+        self.blocked_label.setText(f"🛡 {blocked} blocked" if blocked else "")
+        self.blocked_label.setToolTip(f"{self.content_blocker.blocked} requests blocked in all tabs")
             
     def current_tab(self):
         """Get the current active tab"""
@@ -462,7 +1392,7 @@ class Window(QMainWindow):
     def navigate_back(self):
         """Navigate back in history"""
         if self.current_tab():
-            self.current_tab().browser.back()
+            self.current_tab().go_back()
             
     def navigate_forward(self):
         """Navigate forward in history"""
@@ -494,41 +1424,115 @@ class Window(QMainWindow):
             if not text:
                 return
                 
-            if ' ' in text or '.' not in text:
+            if not suggestions.looks_like_url(text):
                 search_url = SEARCH_ENGINES[self.current_engine].format(text)
-                self.current_tab().browser.setUrl(QUrl(search_url))
+                self.navigate_to(search_url)
             else:
                 # Add https if missing
-                if not text.startswith(('http://', 'https://')):
+                if not suggestions.SCHEME_RE.match(text.lower()) and not text.lower().startswith(('about:', 'file:', 'data:')):
                     text = 'https://' + text
-                self.current_tab().browser.setUrl(QUrl(text))
+                self.navigate_to(text)
                 
-    def navigate_to(self, url):
-        """Navigate to specific URL"""
-        if self.current_tab():
-            self.current_tab().browser.setUrl(QUrl(url))
+    def navigate_to(self, url, tab=None):
+        """Navigate a tab (the current one by default) to a URL
+        
+        The current tab uses a prerendered page when one matches.
+        """
+        view = None
+        if tab is None or tab is self.current_tab():
+            tab = self.current_tab()
+            if tab is None:
+                return
+            view = self.prerenderer.take(url)
+        if view is not None:
+            tab.adopt_view(view)
+        else:
+            tab.browser.setUrl(QUrl(url))
+                
+    def on_omnibox_candidates(self, candidates):
+        """Hint the top omnibox suggestion, as sure as its lead over the next"""
+        if candidates:
+            url, score = candidates[0]
+            runner_up = candidates[1][1] if len(candidates) > 1 else 0.0
+            confidence = prerender.suggestion_confidence(score, runner_up, PRERENDER_OMNIBOX_SCORE_SCALE)
+            self.prerenderer.hint(url, confidence, "omnibox")
+        else:
+            self.prerenderer.cancel("omnibox")
             
+    def predict_next(self, tab):
+        """Hint where the current tab went next in earlier visits"""
+        prediction = self.predictor.predict(tab.url.toString())
+        if prediction is None or prediction[2] < PRERENDER_MIN_TRANSITIONS:
+            self.prerenderer.cancel("history")
+            return
+        url, probability, _ = prediction
+        self.prerenderer.hint(url, probability, "history")
+        
     def set_search_engine(self, engine):
         """Set the default search engine"""
         self.current_engine = engine
         self.search_combo.setText(f"{engine} ▼")
         self.log_action(f"Search engine changed to: {engine}")
         
+    def tab_for_page(self, page):
+        """Return the tab in this window showing page, or None"""
+        for i in range(self.tabs.count()):
+            tab = self.tabs.widget(i)
+            if tab.browser is not None and tab.browser.page() is page:
+                return tab
+        return None
+        
     def show_downloads(self):
         """Show download manager"""
-        self.download_manager.show()
+        self.services.get_download_manager().show()
         
     def show_settings(self):
-        """Show settings dialog"""
-        self.toggle_bookmarks_bar()
+        """Show the performance settings dialog"""
+        if self.settings_dialog is None:
+            self.settings_dialog = settings.SettingsDialog(SETTINGS, self.services.save_settings, self)
+        self.settings_dialog.show()
+        self.settings_dialog.raise_()
         self.log_action("Settings opened")
         
     def toggle_bookmarks_bar(self):
         """Toggle bookmarks toolbar visibility"""
         visible = not self.bookmarks_toolbar.isVisible()
+        if visible and self.bookmark_bar is None:
+            self.build_bookmarks_bar()
         self.bookmarks_toolbar.setVisible(visible)
         self.log_action(f"Bookmarks bar {'shown' if visible else 'hidden'}")
         
+    def build_bookmarks_bar(self):
+        """Put the bookmark bar in its toolbar; it builds buttons only for what fits"""
+        self.hover_hints = prerender.HoverHints(self.prerenderer, PRERENDER_HOVER_CONFIDENCE, self)
+        self.bookmark_bar = bookmarks.BookmarkBar(self.bookmarks, icon_for=self.favicons.icon_for)
+        self.bookmark_bar.urlActivated.connect(self.navigate_to)
+        self.bookmark_bar.buttonAdded.connect(self.watch_bookmark_button)
+        self.bookmarks_toolbar.addWidget(self.bookmark_bar)
+        
+    def watch_bookmark_button(self, button, url):
+        """Hint hovered bookmarks to the prerenderer"""
+        if url:
+            self.hover_hints.watch(button, url)
+            
+    def bookmark_current_page(self):
+        """Add the current page to the bookmark bar"""
+        tab = self.current_tab()
+        if tab is None or self.bookmarks.is_bookmarked(tab.url.toString()):
+            return
+        self.bookmarks.add(tab.url.toString(), tab.title)
+        self.suggestions.set_bookmarks([(tab.url.toString(), tab.title)])
+        self.log_action(f"Bookmarked: {tab.title}", category="bookmarks")
+        
+    def import_bookmarks(self):
+        """Import a browser's bookmark export (HTML) or Chrome Bookmarks file"""
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Import Bookmarks", "", "Bookmarks (*.html *.htm *.json Bookmarks);;All files (*)"
+        )
+        if path:
+            self.bookmarks.import_async(path)
+            self.log_action(f"Importing bookmarks from {os.path.basename(path)}", category="bookmarks")
+        
     def focus_address_bar(self):
         """Set focus to address bar"""
         self.URLBar.setFocus()
@@ -536,85 +1540,134 @@ class Window(QMainWindow):
         
     def toggle_dev_tools(self):
         """Toggle developer tools"""
-        visible = not self.console.isVisible()
-        self.console.setVisible(visible)
+        if self.dev_tools is None:
+            self.build_dev_tools()
+        visible = not self.dev_tools.isVisible()
+        self.dev_tools.setVisible(visible)
+        if visible and self.console_stale:
+            self.refresh_console()
         self.log_action(f"Developer tools {'shown' if visible else 'hidden'}")
         
+    def build_dev_tools(self):
+        """Create the console and resource panel below the tabs"""
+        self.console = QPlainTextEdit()
+        self.console.setReadOnly(True)
+        self.console.setMaximumBlockCount(LOG_CONSOLE_BLOCKS)
+        
+        self.resource_panel = telemetry.ResourcePanel()
+        self.resource_sampler.sampled.connect(self.resource_panel.update_rows)
+        
+        self.dev_tools = QTabWidget()
+        self.dev_tools.addTab(self.console, "Console")
+        self.dev_tools.addTab(self.resource_panel, "Resources")
+        self.dev_tools.setVisible(False)
+        self.dev_tools.setMinimumHeight(150)
+        self.main_layout.addWidget(self.dev_tools)
+        
+    def show_cache_stats(self):
+        """Show cache size and hit indicators for the browser profile"""
+        if self.cache_dialog is None:
+            self.cache_dialog = browserprofile.CacheStatsDialog(self.browser_profile, self)
+        self.cache_dialog.show()
+        self.cache_dialog.raise_()
+        
+    def any_tab_loading(self):
+        return any(self.tabs.widget(i).loading for i in range(self.tabs.count()))
+        
     def show_history(self):
-        """Show browsing history (placeholder)"""
+        """Show browsing history"""
+        if self.history_dialog is None:
+            self.history_dialog = history.HistoryDialog(self.history, self.navigate_to,
+                                                        self.favicons.icon_for, self)
+        self.history_dialog.show()
+        self.history_dialog.raise_()
         self.log_action("History viewed")
         
+    def show_content_search(self):
+        """Search the text of open tabs and visited pages (needs CONTENT_INDEX)"""
+        if self.content_index is None:
+            self.log_action("Page content search needs CONTENT_INDEX = True", eventlog.WARNING)
+            return
+        if self.content_search_dialog is None:
+            self.content_search_dialog = contentindex.ContentSearchDialog(
+                self.content_index, self.open_or_switch, self.services.open_urls,
+                self.favicons.icon_for, parent=self
+            )
+        self.content_search_dialog.show()
+        self.content_search_dialog.raise_()
+        
+    def open_or_switch(self, url):
+        """Switch to the tab showing url, or open it in the current tab"""
+        if not self.services.switch_to_url(url):
+            self.navigate_to(url)
+        
     def apply_theme(self, theme_name):
-        """Apply color theme to the browser"""
-        theme = THEMES.get(theme_name, THEMES["Dark"])
-        
-        # Apply stylesheet
-        stylesheet = f"""
-            QMainWindow, QWidget {{
-                background-color: {theme['bg']};
-                color: {theme['fg']};
-            }}
-            QTabWidget::pane {{
-                border: 0;
-            }}
-            QTabBar::tab {{
-                background: {theme['tab_bg']};
-                color: {theme['fg']};
-                padding: 8px;
-                border-top-left-radius: 4px;
-                border-top-right-radius: 4px;
-                margin-right: 2px;
-            }}
-            QTabBar::tab:selected {{
-                background: {theme['tab_active']};
-                border-bottom: 2px solid #1a73e8;
-            }}
-            QLineEdit {{
-                background: {theme['url_bg']};
-                border-radius: 16px;
-                padding: 6px 12px;
-                color: {theme['fg']};
-            }}
-            QToolButton {{
-                background: transparent;
-                border-radius: 4px;
-                padding: 4px;
-            }}
-            QToolButton:hover {{
-                background: rgba(255, 255, 255, 0.1);
-            }}
-            QStatusBar {{
-                background: {theme['tab_bg']};
-            }}
-            QProgressBar {{
-                border: 0;
-                background: transparent;
-            }}
-            QProgressBar::chunk {{
-                background: #1a73e8;
-            }}
+        """Apply color theme to the browser
+        
+        The palette covers most widgets; the few styled parts get their
+        precompiled stylesheets set directly, so the cost does not grow
+        with the number of tabs.
         """
-        self.setStyleSheet(stylesheet)
-        self.log_action(f"Theme applied: {theme_name}")
+        theme = self.themes.get(theme_name) or self.themes[DEFAULT_THEME]
+        if theme is self.theme:
+            return
+        self.setPalette(theme.palette)
+        for part, widgets in self.themed_parts().items():
+            stylesheet = theme.stylesheets[part]
+            for widget in widgets:
+                widget.setStyleSheet(stylesheet)
+        self.theme = theme
+        self.log_action(f"Theme applied: {theme.name}")
+        
+    def themed_parts(self):
+        """Widgets that take each part of a theme's stylesheets"""
+        return {
+            "tabbar": (self.tabs.tabBar(),),
+            "toolbar": (self.nav_toolbar, self.bookmarks_toolbar),
+            "status": (self.status_bar,),
+            "progress": (self.progress_bar,)
+        }
         
-    def log_action(self, message):
+    def log_action(self, message, level=eventlog.INFO, category="general"):
         """Log actions to console and status bar"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        log_entry = f"[{timestamp}] {message}"
-        
-        if hasattr(self, 'console') and self.console:
-            self.console.append(log_entry)
-            
-            # Auto-scroll to bottom
-            scrollbar = self.console.verticalScrollBar()
-            scrollbar.setValue(scrollbar.maximum())
+        self.event_log.log(message, level, category)
         
+    def show_log_batch(self, batch):
+        """Append a batch of log records to the console and status bar"""
         if hasattr(self, 'status_label') and self.status_label:
-            self.status_label.setText(message)
+            self.status_label.setText(batch[-1].message)
+        
+        # A hidden console is refilled from the ring buffer when shown
+        if self.dev_tools is None or not self.dev_tools.isVisible():
+            self.console_stale = True
+            return
+        
+        scrollbar = self.console.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum() - 4
+        self.console.appendPlainText("\n".join(eventlog.format_record(r) for r in batch))
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
+            
+    def refresh_console(self):
+        """Rebuild the console from the ring buffer"""
+        records = list(self.event_log.records)[-LOG_CONSOLE_BLOCKS:]
+        self.console.setPlainText("\n".join(eventlog.format_record(r) for r in records))
+        scrollbar = self.console.verticalScrollBar()
+        scrollbar.setValue(scrollbar.maximum())
+        self.console_stale = False
+        
+    def closeEvent(self, event):
+        """Leave the shared services; the last window saves the session and stops them"""
+        if self in self.services.windows:
+            self.event_log.flushed.disconnect(self.show_log_batch)
+            self.content_blocker.countsChanged.disconnect(self.update_blocked_label)
+            self.services.window_closing(self)
+        super(Window, self).closeEvent(event)
         
     def contextMenuEvent(self, event):
         """Custom context menu for tabs"""
         menu = QMenu(self)
+        menu.setPalette(self.palette())
         
         # Tab actions
         new_tab_action = QAction("New Tab", self)
@@ -623,14 +1676,36 @@ class Window(QMainWindow):
         close_tab_action = QAction("Close Tab", self)
         close_tab_action.triggered.connect(self.close_current_tab)
         
+        new_window_action = QAction("New Window", self)
+        new_window_action.triggered.connect(self.services.new_window)
+        
+        move_tab_action = QAction("Move Tab to New Window", self)
+        move_tab_action.setEnabled(self.tabs.count() > 1)
+        move_tab_action.triggered.connect(self.move_tab_to_new_window)
+        
         # Add to menu
         menu.addAction(new_tab_action)
         menu.addAction(close_tab_action)
+        menu.addAction(new_window_action)
+        menu.addAction(move_tab_action)
         menu.addSeparator()
         
+        import_action = QAction("Import Bookmarks…", self)
+        import_action.triggered.connect(self.import_bookmarks)
+        menu.addAction(import_action)
+        
+        content_search_action = QAction("Search Page Contents…", self)
+        content_search_action.setEnabled(self.content_index is not None)
+        content_search_action.triggered.connect(self.show_content_search)
+        menu.addAction(content_search_action)
+        
+        cache_action = QAction("Cache…", self)
+        cache_action.triggered.connect(self.show_cache_stats)
+        menu.addAction(cache_action)
+        
         # Theme selector
         theme_menu = menu.addMenu("Themes")
-        for theme in THEMES:
+        for theme in self.themes:
             theme_action = QAction(theme, self)
             theme_action.triggered.connect(lambda _, t=theme: self.apply_theme(t))
             theme_menu.addAction(theme_action)
@@ -638,11 +1713,52 @@ class Window(QMainWindow):
         menu.exec_(event.globalPos())
 
 if __name__ == '__main__':
+    # Headless batch rendering: python main.py render urls.txt -o out
+    if len(sys.argv) > 1 and sys.argv[1] == 'render':
+        import render
+        sys.exit(render.main(sys.argv[2:]))
+    
+    PROFILE_STARTUP = '--profile-startup' in sys.argv
+    
+    # Settings that become Chromium switches must be in the environment
+    # before QApplication; the name places the app data directory
+    QApplication.setApplicationName('Fibrowser Pro')
+    settings_path = app_data_path(SETTINGS_FILE)
+    if '--settings' in sys.argv:
+        position = sys.argv.index('--settings') + 1
+        if position < len(sys.argv):
+            settings_path = sys.argv[position]
+    SETTINGS = settings.Settings.load(settings_path)
+    SETTINGS.apply_early()
+    STARTUP.mark("settings")
+    
     app = QApplication(sys.argv)
     app.setApplicationName('Fibrowser Pro')
     app.setWindowIcon(QIcon(app.style().standardIcon(QStyle.SP_ComputerIcon)))
+    STARTUP.mark("qapplication")
     
-    window = Window()
+    # Show the frame before the first web view is built
+    services = Services.instance()
+    window = Window(services=services, staged=True)
+    window.setAttribute(Qt.WA_DeleteOnClose)
     window.show()
+    app.processEvents()
+    STARTUP.mark("window shown")
+    
+    # Automation: python main.py --automation [socket name]
+    if '--automation' in sys.argv:
+        position = sys.argv.index('--automation') + 1
+        name = AUTOMATION_SOCKET
+        if position < len(sys.argv) and not sys.argv[position].startswith('-'):
+            name = sys.argv[position]
+        services.start_automation(name)
+    
+    # Page-load metrics endpoint: python main.py --metrics-port [port]
+    if '--metrics-port' in sys.argv:
+        position = sys.argv.index('--metrics-port') + 1
+        port = LOAD_METRICS_PORT
+        if position < len(sys.argv) and sys.argv[position].isdigit():
+            port = int(sys.argv[position])
+        services.serve_load_metrics(port)
     
     app.exec_()
\ No newline at end of file
@@ -0,0 +1,246 @@
+import re
+import time
+from collections import Counter, OrderedDict, deque
+from PyQt5.QtCore import QObject, QTimer, QUrl, QEvent, pyqtSignal
+from PyQt5.QtWebEngineWidgets import QWebEnginePage, QWebEngineProfile
+from telemetry import available_memory, read_proc_stats
+from viewpool import dispose_view
+
+PRECONNECT_HTML = ('<!doctype html><link rel="preconnect" href="{0}">'
+                   '<link rel="dns-prefetch" href="{0}">')
+MATCH_FLAGS = QUrl.StripTrailingSlash | QUrl.NormalizePathSegments | QUrl.RemoveFragment
+# Paths whose GET may change state, so they are never loaded speculatively
+UNSAFE_PATH_RE = re.compile(r"(log|sign)[-_]?(out|off)|unsubscribe|delete|remove", re.IGNORECASE)
+
+def same_target(a, b):
+    return QUrl(a).adjusted(MATCH_FLAGS) == QUrl(b).adjusted(MATCH_FLAGS)
+
+def safe_to_prerender(url):
+    """Only plain http(s) pages: no query string, no logout-like path"""
+    url = QUrl(url)
+    return (url.scheme() in ("http", "https") and not url.hasQuery()
+            and not UNSAFE_PATH_RE.search(url.path()))
+
+def suggestion_confidence(score, runner_up=0.0, scale=200.0):
+    """Confidence in the top suggestion from its score and its lead over the next
+
+    The first factor grows with the score (half at ``scale``), the
+    second is the top score's share of the top two, so a tie halves it.
+    """
+    if score <= 0:
+        return 0.0
+    return score / (score + scale) * score / (score + max(runner_up, 0.0))
+
+class NavigationPredictor:
+    """Counts which URL followed which in the current tab"""
+    def __init__(self, max_sources=5000):
+        self.max_sources = max_sources
+        self.transitions = OrderedDict()
+
+    def record(self, source, target):
+        if not source or source == target:
+            return
+        counts = self.transitions.pop(source, None) or Counter()
+        counts[target] += 1
+        self.transitions[source] = counts
+        if len(self.transitions) > self.max_sources:
+            self.transitions.popitem(last=False)
+
+    def predict(self, source):
+        """Return (url, probability, count) for the likeliest next URL, or None"""
+        counts = self.transitions.get(source)
+        if not counts:
+            return None
+        url, count = counts.most_common(1)[0]
+        return url, count / sum(counts.values()), count
+
+class Prerenderer(QObject):
+    """Preconnects to or prerenders the most likely next navigation
+
+    Callers feed ``hint(url, confidence, source)``; the strongest hint
+    wins after ``hint_delay`` ms. At ``prerender_threshold`` or above the
+    URL is loaded into one hidden view, which is frozen once loaded and
+    handed over by ``take()`` when the user navigates there. Lower but
+    non-trivial confidence, or a URL that is not ``safe_to_prerender``,
+    only preconnects to the origin. A changed
+    prediction cancels the previous prerender. Prerenders are rate
+    limited, skipped when memory is short and dropped if their renderer
+    grows past ``max_rss``.
+    """
+    statsChanged = pyqtSignal(dict)
+
+    def __init__(self, factory, prerender_threshold=0.5, preconnect_threshold=0.2,
+                 hint_delay=150, max_per_minute=12, max_rss=300 * 1024 * 1024,
+                 min_free_memory=1024 * 1024 * 1024, profile=None, parent=None):
+        super().__init__(parent)
+        self.factory = factory
+        self.profile = profile or QWebEngineProfile.defaultProfile()
+        self.prerender_threshold = prerender_threshold
+        self.preconnect_threshold = preconnect_threshold
+        self.max_per_minute = max_per_minute
+        self.max_rss = max_rss
+        self.min_free_memory = min_free_memory
+        self.enabled = True
+
+        self.hints = {}
+        self.view = None
+        self.target = None
+        self.started = 0.0
+        self.load_ms = None
+        self.recent = deque()
+        self.preconnect_page = None
+        self.preconnected = None
+        self.stats = Counter()
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(hint_delay)
+        self.timer.timeout.connect(self.apply)
+
+    def hint(self, url, confidence, source):
+        """Offer a prediction; the latest hint per source replaces the old one"""
+        if not self.enabled or not url:
+            return
+        self.stats["hints"] += 1
+        self.hints[source] = (url, confidence)
+        self.timer.start()
+
+    def cancel(self, source):
+        """Withdraw a source's hint (e.g. the pointer left a bookmark)"""
+        if self.hints.pop(source, None) is not None:
+            self.timer.start()
+
+    def apply(self):
+        """Act on the strongest hint"""
+        if not self.hints:
+            self.discard("cancelled")
+            return
+        url, confidence = max(self.hints.values(), key=lambda hint: hint[1])
+        safe = safe_to_prerender(url)
+        if confidence >= self.prerender_threshold and safe:
+            if self.target is None or not same_target(url, self.target):
+                self.discard("cancelled")
+                self.prerender(url)
+        else:
+            if not safe:
+                self.stats["unsafe"] += 1
+            self.discard("cancelled")
+            if confidence >= self.preconnect_threshold:
+                self.preconnect(url)
+
+    def within_budget(self):
+        now = time.monotonic()
+        while self.recent and now - self.recent[0] > 60:
+            self.recent.popleft()
+        if len(self.recent) >= self.max_per_minute:
+            return False
+        free = available_memory()
+        return free is None or free >= self.min_free_memory
+
+    def prerender(self, url):
+        if not self.within_budget():
+            self.stats["over_budget"] += 1
+            self.preconnect(url)
+            return
+        self.recent.append(time.monotonic())
+        self.stats["prerenders"] += 1
+        self.view = self.factory()
+        self.view.loadFinished.connect(self.on_loaded)
+        self.target = url
+        self.started = time.monotonic()
+        self.load_ms = None
+        self.view.setUrl(QUrl(url))
+
+    def on_loaded(self, ok):
+        if self.view is None or self.load_ms is not None:
+            return
+        if not ok:
+            self.discard("failed")
+            return
+        self.load_ms = (time.monotonic() - self.started) * 1000
+        page = self.view.page()
+        stats = read_proc_stats(page.renderProcessPid())
+        if stats is not None and stats[0] > self.max_rss:
+            self.discard("over_budget")
+            return
+        # Loaded pages sit frozen until they are used
+        page.setLifecycleState(QWebEnginePage.LifecycleState.Frozen)
+
+    def preconnect(self, url):
+        """Warm DNS, TCP and TLS for the URL's origin in the shared profile"""
+        origin = QUrl(url).adjusted(QUrl.RemovePath | QUrl.RemoveQuery | QUrl.RemoveFragment)
+        if not origin.isValid() or origin.scheme() not in ("http", "https"):
+            return
+        origin = origin.toString()
+        if origin == self.preconnected:
+            return
+        if self.preconnect_page is None:
+            self.preconnect_page = QWebEnginePage(self.profile, self)
+        self.preconnect_page.setHtml(PRECONNECT_HTML.format(origin), QUrl("about:blank"))
+        self.preconnected = origin
+        self.stats["preconnects"] += 1
+
+    def discard(self, reason):
+        """Drop the current prerender"""
+        if self.view is None:
+            return
+        self.stats[reason] += 1
+        dispose_view(self.view)
+        self.view = None
+        self.target = None
+
+    def take(self, url):
+        """Return the prerendered view for url, or None for a cold load"""
+        self.stats["commits"] += 1
+        self.hints.clear()
+        self.timer.stop()
+        view = self.view
+        if view is None or not (same_target(url, self.target) or same_target(url, view.url().toString())):
+            self.discard("wasted")
+            self.statsChanged.emit(self.summary())
+            return None
+
+        # Saved: the whole load if it finished, else the head start
+        saved = self.load_ms if self.load_ms is not None else (time.monotonic() - self.started) * 1000
+        self.stats["hits"] += 1
+        self.stats["saved_ms"] += int(saved)
+        self.view = None
+        self.target = None
+        view.loadFinished.disconnect(self.on_loaded)
+        view.page().setLifecycleState(QWebEnginePage.LifecycleState.Active)
+        self.statsChanged.emit(self.summary())
+        return view
+
+    def summary(self):
+        stats = dict(self.stats)
+        commits = stats.get("commits", 0)
+        prerenders = stats.get("prerenders", 0)
+        stats["hit_rate"] = round(stats.get("hits", 0) / commits, 3) if commits else 0.0
+        stats["precision"] = round(stats.get("hits", 0) / prerenders, 3) if prerenders else 0.0
+        return stats
+
+    def shutdown(self):
+        self.enabled = False
+        self.timer.stop()
+        self.discard("cancelled")
+
+class HoverHints(QObject):
+    """Turns hovering a link-like widget into a prerender hint"""
+    def __init__(self, prerenderer, confidence=0.4, parent=None):
+        super().__init__(parent)
+        self.prerenderer = prerenderer
+        self.confidence = confidence
+        self.urls = {}
+
+    def watch(self, widget, url):
+        self.urls[widget] = url
+        widget.installEventFilter(self)
+        # Bookmark bars rebuild their buttons; forget each one as it goes
+        widget.destroyed.connect(lambda: self.urls.pop(widget, None))
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Enter and obj in self.urls:
+            self.prerenderer.hint(self.urls[obj], self.confidence, "hover")
+        elif event.type() == QEvent.Leave and obj in self.urls:
+            self.prerenderer.cancel("hover")
+        return False
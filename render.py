@@ -0,0 +1,352 @@
+"""Headless batch renderer: URLs in, PDF/PNG/HTML out
+
+Run with: python main.py render urls.txt -o out --format pdf --pool 4
+      or: cat urls.txt | python main.py render - -o out --format png
+
+URLs are read one per line (blank lines and # comments are skipped) on a
+background thread into a bounded queue, so a slow pool holds back the
+reader instead of buffering the whole input. Each URL is loaded in one of
+``--pool`` pages, optionally settled (a fixed delay and/or a JavaScript
+condition), then written out. One JSON line per URL with its timings goes
+to stdout (or ``--report``) and a summary with pages/min to stderr.
+"""
+import os
+import re
+import sys
+import json
+import time
+import queue
+import argparse
+import threading
+from collections import deque
+from PyQt5.QtCore import QObject, QTimer, QUrl, QSize, QMarginsF, pyqtSignal
+from PyQt5.QtGui import QPageLayout, QPageSize
+from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEnginePage, QWebEngineProfile
+
+from viewpool import dispose_view
+
+FORMATS = ("pdf", "png", "html")
+SLUG_RE = re.compile(r"[^A-Za-z0-9._-]+")
+NO_MORE = object()
+
+def read_urls(stream, out_queue):
+    """Feed URLs into a bounded queue (blocks while the renderer is busy)"""
+    try:
+        for line in stream:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                out_queue.put(line)
+    finally:
+        out_queue.put(NO_MORE)
+
+def output_name(index, url, ext):
+    qurl = QUrl(url)
+    slug = SLUG_RE.sub("_", f"{qurl.host()}{qurl.path()}").strip("_")[:80] or "page"
+    return f"{index:05d}-{slug}.{ext}"
+
+class Job:
+    __slots__ = ("index", "url", "attempt", "started", "loaded", "settled", "error")
+
+    def __init__(self, index, url):
+        self.index = index
+        self.url = url
+        self.attempt = 0
+        self.started = self.loaded = self.settled = 0.0
+        self.error = None
+
+class Slot(QObject):
+    """One page of the pool and the job it is working on"""
+    def __init__(self, renderer, number):
+        super().__init__(renderer)
+        self.renderer = renderer
+        self.number = number
+        self.job = None
+        self.view = None
+        self.path = None
+
+        self.timeout = QTimer(self)
+        self.timeout.setSingleShot(True)
+        self.timeout.timeout.connect(self.on_timeout)
+        self.settle_timer = QTimer(self)
+        self.settle_timer.setSingleShot(True)
+        self.settle_timer.timeout.connect(self.check_settled)
+        self.create_view()
+
+    def create_view(self):
+        if self.view is not None:
+            self.view.loadFinished.disconnect(self.on_loaded)
+            dispose_view(self.view)
+        self.view = QWebEngineView()
+        self.view.setPage(QWebEnginePage(self.renderer.profile, self.view))
+        self.view.resize(self.renderer.viewport)
+        self.view.show()
+        self.view.loadFinished.connect(self.on_loaded)
+        self.view.page().pdfPrintingFinished.connect(self.on_pdf)
+
+    def start(self, job):
+        self.job = job
+        job.attempt += 1
+        job.started = time.perf_counter()
+        job.loaded = job.settled = 0.0
+        self.timeout.start(int(self.renderer.page_timeout * 1000))
+        self.view.resize(self.renderer.viewport)
+        self.view.setUrl(QUrl(job.url))
+
+    def on_loaded(self, ok):
+        job = self.job
+        if job is None or job.loaded:
+            return
+        if not ok:
+            self.fail("load failed")
+            return
+        job.loaded = time.perf_counter()
+        self.settle_timer.start(self.renderer.settle_ms)
+
+    def check_settled(self):
+        if self.job is None:
+            return
+        condition = self.renderer.settle_js
+        if not condition:
+            self.settled()
+            return
+        self.view.page().runJavaScript(f"!!({condition})", self.on_condition)
+
+    def on_condition(self, result):
+        if self.job is None:
+            return
+        if result:
+            self.settled()
+        else:
+            self.settle_timer.start(100)
+
+    def settled(self):
+        job = self.job
+        job.settled = time.perf_counter()
+        fmt = self.renderer.format
+        path = os.path.join(self.renderer.out_dir, output_name(job.index, job.url, fmt))
+        self.path = path
+        if fmt == "pdf":
+            layout = QPageLayout(QPageSize(QPageSize.A4), QPageLayout.Portrait, QMarginsF())
+            self.view.page().printToPdf(path, layout)
+        elif fmt == "html":
+            self.view.page().toHtml(self.on_html)
+        elif self.renderer.full_page:
+            self.view.page().runJavaScript(
+                "Math.max(document.documentElement.scrollHeight, document.body ? "
+                "document.body.scrollHeight : 0)", self.on_page_height)
+        else:
+            self.write_png()
+
+    def on_page_height(self, height):
+        if self.job is None:
+            return
+        height = min(int(height or 0), self.renderer.max_height)
+        if height > self.view.height():
+            self.view.resize(self.view.width(), height)
+            # Give the compositor a frame at the new size
+            QTimer.singleShot(100, self.write_png)
+        else:
+            self.write_png()
+
+    def write_png(self):
+        if self.job is None:
+            return
+        if self.view.grab().save(self.path, "PNG"):
+            self.done()
+        else:
+            self.fail("could not write PNG")
+
+    def on_html(self, html):
+        if self.job is None:
+            return
+        try:
+            with open(self.path, "w", encoding="utf-8") as f:
+                f.write(html)
+        except OSError as e:
+            self.fail(str(e))
+            return
+        self.done()
+
+    def on_pdf(self, path, ok):
+        if self.job is None or path != self.path:
+            return
+        if ok:
+            self.done()
+        else:
+            self.fail("could not write PDF")
+
+    def on_timeout(self):
+        if self.job is None:
+            return
+        self.view.stop()
+        # A hung renderer may not recover; start over with a fresh page
+        self.create_view()
+        self.fail("timeout")
+
+    def done(self):
+        job, self.job = self.job, None
+        self.timeout.stop()
+        self.renderer.finish(self, job, self.path)
+
+    def fail(self, error):
+        job, self.job = self.job, None
+        self.timeout.stop()
+        self.settle_timer.stop()
+        job.error = error
+        self.renderer.finish(self, job, None)
+
+class BatchRenderer(QObject):
+    """Renders URLs from a queue through a fixed pool of pages"""
+    pageDone = pyqtSignal(dict)
+    finished = pyqtSignal(dict)
+
+    def __init__(self, url_queue, out_dir, format="pdf", pool=4, page_timeout=30.0, retries=2,
+                 settle_ms=0, settle_js=None, viewport=QSize(1280, 800), full_page=False,
+                 max_height=20000, parent=None):
+        super().__init__(parent)
+        self.url_queue = url_queue
+        self.out_dir = out_dir
+        self.format = format
+        self.page_timeout = page_timeout
+        self.retries = retries
+        self.settle_ms = settle_ms
+        self.settle_js = settle_js
+        self.viewport = viewport
+        self.full_page = full_page
+        self.max_height = max_height
+        os.makedirs(out_dir, exist_ok=True)
+
+        # Off-the-record, so batch runs leave the browser profile alone
+        self.profile = QWebEngineProfile(self)
+        self.slots = [Slot(self, i) for i in range(pool)]
+        self.idle = deque(self.slots)
+        self.retry_queue = deque()
+        self.input_done = False
+        self.next_index = 0
+        self.counts = {"ok": 0, "failed": 0, "retried": 0}
+        self.started = None
+        self.done = False
+
+        self.poll = QTimer(self)
+        self.poll.setSingleShot(True)
+        self.poll.setInterval(20)
+        self.poll.timeout.connect(self.dispatch)
+
+    def start(self):
+        self.started = time.perf_counter()
+        self.dispatch()
+
+    def next_job(self):
+        if self.retry_queue:
+            return self.retry_queue.popleft()
+        if self.input_done:
+            return None
+        try:
+            url = self.url_queue.get_nowait()
+        except queue.Empty:
+            return None
+        if url is NO_MORE:
+            self.input_done = True
+            return None
+        job = Job(self.next_index, url)
+        self.next_index += 1
+        return job
+
+    def dispatch(self):
+        """Hand queued URLs to idle pages"""
+        while self.idle:
+            job = self.next_job()
+            if job is None:
+                break
+            self.idle.popleft().start(job)
+        if len(self.idle) == len(self.slots) and self.input_done and not self.retry_queue:
+            if not self.done:
+                self.done = True
+                self.finished.emit(self.summary())
+        elif self.idle and not self.input_done:
+            self.poll.start()
+
+    def finish(self, slot, job, path):
+        now = time.perf_counter()
+        if path is None and job.attempt <= self.retries:
+            self.counts["retried"] += 1
+            self.retry_queue.append(job)
+        else:
+            self.counts["ok" if path else "failed"] += 1
+            record = {
+                "url": job.url,
+                "ok": bool(path),
+                "path": path,
+                "attempts": job.attempt,
+                "load_ms": round((job.loaded - job.started) * 1000, 1) if job.loaded else None,
+                "settle_ms": round((job.settled - job.loaded) * 1000, 1) if job.settled else None,
+                "total_ms": round((now - job.started) * 1000, 1)
+            }
+            if job.error:
+                record["error"] = job.error
+            self.pageDone.emit(record)
+        self.idle.append(slot)
+        QTimer.singleShot(0, self.dispatch)
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.started
+        done = self.counts["ok"] + self.counts["failed"]
+        return dict(self.counts, pages=done, seconds=round(elapsed, 2),
+                    pages_per_min=round(done / elapsed * 60, 1) if elapsed > 0 else 0.0,
+                    pool=len(self.slots))
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="main.py render", description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="file with one URL per line, or - for stdin")
+    parser.add_argument("-o", "--out", default="render-out")
+    parser.add_argument("--format", choices=FORMATS, default="pdf")
+    parser.add_argument("--pool", type=int, default=4, help="concurrent pages")
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds per attempt")
+    parser.add_argument("--retries", type=int, default=2)
+    parser.add_argument("--settle-ms", type=int, default=0, help="wait after load")
+    parser.add_argument("--settle-js", help="JavaScript expression polled until truthy")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=800)
+    parser.add_argument("--full-page", action="store_true", help="PNG of the whole page")
+    parser.add_argument("--report", help="write per-URL JSON lines here instead of stdout")
+    return parser.parse_args(argv)
+
+def main(argv):
+    """Entry point for ``main.py render``; returns the exit code"""
+    args = parse_args(argv)
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([sys.argv[0]])
+
+    stream = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    url_queue = queue.Queue(maxsize=args.pool * 2)
+    threading.Thread(target=read_urls, args=(stream, url_queue), name="render-input",
+                     daemon=True).start()
+
+    report = open(args.report, "w", encoding="utf-8") if args.report else sys.stdout
+    renderer = BatchRenderer(
+        url_queue, args.out, format=args.format, pool=args.pool, page_timeout=args.timeout,
+        retries=args.retries, settle_ms=args.settle_ms, settle_js=args.settle_js,
+        viewport=QSize(args.width, args.height), full_page=args.full_page
+    )
+    result = {}
+
+    def on_page(record):
+        report.write(json.dumps(record) + "\n")
+        report.flush()
+
+    def on_finished(summary):
+        result.update(summary)
+        app.quit()
+
+    renderer.pageDone.connect(on_page)
+    renderer.finished.connect(on_finished)
+    renderer.start()
+    app.exec_()
+
+    print(f"{result.get('pages', 0)} pages ({result.get('ok', 0)} ok, {result.get('failed', 0)} failed, "
+          f"{result.get('retried', 0)} retries) in {result.get('seconds', 0)} s - "
+          f"{result.get('pages_per_min', 0)} pages/min with {args.pool} pages", file=sys.stderr)
+    if report is not sys.stdout:
+        report.close()
+    return 0 if result.get("failed", 1) == 0 else 1
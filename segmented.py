@@ -0,0 +1,211 @@
+import os
+import json
+import time
+import threading
+import urllib.request
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+
+CHUNK_SIZE = 256 * 1024
+MIN_SEGMENT_SIZE = 4 * 1024 * 1024
+JOURNAL_INTERVAL = 1.0  # s
+PROGRESS_INTERVAL = 0.1  # s
+MAX_RETRIES = 3
+USER_AGENT = "FibrowserPro"
+
+class DownloadError(Exception):
+    """Raised when a segmented download cannot complete"""
+
+class RangesNotSupported(DownloadError):
+    """The server does not serve byte ranges for this URL"""
+
+class DownloadCancelled(DownloadError):
+    """The download was cancelled by the caller"""
+
+class ProbeResult:
+    """What a range probe learned about a URL"""
+    def __init__(self, url, size, validator):
+        self.url = url
+        self.size = size
+        self.validator = validator
+
+def open_url(url, headers=None, timeout=30):
+    request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT, **(headers or {})})
+    return urllib.request.urlopen(request, timeout=timeout)
+
+def probe(url, timeout=10):
+    """Check Accept-Ranges support with a one-byte range request"""
+    try:
+        with open_url(url, {"Range": "bytes=0-0"}, timeout) as resp:
+            if resp.status != 206 or resp.headers.get("Accept-Ranges", "bytes") == "none":
+                raise RangesNotSupported(f"no range support ({resp.status})")
+            content_range = resp.headers.get("Content-Range", "")
+            total = content_range.rpartition("/")[2]
+            if not total.isdigit():
+                raise RangesNotSupported("unknown length")
+            validator = resp.headers.get("ETag") or resp.headers.get("Last-Modified")
+            return ProbeResult(resp.geturl(), int(total), validator)
+    except (urllib.error.URLError, OSError, ValueError) as e:
+        raise RangesNotSupported(str(e)) from e
+
+def split_ranges(size, segments, min_segment=MIN_SEGMENT_SIZE):
+    """Split [0, size) into at most segments inclusive byte ranges"""
+    segments = max(1, min(segments, size // min_segment or 1))
+    step = size // segments
+    ranges = []
+    for i in range(segments):
+        start = i * step
+        end = size - 1 if i == segments - 1 else start + step - 1
+        ranges.append([start, end, 0])
+    return ranges
+
+class SegmentedDownload:
+    """Fetch a URL as N concurrent byte ranges into a preallocated file
+
+    Pure Python (no Qt) so it can run on worker threads and be exercised
+    against a local Range-capable HTTP server.
+
+    Data is written to ``path + ".part"`` and progress per segment is
+    journaled to ``path + ".part.json"``; running again with the same path
+    resumes from the journal. ``progress(received, total)`` is called from
+    worker threads at most every PROGRESS_INTERVAL seconds.
+    """
+    def __init__(self, url, path, segments=4, progress=None, timeout=30):
+        self.url = url
+        self.path = path
+        self.part_path = path + ".part"
+        self.journal_path = path + ".part.json"
+        self.segments = segments
+        self.progress = progress
+        self.timeout = timeout
+
+        self.size = 0
+        self.ranges = []
+        self._validator = None
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._last_journal = 0.0
+        self._last_progress = 0.0
+
+    def received(self):
+        return sum(done for _, _, done in self.ranges)
+
+    def cancel(self):
+        self._cancel.set()
+
+    def run(self):
+        """Download to completion, returning the final path"""
+        info = probe(self.url, self.timeout)
+        self.url = info.url
+        self.size = info.size
+        self._validator = info.validator
+        self.ranges = self._load_journal(info) or split_ranges(info.size, self.segments)
+        self._preallocate()
+
+        errors = []
+        pending = [r for r in self.ranges if r[0] + r[2] <= r[1]]
+        if pending:
+            with ThreadPoolExecutor(max_workers=len(pending), thread_name_prefix="segment") as pool:
+                for future in [pool.submit(self._fetch_range, r) for r in pending]:
+                    try:
+                        future.result()
+                    except DownloadError as e:
+                        errors.append(e)
+                        self._cancel.set()
+
+        self._write_journal()
+        if self._cancel.is_set() and not errors:
+            raise DownloadCancelled("cancelled")
+        if errors:
+            raise errors[0]
+
+        os.replace(self.part_path, self.path)
+        os.remove(self.journal_path)
+        self._report(force=True)
+        return self.path
+
+    def _load_journal(self, info):
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                journal = json.load(f)
+            if (journal.get("size") == info.size
+                    and journal.get("validator") == info.validator
+                    and os.path.getsize(self.part_path) == info.size):
+                return [list(r) for r in journal["ranges"]]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return None
+
+    def _write_journal(self):
+        journal = {
+            "url": self.url,
+            "size": self.size,
+            "validator": self._validator,
+            "ranges": [list(r) for r in self.ranges]
+        }
+        tmp_path = self.journal_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(journal, f)
+        os.replace(tmp_path, self.journal_path)
+
+    def _preallocate(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.part_path)), exist_ok=True)
+        mode = "r+b" if os.path.exists(self.part_path) else "wb"
+        with open(self.part_path, mode) as f:
+            f.truncate(self.size)
+            if hasattr(os, "posix_fallocate") and self.size:
+                try:
+                    os.posix_fallocate(f.fileno(), 0, self.size)
+                except OSError:
+                    pass
+
+    def _fetch_range(self, segment):
+        start, end, _ = segment
+        attempt = 0
+        with open(self.part_path, "r+b", buffering=0) as f:
+            while start + segment[2] <= end:
+                if self._cancel.is_set():
+                    return
+                offset = start + segment[2]
+                before = segment[2]
+                headers = {"Range": f"bytes={offset}-{end}"}
+                if self._validator:
+                    headers["If-Range"] = self._validator
+                try:
+                    with open_url(self.url, headers, self.timeout) as resp:
+                        if resp.status != 206:
+                            raise DownloadError(f"server ignored range request ({resp.status})")
+                        f.seek(offset)
+                        while not self._cancel.is_set():
+                            chunk = resp.read(min(CHUNK_SIZE, end - start - segment[2] + 1))
+                            if not chunk:
+                                break
+                            f.write(chunk)
+                            segment[2] += len(chunk)
+                            self._tick()
+                    if segment[2] == before and not self._cancel.is_set():
+                        raise OSError("connection closed without data")
+                    attempt = 0
+                except (urllib.error.URLError, OSError) as e:
+                    attempt += 1
+                    if attempt > MAX_RETRIES:
+                        raise DownloadError(f"bytes {offset}-{end}: {e}") from e
+                    time.sleep(0.5 * 2 ** attempt)
+
+    def _tick(self):
+        now = time.monotonic()
+        if now - self._last_journal >= JOURNAL_INTERVAL and self._lock.acquire(blocking=False):
+            try:
+                self._last_journal = now
+                self._write_journal()
+            finally:
+                self._lock.release()
+        self._report()
+
+    def _report(self, force=False):
+        if self.progress is None:
+            return
+        now = time.monotonic()
+        if force or now - self._last_progress >= PROGRESS_INTERVAL:
+            self._last_progress = now
+            self.progress(self.received(), self.size)
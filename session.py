@@ -0,0 +1,96 @@
+import os
+import json
+import base64
+import tempfile
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+SESSION_VERSION = 1
+
+def atomic_write(path, data):
+    """Write bytes to path so readers never observe a partial file"""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def encode_blob(blob):
+    """Encode serialized navigation history for JSON"""
+    return base64.b64encode(bytes(blob)).decode("ascii") if blob else None
+
+def decode_blob(text):
+    """Decode navigation history stored by encode_blob"""
+    return base64.b64decode(text) if text else None
+
+def window_entries(data):
+    """Return the saved windows that have tabs, oldest first
+
+    Session files written before multi-window support hold a single
+    window's ``current``/``tabs`` at the top level.
+    """
+    if not data:
+        return []
+    windows = data.get("windows")
+    if not isinstance(windows, list):
+        windows = [data]
+    return [entry for entry in windows if isinstance(entry, dict) and entry.get("tabs")]
+
+class SessionStore(QObject):
+    """Debounced, atomically written session file
+
+    ``collect`` is called at save time and must return the session dict:
+    ``{"windows": [{"current": int, "tabs": [{"url", "title", "history"}]}]}``.
+    A write that fails is reported through ``saveFailed`` and retried
+    with the next save.
+    """
+    saveFailed = pyqtSignal(str)
+
+    def __init__(self, path, collect, delay=1000, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.collect = collect
+        self.enabled = True
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay)
+        self._timer.timeout.connect(self.save)
+
+    def schedule(self):
+        """Request a save; bursts of changes collapse into one write"""
+        if self.enabled:
+            self._timer.start()
+
+    def save(self):
+        """Write the session file immediately"""
+        self._timer.stop()
+        if not self.enabled:
+            return
+        data = dict(self.collect())
+        data["version"] = SESSION_VERSION
+        try:
+            atomic_write(self.path, json.dumps(data, separators=(",", ":")).encode("utf-8"))
+        except OSError as e:
+            # Runs as a timer slot, where an exception would abort the process
+            self.saveFailed.emit(str(e))
+
+    def load(self):
+        """Read the session file, returning None if missing or unreadable"""
+        try:
+            with open(self.path, "rb") as f:
+                data = json.loads(f.read().decode("utf-8"))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get("version") != SESSION_VERSION:
+            return None
+        return data
@@ -0,0 +1,234 @@
+import os
+import json
+import hashlib
+from collections import namedtuple
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QLabel, QComboBox,
+                             QSpinBox, QCheckBox, QLineEdit, QPushButton)
+from session import atomic_write
+
+# Chromium reads its switches from this variable when WebEngine starts
+FLAGS_ENV = "QTWEBENGINE_CHROMIUM_FLAGS"
+
+PROCESS_MODELS = {
+    "process-per-site-instance": [],  # Chromium's default
+    "process-per-site": ["--process-per-site"],
+    "single-process": ["--single-process"]
+}
+GPU_RASTERIZATION = {
+    "auto": [],
+    "on": ["--enable-gpu-rasterization"],
+    "off": ["--disable-gpu-rasterization"]
+}
+NO_BACKGROUND_THROTTLING = ["--disable-background-timer-throttling", "--disable-renderer-backgrounding",
+                            "--disable-backgrounding-occluded-windows"]
+
+# choices: a tuple of allowed values, a range of ints, or a type;
+# restart: the setting only applies at startup
+Field = namedtuple("Field", "name default choices restart label")
+FIELDS = (
+    Field("process_model", "process-per-site-instance", tuple(PROCESS_MODELS), True,
+          "Renderer process model"),
+    Field("renderer_process_limit", 0, range(0, 1001), True, "Renderer process limit (0: automatic)"),
+    Field("gpu_rasterization", "auto", tuple(GPU_RASTERIZATION), True, "GPU rasterization"),
+    Field("background_throttling", True, bool, True, "Throttle background tabs"),
+    # QWebEngineProfile takes the cache size in bytes as a 32-bit int
+    Field("disk_cache_mb", 1024, range(0, 2048), False, "Disk cache size in MB (0: automatic)"),
+    Field("animations", True, bool, False, "Toolbar animations"),
+    Field("extra_chromium_flags", "", str, True, "Extra Chromium flags")
+)
+FIELDS_BY_NAME = {field.name: field for field in FIELDS}
+
+def check(field, value):
+    """Return value if it is valid for field, else raise ValueError"""
+    if isinstance(field.choices, range):
+        if type(value) is int and value in field.choices:
+            return value
+    elif isinstance(field.choices, tuple):
+        if value in field.choices:
+            return value
+    elif type(value) is field.choices:
+        return value
+    raise ValueError(f"invalid {field.name}: {value!r}")
+
+class Settings:
+    """Performance settings persisted as JSON
+
+    Values are read as attributes (``settings.disk_cache_mb``). Invalid
+    or unknown entries in the file are replaced by defaults and listed
+    in ``problems`` rather than failing startup. Settings marked
+    ``restart`` become Chromium switches and must be applied with
+    ``apply_early`` before the QApplication is created.
+    """
+    def __init__(self, values=None):
+        self.values = {field.name: field.default for field in FIELDS}
+        self.problems = []
+        self.path = None  # file the settings were loaded from
+        self.applied = None  # profile from apply_early()
+        if values:
+            self.update(values)
+
+    def __getattr__(self, name):
+        values = self.__dict__.get("values")
+        if values is not None and name in values:
+            return values[name]
+        raise AttributeError(name)
+
+    def update(self, values):
+        for name, value in values.items():
+            field = FIELDS_BY_NAME.get(name)
+            if field is None:
+                self.problems.append(f"unknown setting {name!r}")
+                continue
+            try:
+                self.values[name] = check(field, value)
+            except ValueError as e:
+                self.problems.append(str(e))
+
+    @classmethod
+    def load(cls, path):
+        """Read settings from path; a missing file gives the defaults"""
+        settings = cls()
+        settings.path = path
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return settings
+        except (OSError, ValueError) as e:
+            settings.problems.append(f"{path}: {e}")
+            return settings
+        if isinstance(data, dict):
+            settings.update(data)
+        else:
+            settings.problems.append(f"{path}: expected an object")
+        return settings
+
+    def save(self, path=None):
+        self.path = path or self.path
+        atomic_write(self.path, (json.dumps(self.values, indent=2, sort_keys=True) + "\n").encode("utf-8"))
+
+    def chromium_flags(self):
+        flags = list(PROCESS_MODELS[self.process_model])
+        if self.renderer_process_limit:
+            flags.append(f"--renderer-process-limit={self.renderer_process_limit}")
+        flags += GPU_RASTERIZATION[self.gpu_rasterization]
+        if not self.background_throttling:
+            flags += NO_BACKGROUND_THROTTLING
+        flags += self.extra_chromium_flags.split()
+        return flags
+
+    def apply_early(self, environ=os.environ):
+        """Put the Chromium switches in the environment; call before QApplication()
+
+        Flags already exported in the environment are kept after ours, so
+        they win where both set the same switch. Returns the applied
+        profile, which identifies the run's configuration in logs.
+        """
+        exported = environ.get(FLAGS_ENV, "")
+        flags = " ".join(self.chromium_flags() + exported.split())
+        if flags:
+            environ[FLAGS_ENV] = flags
+        self.applied = self.profile(flags, exported)
+        return self.applied
+
+    def profile(self, flags=None, exported=""):
+        """Settings and Chromium flags, with a short id for comparing runs"""
+        flags = " ".join(self.chromium_flags()) if flags is None else flags
+        profile = {"settings": dict(self.values), "chromium_flags": flags}
+        if exported:
+            profile["exported_flags"] = exported
+        digest = hashlib.sha1(json.dumps(profile, sort_keys=True).encode("utf-8")).hexdigest()
+        profile["id"] = digest[:12]
+        return profile
+
+    def pending_restart(self):
+        """Names of startup-only settings changed since apply_early"""
+        if self.applied is None:
+            return []
+        return [field.name for field in FIELDS
+                if field.restart and self.values[field.name] != self.applied["settings"][field.name]]
+
+class SettingsDialog(QDialog):
+    """Edit and save the settings; ``save(settings)`` is called with the new values
+
+    Startup-only settings are marked and take effect after a restart.
+    """
+    def __init__(self, settings, save, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Settings")
+        self.setMinimumWidth(480)
+        self.settings = settings
+        self.save = save
+
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+        layout.addWidget(QLabel("<h2>Performance</h2>"))
+        form = QFormLayout()
+        layout.addLayout(form)
+        self.editors = {}
+        for field in FIELDS:
+            if isinstance(field.choices, tuple):
+                editor = QComboBox()
+                editor.addItems(field.choices)
+            elif isinstance(field.choices, range):
+                editor = QSpinBox()
+                editor.setRange(field.choices.start, field.choices.stop - 1)
+            elif field.choices is bool:
+                editor = QCheckBox()
+            else:
+                editor = QLineEdit()
+            self.editors[field.name] = editor
+            form.addRow(field.label + (" *" if field.restart else ""), editor)
+        layout.addWidget(QLabel("* applies after a restart"))
+        self.status = QLabel()
+        layout.addWidget(self.status)
+
+        buttons = QHBoxLayout()
+        layout.addLayout(buttons)
+        defaults = QPushButton("Defaults")
+        defaults.clicked.connect(lambda: self.show_values(Settings().values))
+        cancel = QPushButton("Cancel")
+        cancel.clicked.connect(self.reject)
+        ok = QPushButton("Save")
+        ok.setDefault(True)
+        ok.clicked.connect(self.accept)
+        buttons.addWidget(defaults)
+        buttons.addStretch()
+        buttons.addWidget(cancel)
+        buttons.addWidget(ok)
+
+    def showEvent(self, event):
+        self.show_values(self.settings.values)
+        pending = self.settings.pending_restart()
+        self.status.setText(f"Restart to apply: {', '.join(pending)}" if pending else "")
+        super().showEvent(event)
+
+    def show_values(self, values):
+        for name, editor in self.editors.items():
+            value = values[name]
+            if isinstance(editor, QComboBox):
+                editor.setCurrentText(value)
+            elif isinstance(editor, QSpinBox):
+                editor.setValue(value)
+            elif isinstance(editor, QCheckBox):
+                editor.setChecked(value)
+            else:
+                editor.setText(value)
+
+    def edited_values(self):
+        values = {}
+        for name, editor in self.editors.items():
+            if isinstance(editor, QComboBox):
+                values[name] = editor.currentText()
+            elif isinstance(editor, QSpinBox):
+                values[name] = editor.value()
+            elif isinstance(editor, QCheckBox):
+                values[name] = editor.isChecked()
+            else:
+                values[name] = editor.text().strip()
+        return values
+
+    def accept(self):
+        self.settings.update(self.edited_values())
+        self.save(self.settings)
+        super().accept()
@@ -0,0 +1,51 @@
+import os
+import sys
+import json
+import time
+
+def process_age():
+    """Seconds since this process started, or None where /proc is missing"""
+    try:
+        with open("/proc/self/stat", "rb") as f:
+            stat = f.read()
+        with open("/proc/uptime", "rb") as f:
+            uptime = float(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    # The command name may contain spaces, so split after the closing paren
+    start_ticks = int(stat[stat.rfind(b")") + 2:].split()[19])
+    return max(uptime - start_ticks / os.sysconf("SC_CLK_TCK"), 0.0)
+
+class StartupProfiler:
+    """Named startup phases, timed from process start
+
+    Where the process start time is unknown the clock starts when this
+    object is created, which is early in main.py's imports.
+    """
+    def __init__(self):
+        self.origin = time.perf_counter() - (process_age() or 0.0)
+        self.phases = []
+
+    def mark(self, name):
+        self.phases.append((name, time.perf_counter() - self.origin))
+
+    def as_dict(self):
+        phases = []
+        previous = 0.0
+        for name, at in self.phases:
+            phases.append({"phase": name, "ms": round(at * 1000, 1),
+                           "delta_ms": round((at - previous) * 1000, 1)})
+            previous = at
+        return {"time": round(time.time(), 3), "phases": phases,
+                "total_ms": phases[-1]["ms"] if phases else 0.0}
+
+    def report(self, stream=sys.stderr):
+        """Print a phase table"""
+        for phase in self.as_dict()["phases"]:
+            print(f"{phase['phase']:<24} {phase['ms']:9.1f} ms  (+{phase['delta_ms']:.1f})",
+                  file=stream)
+
+    def append_to(self, path):
+        """Append this run as one JSON line so runs can be compared over time"""
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(self.as_dict()) + "\n")
@@ -0,0 +1,436 @@
+import re
+import time
+import heapq
+import threading
+from array import array
+from bisect import bisect_left
+from operator import attrgetter
+from PyQt5.QtCore import Qt, QObject, QTimer, QAbstractListModel, QModelIndex, pyqtSignal
+from PyQt5.QtWidgets import QCompleter
+
+# Frecency: visit count weighted by how recently the page was visited
+RECENCY_BUCKETS = ((4, 100), (14, 70), (31, 50), (90, 30))
+OLD_VISIT_WEIGHT = 10
+BOOKMARK_BONUS = 140
+OPEN_TAB_BONUS = 75
+URL_PREFIX_BOOST = 2.0
+
+MAX_TOKENS = 16
+SCAN_LIMIT = 1500  # postings scanned linearly instead of searched best-first
+MAX_SCAN = 50  # ids examined per best-first search before giving up
+REBUILD_THRESHOLD = 256  # pending updates before the static index is rebuilt
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+SCHEME_RE = re.compile(r"^[a-z][a-z0-9+.-]*://")
+HOST_RE = re.compile(r"^(localhost|\d{1,3}(\.\d{1,3}){3}|[\w-]+(\.[\w-]+)*\.[a-z]{2,})(:\d+)?([/?#].*)?$",
+                     re.IGNORECASE)
+
+def looks_like_url(text):
+    """Decide whether address bar text is a URL rather than a search"""
+    text = text.strip()
+    if not text or " " in text:
+        return False
+    if SCHEME_RE.match(text.lower()) or text.lower().startswith(("about:", "file:", "data:")):
+        return True
+    return bool(HOST_RE.match(text))
+
+def normalize_url(url):
+    """Key used for URL prefix matching: no scheme, no www., lowercase"""
+    url = SCHEME_RE.sub("", url.lower(), count=1)
+    if url.startswith("www."):
+        url = url[4:]
+    return url.rstrip("/")
+
+def tokenize(text):
+    return [t for t in TOKEN_RE.findall(text.lower()) if len(t) > 1]
+
+def frecency(visit_count, last_visit, now, bookmarked=False, open_tabs=0):
+    age_days = (now - last_visit) / 86400
+    weight = next((w for days, w in RECENCY_BUCKETS if age_days < days), OLD_VISIT_WEIGHT)
+    score = max(visit_count, 1) * weight
+    if bookmarked:
+        score += BOOKMARK_BONUS
+    if open_tabs:
+        score += OPEN_TAB_BONUS
+    return float(score)
+
+class Entry:
+    """One suggestible URL"""
+    __slots__ = ("id", "url", "title", "visit_count", "last_visit", "bookmarked",
+                 "open_tabs", "score", "key", "words")
+
+    def __init__(self, id, url, title="", visit_count=0, last_visit=0.0):
+        self.id = id
+        self.url = url
+        self.title = title or ""
+        self.visit_count = visit_count
+        self.last_visit = last_visit
+        self.bookmarked = False
+        self.open_tabs = 0
+        self.score = 0.0
+        self.refresh()
+
+    def refresh(self, now=None):
+        self.key = normalize_url(self.url)
+        # " tok1 tok2 ..." so word-prefix tests are a substring search
+        self.words = " " + " ".join(list(dict.fromkeys(tokenize(f"{self.key} {self.title}")))[:MAX_TOKENS])
+        self.score = frecency(self.visit_count, self.last_visit, now or time.time(),
+                              self.bookmarked, self.open_tabs)
+
+    def tokens(self):
+        return self.words.split()
+
+    def has_word_prefix(self, prefix):
+        return f" {prefix}" in self.words
+
+class PrefixIndex:
+    """Immutable prefix index returning ids in descending score order
+
+    Keys are kept sorted (a flattened trie: every prefix is a contiguous
+    range found by bisection). Each key owns a posting list sorted by
+    score, stored in flat arrays, and a max-score segment tree over the
+    keys lets a best-first search yield the top ids of any prefix range
+    without visiting the whole range.
+
+    ``postings`` maps key -> ids already in descending score order and
+    ``scores`` is indexed by id.
+    """
+    def __init__(self, postings, scores=()):
+        self.keys = sorted(postings)
+        flat = []
+        offsets = [0]
+        for key in self.keys:
+            flat.extend(postings[key])
+            offsets.append(len(flat))
+        self.ids = array("i", flat)
+        self.offsets = array("i", offsets)
+        self.scores = array("f", [scores[i] for i in flat])
+
+        size = 1
+        while size < max(len(self.keys), 1):
+            size *= 2
+        self.size = size
+        tree = array("f", [-1.0]) * (2 * size)
+        tree[size:size + len(self.keys)] = array("f", [self.scores[i] for i in offsets[:-1]])
+        for node in range(size - 1, 0, -1):
+            tree[node] = max(tree[2 * node], tree[2 * node + 1])
+        self.tree = tree
+
+    def __len__(self):
+        return len(self.keys)
+
+    def span(self, prefix):
+        """Range of keys starting with prefix"""
+        return bisect_left(self.keys, prefix), bisect_left(self.keys, prefix + "\uffff")
+
+    def count(self, prefix):
+        """Number of postings under prefix, in O(log n)"""
+        lo, hi = self.span(prefix)
+        return self.offsets[hi] - self.offsets[lo]
+
+    def search(self, prefix):
+        """Yield ids whose key starts with prefix, best score first"""
+        lo, hi = self.span(prefix)
+        if lo >= hi:
+            return
+
+        tree, size = self.tree, self.size
+        heap = []
+        left, right = lo + size, hi + size
+        while left < right:
+            if left & 1:
+                heap.append((-tree[left], 0, left, 0))
+                left += 1
+            if right & 1:
+                right -= 1
+                heap.append((-tree[right], 0, right, 0))
+            left >>= 1
+            right >>= 1
+        heapq.heapify(heap)
+
+        while heap:
+            _, kind, a, b = heapq.heappop(heap)
+            if kind == 1:
+                yield self.ids[b]
+                if b + 1 < self.offsets[a + 1]:
+                    heapq.heappush(heap, (-self.scores[b + 1], 1, a, b + 1))
+                continue
+
+            # Walk down the better child, leaving the other on the heap
+            while a < size:
+                left, right = 2 * a, 2 * a + 1
+                if tree[right] > tree[left]:
+                    left, right = right, left
+                if tree[right] >= 0:
+                    heapq.heappush(heap, (-tree[right], 0, right, 0))
+                a = left
+            key_index = a - size
+            start = self.offsets[key_index]
+            yield self.ids[start]
+            if start + 1 < self.offsets[key_index + 1]:
+                heapq.heappush(heap, (-self.scores[start + 1], 1, key_index, start + 1))
+
+def build_indexes(entries):
+    """Build the URL and token prefix indexes for a snapshot of entries"""
+    # Visiting entries best-first leaves every posting list sorted
+    ordered = sorted(entries, key=attrgetter("score"), reverse=True)
+    urls = {}
+    tokens = {}
+    for entry in ordered:
+        urls.setdefault(entry.key, []).append(entry.id)
+        for token in entry.tokens():
+            tokens.setdefault(token, []).append(entry.id)
+    scores = [0.0] * (max((e.id for e in entries), default=-1) + 1)
+    for entry in entries:
+        scores[entry.id] = entry.score
+    return PrefixIndex(urls, scores), PrefixIndex(tokens, scores)
+
+class SuggestionIndex:
+    """In-memory, frecency-ranked suggestions from history, bookmarks and tabs
+
+    Lookups combine a static PrefixIndex pair with a small overlay of
+    entries added or re-scored since the last build; the overlay is
+    scanned linearly and folded in by a background rebuild once it grows.
+    """
+    def __init__(self):
+        self.entries = []
+        self.by_url = {}
+        self.pending = {}
+        self.url_index = PrefixIndex({})
+        self.token_index = PrefixIndex({})
+        self._lock = threading.Lock()
+        self._rebuilding = False
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _entry(self, url, title=""):
+        entry = self.by_url.get(url)
+        if entry is None:
+            with self._lock:
+                entry = self.by_url.get(url)
+                if entry is None:
+                    entry = Entry(len(self.entries), url, title)
+                    self.entries.append(entry)
+                    self.by_url[url] = entry
+        return entry
+
+    def load(self, rows, now=None, bookmarks=()):
+        """Bulk load history and bookmarks, then rebuild
+
+        ``rows`` are (url, title, visit_count, last_visit); ``bookmarks``
+        are (url, title) pairs.
+        """
+        now = now or time.time()
+        for url, title, visit_count, last_visit in rows:
+            entry = self._entry(url, title)
+            entry.visit_count = visit_count
+            entry.last_visit = last_visit
+            entry.title = title or entry.title
+            entry.refresh(now)
+        for url, title in bookmarks:
+            entry = self._entry(url, title)
+            entry.bookmarked = True
+            entry.title = entry.title or title
+            entry.refresh(now)
+        self.rebuild()
+
+    def rebuild(self):
+        """Fold pending updates into the static indexes (any thread)"""
+        with self._lock:
+            snapshot = list(self.entries)
+            versions = dict(self.pending)
+        url_index, token_index = build_indexes(snapshot)
+        with self._lock:
+            self.url_index, self.token_index = url_index, token_index
+            for entry_id, version in versions.items():
+                if self.pending.get(entry_id) == version:
+                    del self.pending[entry_id]
+            self._rebuilding = False
+
+    def _touch(self, entry):
+        entry.refresh()
+        self.pending[entry.id] = self.pending.get(entry.id, 0) + 1
+        if len(self.pending) > REBUILD_THRESHOLD and not self._rebuilding:
+            self._rebuilding = True
+            threading.Thread(target=self.rebuild, name="suggestion-index", daemon=True).start()
+
+    def record_visit(self, url, title="", when=None):
+        entry = self._entry(url, title)
+        entry.visit_count += 1
+        entry.last_visit = when or time.time()
+        if title:
+            entry.title = title
+        self._touch(entry)
+
+    def update_title(self, url, title):
+        entry = self.by_url.get(url)
+        if entry is not None and title and entry.title != title:
+            entry.title = title
+            self._touch(entry)
+
+    def set_bookmarks(self, bookmarks):
+        """Mark (url, title) pairs as bookmarked"""
+        for url, title in bookmarks:
+            entry = self._entry(url, title)
+            if not entry.bookmarked:
+                entry.bookmarked = True
+                self._touch(entry)
+
+    def tab_opened(self, url, title=""):
+        entry = self._entry(url, title)
+        entry.open_tabs += 1
+        self._touch(entry)
+
+    def tab_closed(self, url):
+        entry = self.by_url.get(url)
+        if entry is not None and entry.open_tabs > 0:
+            entry.open_tabs -= 1
+            self._touch(entry)
+
+    def query(self, text, limit=8):
+        """Return the best entries for the typed text"""
+        text = text.strip().lower()
+        if not text:
+            return []
+        key = normalize_url(text)
+        if not key:
+            return []
+        words = tokenize(key)
+        entries, pending = self.entries, self.pending
+        url_index, token_index = self.url_index, self.token_index
+        scores = {}
+
+        # Drive the word search from the most selective word, filter by the rest
+        driver = min(words, key=token_index.count) if len(words) > 1 else (words[0] if words else None)
+        others = [w for w in words if w is not driver]
+
+        def matches(entry):
+            return all(entry.has_word_prefix(w) for w in others)
+
+        def offer(entry, boost=1.0):
+            score = entry.score * boost
+            if score > scores.get(entry.id, -1):
+                scores[entry.id] = score
+
+        # URL prefix matches ("git" -> github.com/...)
+        if " " not in text:
+            self._take(url_index, key, limit, pending, lambda e: offer(e, URL_PREFIX_BOOST), None)
+
+        # Word prefix matches on title and URL tokens
+        if driver:
+            self._take(token_index, driver, limit, pending, offer, matches)
+
+        # Entries changed since the last rebuild
+        needle = f" {driver}" if driver else None
+        for entry_id in list(pending):
+            entry = entries[entry_id]
+            if entry.key.startswith(key):
+                offer(entry, URL_PREFIX_BOOST)
+            elif needle and needle in entry.words and matches(entry):
+                offer(entry)
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [entries[entry_id] for entry_id, _ in best]
+
+    def _take(self, index, prefix, limit, pending, offer, predicate):
+        entries = self.entries
+        lo, hi = index.span(prefix)
+        start, end = index.offsets[lo], index.offsets[hi]
+
+        # Filtered searches over small ranges are cheaper as a scan
+        if predicate is not None and end - start <= SCAN_LIMIT:
+            for entry_id in index.ids[start:end]:
+                if entry_id not in pending:
+                    entry = entries[entry_id]
+                    if predicate is None or predicate(entry):
+                        offer(entry)
+            return
+
+        found = 0
+        for pops, entry_id in enumerate(index.search(prefix)):
+            if found >= limit or pops >= MAX_SCAN:
+                break
+            if entry_id in pending:
+                continue
+            entry = self.entries[entry_id]
+            if predicate is None or predicate(entry):
+                offer(entry)
+                found += 1
+
+class SuggestionModel(QAbstractListModel):
+    """Rows shown in the omnibox popup; icon_for(url) supplies the row icons"""
+    def __init__(self, icon_for=None, parent=None):
+        super().__init__(parent)
+        self.rows = []
+        self.icon_for = icon_for
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self.rows = rows
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        entry = self.rows[index.row()]
+        if role == Qt.DisplayRole:
+            return f"{entry.title} — {entry.url}" if entry.title else entry.url
+        if role in (Qt.EditRole, Qt.UserRole):
+            return entry.url
+        if role == Qt.ToolTipRole:
+            return entry.url
+        if role == Qt.DecorationRole and self.icon_for is not None:
+            return self.icon_for(entry.url)
+        return None
+
+class Omnibox(QObject):
+    """Debounced suggestion popup for an address bar
+
+    ``candidatesChanged`` carries the (url, score) pairs on offer, best
+    first, after each query and when the user highlights a row.
+    """
+    urlChosen = pyqtSignal(str)
+    candidatesChanged = pyqtSignal(list)
+
+    def __init__(self, line_edit, index, delay=30, limit=8, icon_for=None, parent=None):
+        super().__init__(parent)
+        self.line_edit = line_edit
+        self.index = index
+        self.limit = limit
+
+        self.model = SuggestionModel(icon_for, self)
+        self.completer = QCompleter(self.model, self)
+        self.completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.completer.setWidget(line_edit)
+        self.completer.activated[QModelIndex].connect(self.on_activated)
+        self.completer.highlighted[QModelIndex].connect(self.on_highlighted)
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay)
+        self.timer.timeout.connect(self.update_suggestions)
+        line_edit.textEdited.connect(lambda _: self.timer.start())
+
+    def update_suggestions(self):
+        rows = self.index.query(self.line_edit.text(), self.limit)
+        self.model.set_rows(rows)
+        self.candidatesChanged.emit([(entry.url, entry.score) for entry in rows])
+        if rows:
+            self.completer.complete()
+        else:
+            self.completer.popup().hide()
+
+    def on_highlighted(self, index):
+        if index.isValid() and index.row() < len(self.model.rows):
+            entry = self.model.rows[index.row()]
+            self.candidatesChanged.emit([(entry.url, entry.score)])
+
+    def on_activated(self, index):
+        url = index.data(Qt.UserRole)
+        if url:
+            self.line_edit.setText(url)
+            self.urlChosen.emit(url)
@@ -0,0 +1,151 @@
+from PyQt5.QtCore import QObject, QTimer, QPoint, QMimeData, Qt, QEvent, pyqtSignal
+from PyQt5.QtGui import QCursor, QDrag, QMouseEvent
+from PyQt5.QtWidgets import QTabBar, QTabWidget
+
+TITLE_LENGTH = 30
+MIME_TYPE = "application/x-fibrowser-tab"
+DETACH_MARGIN = 30  # px the cursor may stray from the bar before a tab is dragged out
+
+def tab_text(title):
+    """Tab bar label for a page title"""
+    return title[:TITLE_LENGTH] + "..." if len(title) > TITLE_LENGTH else title
+
+class TabBarUpdater(QObject):
+    """Pushes tab state to the tab bar on one coalescing timer
+
+    Tabs keep their own state (``url``, ``title``, ``icon``, ``progress``,
+    ``loading``) and only call ``mark()`` when it changes. Each flush
+    maps widgets to indexes once, instead of ``indexOf()`` per signal,
+    and skips labels that did not change.
+    """
+    def __init__(self, tabs, interval=100, parent=None):
+        super().__init__(parent)
+        self.tabs = tabs
+        self.dirty = set()
+        self.flushes = 0
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.flush)
+
+    def mark(self, tab):
+        self.dirty.add(tab)
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def forget(self, tab):
+        self.dirty.discard(tab)
+
+    def flush(self):
+        if not self.dirty:
+            return
+        dirty, self.dirty = self.dirty, set()
+        self.flushes += 1
+        bar = self.tabs.tabBar()
+        if len(dirty) == 1:
+            tab = next(iter(dirty))
+            indexes = {tab: self.tabs.indexOf(tab)}
+        else:
+            indexes = {self.tabs.widget(i): i for i in range(self.tabs.count())}
+        for tab in dirty:
+            index = indexes.get(tab, -1)
+            if index < 0:
+                continue
+            text = tab_text(tab.title)
+            if bar.tabText(index) != text:
+                bar.setTabText(index, text)
+            tooltip = tab.url.toString()
+            if bar.tabToolTip(index) != tooltip:
+                bar.setTabToolTip(index, tooltip)
+            if tab.icon_dirty:
+                tab.icon_dirty = False
+                bar.setTabIcon(index, tab.icon)
+
+class DetachableTabBar(QTabBar):
+    """Tab bar whose tabs can be dragged out of the window or onto another bar
+
+    Dragging within the bar reorders tabs as usual. Once the cursor
+    leaves the bar by ``DETACH_MARGIN`` the move turns into a drag and
+    drop: dropping on another DetachableTabBar emits ``tabReceived`` on
+    that bar, dropping anywhere else emits ``tabDetached`` here with the
+    cursor position. The tab widgets themselves never travel in the
+    drag; the receiving side asks the source window to hand them over.
+    """
+    tabDetached = pyqtSignal(int, QPoint)
+    tabReceived = pyqtSignal(object, int, int)  # source bar, source index, target index
+    dragFinished = pyqtSignal()
+
+    dragging = None  # (bar, index) while a tab drag is in progress
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setAcceptDrops(True)
+        self.press_index = -1
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self.press_index = self.tabAt(event.pos())
+        super().mousePressEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        self.press_index = -1
+        super().mouseReleaseEvent(event)
+
+    def mouseMoveEvent(self, event):
+        if (self.press_index < 0 or not event.buttons() & Qt.LeftButton
+                or self.rect().adjusted(-DETACH_MARGIN, -DETACH_MARGIN,
+                                        DETACH_MARGIN, DETACH_MARGIN).contains(event.pos())):
+            super().mouseMoveEvent(event)
+            return
+        index = self.press_index
+        self.press_index = -1
+        # End the bar's own tab move before the drag takes the mouse
+        release = QMouseEvent(QEvent.MouseButtonRelease, event.pos(), Qt.LeftButton,
+                              Qt.NoButton, Qt.NoModifier)
+        super().mouseReleaseEvent(release)
+        self.start_drag(index)
+
+    def start_drag(self, index):
+        mime = QMimeData()
+        mime.setData(MIME_TYPE, b"")
+        drag = QDrag(self)
+        drag.setMimeData(mime)
+        drag.setPixmap(self.grab(self.tabRect(index)))
+        DetachableTabBar.dragging = (self, index)
+        try:
+            if drag.exec_(Qt.MoveAction) == Qt.IgnoreAction and DetachableTabBar.dragging:
+                self.tabDetached.emit(index, QCursor.pos())
+        finally:
+            DetachableTabBar.dragging = None
+        self.dragFinished.emit()
+
+    def dragEnterEvent(self, event):
+        if event.mimeData().hasFormat(MIME_TYPE) and DetachableTabBar.dragging is not None:
+            event.acceptProposedAction()
+        else:
+            super().dragEnterEvent(event)
+
+    def dragMoveEvent(self, event):
+        if event.mimeData().hasFormat(MIME_TYPE) and DetachableTabBar.dragging is not None:
+            event.acceptProposedAction()
+        else:
+            super().dragMoveEvent(event)
+
+    def dropEvent(self, event):
+        if not event.mimeData().hasFormat(MIME_TYPE) or DetachableTabBar.dragging is None:
+            super().dropEvent(event)
+            return
+        source, index = DetachableTabBar.dragging
+        event.acceptProposedAction()
+        to_index = self.tabAt(event.pos())
+        # Still dragging while the tab moves, so the source window waits
+        # for dragFinished before closing itself
+        self.tabReceived.emit(source, index, to_index if to_index >= 0 else self.count())
+        DetachableTabBar.dragging = None
+
+class BrowserTabWidget(QTabWidget):
+    """QTabWidget with a DetachableTabBar"""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setTabBar(DetachableTabBar(self))
@@ -0,0 +1,180 @@
+import os
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from PyQt5.QtCore import QObject, QTimer, Qt, pyqtSignal
+from PyQt5.QtWidgets import QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+def proc_available():
+    """True when per-process stats can be read from /proc"""
+    return os.path.isdir("/proc/self")
+
+def read_proc_stats(pid):
+    """Return (rss_bytes, cpu_ticks) for pid, or None if it is gone"""
+    try:
+        with open(f"/proc/{pid}/statm", "rb") as f:
+            rss_pages = int(f.read().split()[1])
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            stat = f.read()
+    except (OSError, ValueError, IndexError):
+        return None
+    # The command name may contain spaces, so split after the closing paren
+    fields = stat[stat.rfind(b")") + 2:].split()
+    utime, stime = int(fields[11]), int(fields[12])
+    return rss_pages * PAGE_SIZE, utime + stime
+
+def available_memory():
+    """Return MemAvailable in bytes, or None where /proc/meminfo is missing"""
+    try:
+        with open("/proc/meminfo", "rb") as f:
+            for line in f:
+                if line.startswith(b"MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+class RollingJsonlWriter:
+    """Append-only JSONL file rotated by size"""
+    def __init__(self, path, max_bytes=5 * 1024 * 1024, backups=3):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def write(self, records):
+        if not records:
+            return
+        data = "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records)
+        try:
+            if os.path.getsize(self.path) + len(data) > self.max_bytes:
+                self.rotate()
+        except OSError:
+            pass
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(data)
+
+    def rotate(self):
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+class ResourceSampler(QObject):
+    """Samples renderer RSS and CPU per tab off the GUI thread
+
+    ``targets`` is called on the GUI thread each tick and must return a
+    list of ``(label, pid)`` pairs; it should only read cached values.
+    At most ``max_pids`` processes are read per tick and a tick is skipped
+    while the previous one is still running, so the cost stays bounded.
+    """
+    sampled = pyqtSignal(list)
+
+    def __init__(self, targets, interval=5000, max_pids=64, log_path=None, parent=None):
+        super().__init__(parent)
+        self.targets = targets
+        self.max_pids = max_pids
+        self.writer = RollingJsonlWriter(log_path) if log_path else None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="telemetry")
+        self._pending = None
+        self._last_cpu = {}
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.tick)
+        if proc_available():
+            self.timer.start()
+
+    def tick(self):
+        """Collect PIDs on the GUI thread and hand the reads to the worker"""
+        if self._pending is not None and not self._pending.done():
+            return
+        targets = [(label, pid) for label, pid in self.targets() if pid > 0]
+        self._pending = self._executor.submit(self._sample, targets)
+
+    def _sample(self, targets):
+        now = time.monotonic()
+        stats = {}
+        for pid in dict.fromkeys(pid for _, pid in targets):
+            if len(stats) >= self.max_pids:
+                break
+            stats[pid] = read_proc_stats(pid)
+
+        rows = []
+        last_cpu = {}
+        for label, pid in targets:
+            stat = stats.get(pid)
+            if stat is None:
+                continue
+            rss, ticks = stat
+            cpu = 0.0
+            previous = self._last_cpu.get(pid)
+            if previous is not None and now > previous[0]:
+                cpu = (ticks - previous[1]) / CLOCK_TICKS / (now - previous[0]) * 100
+            last_cpu[pid] = (now, ticks)
+            rows.append({
+                "time": round(time.time(), 3),
+                "tab": label,
+                "pid": pid,
+                "rss_mb": round(rss / (1024 * 1024), 1),
+                "cpu": round(max(cpu, 0.0), 1)
+            })
+        self._last_cpu = last_cpu
+
+        if self.writer:
+            try:
+                self.writer.write(rows)
+            except OSError:
+                pass
+        self.sampled.emit(rows)
+
+    def shutdown(self):
+        """Stop sampling and release the worker thread"""
+        self.timer.stop()
+        self._executor.shutdown(wait=False)
+
+class NumericItem(QTableWidgetItem):
+    """Table item sorted by its numeric value"""
+    def __init__(self, value, text=None):
+        super().__init__(text if text is not None else str(value))
+        self.value = value
+        self.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+
+    def __lt__(self, other):
+        if isinstance(other, NumericItem):
+            return self.value < other.value
+        return super().__lt__(other)
+
+class ResourcePanel(QTableWidget):
+    """Sortable table of per-tab renderer resource usage"""
+    COLUMNS = ("Tab", "PID", "Memory (MB)", "CPU %")
+
+    def __init__(self, parent=None):
+        super().__init__(0, len(self.COLUMNS), parent)
+        self.setHorizontalHeaderLabels(self.COLUMNS)
+        self.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.verticalHeader().setVisible(False)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.setSortingEnabled(True)
+        self.sortByColumn(2, Qt.DescendingOrder)
+
+    def update_rows(self, rows):
+        """Replace table contents with the latest sample"""
+        if not self.isVisible():
+            return
+        self.setSortingEnabled(False)
+        self.setRowCount(len(rows))
+        for i, row in enumerate(rows):
+            self.setItem(i, 0, QTableWidgetItem(row["tab"]))
+            self.setItem(i, 1, NumericItem(row["pid"]))
+            self.setItem(i, 2, NumericItem(row["rss_mb"], f"{row['rss_mb']:.1f}"))
+            self.setItem(i, 3, NumericItem(row["cpu"], f"{row['cpu']:.1f}"))
+        self.setSortingEnabled(True)
@@ -0,0 +1,139 @@
+import os
+import sys
+import json
+from PyQt5.QtGui import QPalette, QColor
+
+# Built-in theme files ship next to this module (or in the PyInstaller bundle)
+BUILTIN_DIR = os.path.join(getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__))),
+                           "themes")
+
+DEFAULT_COLORS = {
+    "accent": "#1a73e8",
+    "hover": "rgba(255, 255, 255, 0.1)"
+}
+REQUIRED_COLORS = ("bg", "fg", "tab_bg", "tab_active", "url_bg")
+
+# One stylesheet per themed part of the window. Each is set on just the
+# widgets of that part, so a switch never restyles the tab pages or web
+# views; everything else follows the palette.
+STYLESHEETS = {
+    "tabbar": """
+        QTabBar::tab {{
+            background: {tab_bg};
+            color: {fg};
+            padding: 8px;
+            border-top-left-radius: 4px;
+            border-top-right-radius: 4px;
+            margin-right: 2px;
+        }}
+        QTabBar::tab:selected {{
+            background: {tab_active};
+            border-bottom: 2px solid {accent};
+        }}
+    """,
+    "toolbar": """
+        QToolBar {{
+            background: {bg};
+            border: 0;
+        }}
+        QLineEdit {{
+            background: {url_bg};
+            border-radius: 16px;
+            padding: 6px 12px;
+            color: {fg};
+        }}
+        QToolButton {{
+            background: transparent;
+            border-radius: 4px;
+            padding: 4px;
+        }}
+        QToolButton:hover {{
+            background: {hover};
+        }}
+    """,
+    "status": """
+        QStatusBar {{
+            background: {tab_bg};
+        }}
+    """,
+    "progress": """
+        QProgressBar {{
+            border: 0;
+            background: transparent;
+        }}
+        QProgressBar::chunk {{
+            background: {accent};
+        }}
+    """
+}
+
+# Theme-independent, set once on the tab widget
+TAB_PANE_STYLESHEET = "QTabWidget::pane { border: 0; }"
+
+class Theme:
+    """Colors from a theme file, compiled on first use"""
+    def __init__(self, name, colors):
+        self.name = name
+        self.colors = dict(DEFAULT_COLORS, **colors)
+        self._palette = None
+        self._stylesheets = None
+
+    @property
+    def palette(self):
+        if self._palette is None:
+            self._palette = build_palette(self.colors)
+        return self._palette
+
+    @property
+    def stylesheets(self):
+        if self._stylesheets is None:
+            self._stylesheets = {part: " ".join(template.format_map(self.colors).split())
+                                 for part, template in STYLESHEETS.items()}
+        return self._stylesheets
+
+def build_palette(colors):
+    """Map theme colors onto palette roles for the unstyled widgets"""
+    bg, fg = QColor(colors["bg"]), QColor(colors["fg"])
+    palette = QPalette()
+    for role, color in (
+        (QPalette.Window, bg),
+        (QPalette.WindowText, fg),
+        (QPalette.Base, bg),
+        (QPalette.AlternateBase, QColor(colors["tab_bg"])),
+        (QPalette.Text, fg),
+        (QPalette.Button, QColor(colors["tab_bg"])),
+        (QPalette.ButtonText, fg),
+        (QPalette.ToolTipBase, QColor(colors["tab_bg"])),
+        (QPalette.ToolTipText, fg),
+        (QPalette.Highlight, QColor(colors["accent"])),
+        (QPalette.HighlightedText, QColor("#ffffff"))
+    ):
+        palette.setColor(role, color)
+    return palette
+
+def load_theme(path):
+    """Return the Theme in a JSON theme file, or None if it is unusable"""
+    try:
+        with open(path, "rb") as f:
+            data = json.load(f)
+        name = data["name"]
+        colors = data["colors"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if not isinstance(colors, dict) or any(key not in colors for key in REQUIRED_COLORS):
+        return None
+    return Theme(name, colors)
+
+def load_dir(directory):
+    """Return {name: Theme} for the theme files in directory"""
+    themes = {}
+    try:
+        names = sorted(os.listdir(directory))
+    except OSError:
+        return themes
+    for filename in names:
+        if filename.endswith(".json"):
+            theme = load_theme(os.path.join(directory, filename))
+            if theme is not None:
+                themes[theme.name] = theme
+    return themes
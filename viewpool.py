@@ -0,0 +1,156 @@
+import time
+from PyQt5.QtCore import QObject, QTimer, QUrl, pyqtSignal
+from PyQt5.QtWebEngineWidgets import QWebEngineView
+from telemetry import available_memory
+
+def dispose_view(view):
+    """Stop a web view and delete it, its page first
+
+    Deleting the view with its page still attached can leave the page
+    (and its renderer) alive until the profile goes away.
+    """
+    view.stop()
+    page = view.page()
+    page.setUrlRequestInterceptor(None)
+    view.setParent(None)
+    page.deleteLater()
+    view.deleteLater()
+
+def track_load(view):
+    """Keep view.loading and view.load_ok (the last load's result) current
+
+    Pooled and prerendered views start loading before a tab adopts
+    them, so the tab reads how far they got from these.
+    """
+    view.loading = False
+    view.load_ok = None
+
+    def on_started():
+        view.loading = True
+
+    def on_finished(ok):
+        view.loading = False
+        view.load_ok = ok
+
+    view.loadStarted.connect(on_started)
+    view.loadFinished.connect(on_finished)
+
+def forget_preload(view, preload_url):
+    """Clear view's back history once a page other than preload_url has loaded
+
+    QWebEngineHistory.clear() keeps the last committed entry, so it has
+    to wait until the redirected view has committed its new page.
+    """
+    def on_finished(ok):
+        if view.url() == preload_url:
+            return  # the end of the preload itself
+        view.loadFinished.disconnect(on_finished)
+        view.history().clear()
+
+    view.loadFinished.connect(on_finished)
+
+class ViewPool(QObject):
+    """Pre-created web views handed out to new tabs
+
+    Views are built one at a time when the event loop is idle, optionally
+    with ``preload_url`` already loading, so opening a tab does not pay for
+    view construction or renderer startup. The pool empties itself while
+    available memory is below ``min_free_memory``, checked on each refill
+    and every ``pressure_interval`` ms.
+    """
+    statsChanged = pyqtSignal(dict)
+
+    def __init__(self, size=2, preload_url=None, refill_delay=1000,
+                 min_free_memory=512 * 1024 * 1024, pressure_interval=30000,
+                 factory=QWebEngineView, parent=None):
+        super().__init__(parent)
+        self.size = size
+        self.factory = factory
+        self.preload_url = QUrl(preload_url) if preload_url else None
+        self.min_free_memory = min_free_memory
+        self.views = []
+        self.enabled = size > 0
+        self.stats = {"hits": 0, "misses": 0, "created": 0, "trimmed": 0}
+
+        # Refill after a delay so it does not compete with the page
+        # that was just opened, then one view per idle pass
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(refill_delay)
+        self.timer.timeout.connect(self.refill)
+
+        # A full pool is never refilled, so memory is also checked on a timer
+        self.pressure_timer = QTimer(self)
+        self.pressure_timer.setInterval(pressure_interval)
+        self.pressure_timer.timeout.connect(self.check_pressure)
+
+    def start(self):
+        """Begin filling the pool"""
+        if self.enabled:
+            self.timer.start()
+            if not self.pressure_timer.isActive():
+                self.pressure_timer.start()
+
+    def take(self, url):
+        """Return (view, preloaded) for url, or (None, False) if empty
+
+        ``preloaded`` is True when the view is already loading url.
+        """
+        self.start()
+        if not self.views:
+            self.stats["misses"] += 1
+            return None, False
+        view = self.views.pop(0)
+        self.stats["hits"] += 1
+        url = QUrl(url)
+        preloaded = self.preload_url is not None and url == self.preload_url
+        if not preloaded:
+            view.setUrl(url)
+            if self.preload_url is not None:
+                # Going back must not land on the preloaded page
+                forget_preload(view, self.preload_url)
+        return view, preloaded
+
+    def under_pressure(self):
+        free = available_memory()
+        return free is not None and free < self.min_free_memory
+
+    def check_pressure(self):
+        """Release the pooled views while memory is tight"""
+        if self.views and self.under_pressure():
+            self.trim(0)
+            self.statsChanged.emit(dict(self.stats, pooled=0))
+
+    def refill(self):
+        """Add one view, or drop them all if memory is tight"""
+        if not self.enabled:
+            return
+        if self.under_pressure():
+            self.trim(0)
+            return
+        if len(self.views) >= self.size:
+            return
+
+        start = time.perf_counter()
+        view = self.factory()
+        if self.preload_url is not None:
+            view.setUrl(self.preload_url)
+        self.views.append(view)
+        self.stats["created"] += 1
+        self.stats["last_build_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        self.statsChanged.emit(dict(self.stats, pooled=len(self.views)))
+
+        if len(self.views) < self.size:
+            QTimer.singleShot(0, self.refill)
+
+    def trim(self, keep=0):
+        """Destroy pooled views beyond keep"""
+        while len(self.views) > keep:
+            dispose_view(self.views.pop())
+            self.stats["trimmed"] += 1
+
+    def shutdown(self):
+        self.enabled = False
+        self.timer.stop()
+        self.pressure_timer.stop()
+        self.trim(0)